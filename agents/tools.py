@@ -3,6 +3,7 @@ from typing import List, Dict, Optional
 from langchain.tools import tool
 from data.google_sheets_client import GoogleSheetsClient
 from data.models import Card, Deck, DeckCard
+from utils.card_line_cache import get_card_line_cache
 
 # Cache global de cartas
 _cards_cache = None
@@ -13,6 +14,7 @@ def get_all_cards_cached():
     if _cards_cache is None:
         client = GoogleSheetsClient()
         _cards_cache = client.get_all_cards()
+        get_card_line_cache().sync(_cards_cache)
         print(f"✅ {len(_cards_cache)} cartas carregadas em cache")
     return _cards_cache
 
@@ -78,21 +80,8 @@ def search_cards(
     # Limitar resultados
     output = f"Encontradas {len(results)} cartas:\n\n"
     
-    for card in results[:30]:  # Mostrar até 30 cartas
-        output += f"{card.name} - {card.cost} custo"
-        
-        if card.card_type == "Unit":
-            output += f" - {card.attack}/{card.health} Unit"
-        else:
-            output += f" - {card.card_type}"
-        
-        if card.factions:
-            output += f" - {'/'.join(card.factions)}"
-        
-        if card.text:
-            output += f" - {card.text[:40]}..."
-        
-        output += "\n"
+    # Mostrar até 30 cartas (linhas pré-renderizadas no carregamento)
+    output += "\n".join(get_card_line_cache().lines(results[:30], 'agent')) + "\n"
     
     if len(results) > 30:
         output += f"\n... e mais {len(results) - 30} cartas."
@@ -20,3 +20,82 @@ DECK_RULES = {
     'MAX_COPIES': 4,
     'MARKET_SIZE': 5
 }
+
+# Mecânicas (keywords) reconhecidas no texto das cartas
+CARD_MECHANICS = [
+    'flying', 'charge', 'deadly', 'lifesteal', 'overwhelm',
+    'aegis', 'endurance', 'quickdraw', 'unblockable', 'warcry',
+    'echo', 'destiny', 'revenge', 'scout', 'inspire', 'empower',
+    'summon', 'entomb', 'ultimate', 'mastery', 'tribute',
+    'infiltrate', 'killer', 'reckless', 'berserk', 'decay'
+]
+
+# Acesso ao mercado (regra única: core/market_access.py)
+MARKET_ACCESS_NAME_TERMS = ['merchant', 'smuggler', 'etchings', 'marketeer']
+MARKET_ACCESS_TEXT_TERMS = ['your market', 'bargain']
+
+# Re-ranking por diversidade (MMR) dos resultados da busca semântica
+MMR_LAMBDA = 0.7  # 1.0 = só relevância, 0.0 = só diversidade
+MMR_TYPE_SHARES = {  # Fração máxima do resultado por tipo antes dos excedentes
+    'units': 0.6,
+    'spells': 0.4,
+    'powers': 0.2,
+    'weapons': 0.15,
+    'relics': 0.15,
+    'others': 0.1
+}
+
+# Cartas por tipo no contexto RAG enviado ao LLM (busca com cotas por tipo)
+CONTEXT_TYPE_QUOTAS = {
+    'units': 30,
+    'spells': 20,
+    'weapons': 10,
+    'relics': 10,
+    'powers': 15
+}
+
+# Relevance feedback (Rocchio): peso da query, das curtidas e das descartadas
+ROCCHIO_ALPHA = 1.0
+ROCCHIO_BETA = 0.75
+ROCCHIO_GAMMA = 0.25
+
+# Arquétipos reconhecidos na estratégia (primeiro que casar vence, na ordem abaixo)
+#   triggers: regex (inglês e português) aplicadas à estratégia em minúsculas;
+#             \b nas pontas para casar só palavras inteiras ("lent" casaria silent/talento)
+#   keywords: texto somado à query no enriquecimento textual (RAG_QUERY_PRIORS='text')
+#   terms: termos do texto das cartas que definem o centróide do arquétipo
+STRATEGY_ARCHETYPES = {
+    'aggro': {
+        # "fast spell" é a palavra-chave de velocidade de mágicas, não aggro
+        'triggers': [r'\baggro\b', r'\baggressive\b', r'\bfast\b(?!\s+spells?\b)', r'\bburn\b',
+                     r'\bagressiv[oa]s?\b', r'\brápid[oa]s?\b', r'\bqueima\b'],
+        'keywords': 'charge overwhelm warcry low-cost efficient',
+        'terms': ['charge', 'overwhelm', 'warcry', 'quickdraw', 'reckless', 'berserk']
+    },
+    'control': {
+        'triggers': [r'\bcontrol(e|s)?\b', r'\bremovals?\b', r'\bslow\b', r'\bremoç(ão|ões)\b',
+                     r'\blent[oa]s?\b'],
+        'keywords': 'removal sweepers card-draw late-game answers',
+        'terms': ['kill', 'destroy', 'silence', 'damage to a unit', 'draw two', 'return a unit']
+    },
+    'midrange': {
+        'triggers': [r'\bmidrange\b', r'\bvalue\b', r'\bbalanced\b', r'\bvalor\b',
+                     r'\bequilibrad[oa]s?\b'],
+        'keywords': 'efficient-units good-stats value-trades',
+        'terms': ['endurance', 'aegis', 'lifesteal', 'deadly', 'empower']
+    },
+    'combo': {
+        'triggers': [r'\bcombos?\b', r'\bsynerg(y|ies)\b', r'\bengines?\b', r'\bsinergias?\b',
+                     r'\bmotor(es)?\b'],
+        'keywords': 'synergistic combo-pieces enablers payoffs',
+        'terms': ['entomb', 'tribute', 'inspire', 'echo', 'destiny', 'ultimate']
+    }
+}
+
+# Priors vetoriais da query: peso dos centróides somados ao vetor da estratégia
+QUERY_PRIOR_FACTION_WEIGHT = 0.15
+QUERY_PRIOR_ARCHETYPE_WEIGHT = 0.2
+
+# Grafo de sinergia (kNN entre cartas) usado para completar decks
+SYNERGY_NEIGHBORS = 32  # Vizinhos guardados por carta
+SYNERGY_MECHANIC_WEIGHT = 0.05  # Bônus por mecânica compartilhada (somado ao cosseno)
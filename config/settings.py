@@ -20,5 +20,14 @@ class Settings:
     # LangChain Settings
     TEMPERATURE = 0.3
     MAX_TOKENS = 2000
+    
+    # RAG Settings
+    RAG_BACKEND = os.getenv('RAG_BACKEND', 'chroma')  # 'chroma' ou 'numpy'
+    RAG_SEARCH_MODE = os.getenv('RAG_SEARCH_MODE', 'vector')  # 'vector' ou 'hybrid'
+    RAG_INDEX_DTYPE = os.getenv('RAG_INDEX_DTYPE', 'float32')  # 'float32', 'float16' ou 'int8'
+    RAG_KEEP_VERSIONS = int(os.getenv('RAG_KEEP_VERSIONS', '2'))  # versões antigas mantidas para rollback
+    RAG_QUERY_PRIORS = os.getenv('RAG_QUERY_PRIORS', 'vector')  # 'vector' (centróides) ou 'text'
+    RAG_QUERY_ENCODER = os.getenv('RAG_QUERY_ENCODER', 'sentence-transformers')  # ou 'onnx'
+    RAG_ONNX_QUANTIZED = os.getenv('RAG_ONNX_QUANTIZED', 'false').lower() == 'true'  # int8 dinâmico
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""Detecção de cartas dominadas (estritamente piores que outra carta do catálogo)"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from config.constants import CARD_MECHANICS
+from data.card_catalog import MAX_CACHED_CATALOGS, get_catalog_version
+from data.models import Card
+
+# Ordem fixa das colunas de influência na matriz de atributos
+INFLUENCE_ORDER = ['FIRE', 'TIME', 'JUSTICE', 'PRIMAL', 'SHADOW']
+
+# Apenas tipos com stats são comparáveis de forma objetiva
+DOMINANCE_TYPES = ('Unit', 'Weapon')
+
+
+class DominanceReport:
+    """Relações de dominância calculadas para uma versão do catálogo"""
+
+    def __init__(self, version: str, dominated_by: Dict[str, List[str]],
+                 factions: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            version: Versão do catálogo analisado
+            dominated_by: Nome da carta dominada -> nomes das cartas que a dominam
+            factions: Nome da carta dominante -> facções (para o filtro de facções)
+        """
+        self.catalog_version = version
+        self.dominated_by = dominated_by
+        self.factions = factions or {}
+
+    @property
+    def dominated_count(self) -> int:
+        return len(self.dominated_by)
+
+    def is_dominated(self, card: Card) -> bool:
+        return card.name in self.dominated_by
+
+    def _available(self, name: str, allowed_factions: Optional[List[str]],
+                   forbidden_lower: List[str]) -> bool:
+        """Mesmas regras dos filtros de busca: facção permitida (ou neutra) e não proibida"""
+        if any(term in name.lower() for term in forbidden_lower):
+            return False
+        factions = self.factions.get(name, [])
+        return not allowed_factions or not factions or any(f in allowed_factions for f in factions)
+
+    def dominated_names(self,
+                        allowed_factions: Optional[List[str]] = None,
+                        forbidden: Optional[List[str]] = None) -> Set[str]:
+        """
+        Cartas que continuam dominadas com essas restrições
+
+        Uma carta só é dominada se pelo menos uma carta que a domina ainda pode
+        entrar no deck; se todas foram proibidas ou são de facções fora da
+        seleção, a carta pior é a melhor opção disponível.
+        """
+        forbidden_lower = [name.lower() for name in forbidden] if forbidden else []
+        return {
+            name for name, dominators in self.dominated_by.items()
+            if any(self._available(d, allowed_factions, forbidden_lower) for d in dominators)
+        }
+
+    def filter_cards(self,
+                     cards: List[Card],
+                     keep: Optional[List[str]] = None,
+                     allowed_factions: Optional[List[str]] = None,
+                     forbidden: Optional[List[str]] = None) -> List[Card]:
+        """
+        Remove cartas dominadas de uma lista
+
+        Args:
+            cards: Cartas a filtrar
+            keep: Nomes (parciais) que nunca devem ser removidos, ex: cartas obrigatórias
+            allowed_factions: Facções do deck (dominantes de outras facções não contam)
+            forbidden: Nomes (parciais) proibidos (dominantes proibidos não contam)
+        """
+        keep_lower = [name.lower() for name in keep] if keep else []
+        dominated = self.dominated_names(allowed_factions, forbidden)
+
+        return [
+            card for card in cards
+            if card.name not in dominated
+            or any(name in card.name.lower() for name in keep_lower)
+        ]
+
+
+def _mechanics_signature(card: Card) -> Tuple[Tuple[str, ...], str]:
+    """
+    Assinatura de habilidades da carta: keywords + texto residual
+
+    O texto residual (sem as keywords) precisa ser idêntico para que duas
+    cartas sejam comparáveis; assim uma unidade vanilla nunca "domina" outra
+    que tem uma habilidade própria.
+    """
+    text_lower = (card.text or '').lower()
+    keywords = tuple(m for m in CARD_MECHANICS if m in text_lower)
+
+    residual = text_lower
+    for mechanic in keywords:
+        residual = residual.replace(mechanic, ' ')
+    residual = ' '.join(re.sub(r'[^a-z0-9+/ ]', ' ', residual).split())
+
+    return keywords, residual
+
+
+def _stat_matrix(cards: List[Card]) -> np.ndarray:
+    """Matriz (n_cartas, 2 + facções) onde valores maiores são sempre melhores"""
+    matrix = np.zeros((len(cards), 2 + len(INFLUENCE_ORDER)), dtype=np.int16)
+
+    for i, card in enumerate(cards):
+        matrix[i, 0] = card.attack or 0
+        matrix[i, 1] = card.health or 0
+        for j, faction in enumerate(INFLUENCE_ORDER):
+            # Influência é custo: negativa para que "maior" seja melhor
+            matrix[i, 2 + j] = -card.influence.get(faction, 0)
+
+    return matrix
+
+
+def compute_dominance(cards: List[Card]) -> Dict[str, List[str]]:
+    """
+    Calcula quais cartas são estritamente piores que outra
+
+    Cartas são agrupadas por tipo, facções, assinatura de habilidades e
+    custo. Dentro de cada grupo, A domina B se tem ataque, vida e
+    requisitos de influência iguais ou melhores em todas as colunas e
+    é estritamente melhor em pelo menos uma. A comparação é feita por
+    broadcasting NumPy (n x n x colunas) em cada grupo.
+
+    Returns:
+        Dict nome da carta dominada -> nomes das cartas que a dominam
+    """
+    # 🚨 ÂNCORA: DOMINANCE_BUCKETS - Agrupamento para comparação justa
+    # Contexto: Só compara cartas com mesmo tipo, facções, keywords e custo
+    # Cuidado: Afrouxar o agrupamento gera falsos positivos (cartas diferentes)
+    # Dependências: CARD_MECHANICS em config/constants.py
+
+    buckets: Dict[Tuple, List[Card]] = {}
+    seen_names = set()
+
+    for card in cards:
+        if card.card_type not in DOMINANCE_TYPES or card.name in seen_names:
+            continue
+        seen_names.add(card.name)
+
+        key = (card.card_type, tuple(sorted(card.factions)), _mechanics_signature(card), card.cost)
+        buckets.setdefault(key, []).append(card)
+
+    dominated_by: Dict[str, List[str]] = {}
+
+    for bucket in buckets.values():
+        if len(bucket) < 2:
+            continue
+
+        stats = _stat_matrix(bucket)
+
+        # dominates[a, b] = a é >= b em tudo e > b em algo
+        ge = (stats[:, None, :] >= stats[None, :, :]).all(axis=-1)
+        gt = (stats[:, None, :] > stats[None, :, :]).any(axis=-1)
+        dominates = ge & gt
+
+        for b in np.flatnonzero(dominates.any(axis=0)):
+            dominators = np.flatnonzero(dominates[:, b])
+            dominated_by[bucket[b].name] = [bucket[a].name for a in dominators]
+
+    return dominated_by
+
+
+# Cache por versão do catálogo (compartilhado entre sessões), um por catálogo
+_reports: "OrderedDict[str, DominanceReport]" = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def get_dominance_report(cards: List[Card]) -> DominanceReport:
+    """
+    Retorna o relatório de dominância, recalculando só quando o catálogo muda
+
+    Só cartas construíveis entram na comparação: uma carta fora do deck
+    building não pode tornar outra dispensável.
+    """
+    version = get_catalog_version(cards)
+
+    with _reports_lock:
+        report = _reports.get(version)
+        if report is None:
+            buildable = [card for card in cards if card.deck_buildable]
+            report = DominanceReport(
+                version,
+                compute_dominance(buildable),
+                {card.name: list(card.factions) for card in buildable}
+            )
+            _reports[version] = report
+            while len(_reports) > MAX_CACHED_CATALOGS:
+                _reports.popitem(last=False)  # Versão menos usada
+        else:
+            _reports.move_to_end(version)
+
+    return report
@@ -0,0 +1,147 @@
+"""Índice de acesso ao mercado (merchants, smugglers, bargain) por versão do catálogo"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from config.constants import MARKET_ACCESS_NAME_TERMS, MARKET_ACCESS_TEXT_TERMS
+from data.card_catalog import MAX_CACHED_CATALOGS, get_catalog_version
+from data.models import Card
+
+# Ordem de preferência entre cartas de mesmo custo
+MARKET_ACCESS_KINDS = ('merchant', 'smuggler', 'bargain', 'access')
+
+# Chave das cartas sem facção nos agrupamentos por facção
+NEUTRAL = 'NEUTRAL'
+
+
+def market_access_kind_for(name: str, text: str) -> Optional[str]:
+    """
+    Regra única de acesso ao mercado
+
+    Merchants/smugglers (e etchings/marketeers) são reconhecidos pelo nome;
+    demais cartas pelo texto ("your market", bargain). Menções só ao
+    mercado do oponente não dão acesso.
+
+    Returns:
+        Um de MARKET_ACCESS_KINDS, ou None se a carta não acessa o mercado
+    """
+    name_lower = name.lower()
+    for term in MARKET_ACCESS_NAME_TERMS:
+        if term in name_lower:
+            return term if term in ('merchant', 'smuggler') else 'access'
+
+    text_lower = (text or '').lower()
+    if 'bargain' in text_lower:
+        return 'bargain'
+    if any(term in text_lower for term in MARKET_ACCESS_TEXT_TERMS):
+        return 'access'
+    return None
+
+
+def market_access_kind(card: Card) -> Optional[str]:
+    return market_access_kind_for(card.name, card.text)
+
+
+def is_market_access_card(card: Card) -> bool:
+    return market_access_kind(card) is not None
+
+
+def _faction_keys(card: Card) -> List[str]:
+    return list(card.factions) or [NEUTRAL]
+
+
+def _allowed(card: Card, factions: Optional[Iterable[str]]) -> bool:
+    """Mesma regra dos filtros de contexto: alguma facção permitida ou neutra"""
+    return not factions or not card.factions or any(f in factions for f in card.factions)
+
+
+class MarketAccessIndex:
+    """Cartas de acesso ao mercado e candidatas ao mercado de uma versão do catálogo"""
+
+    def __init__(self, version: str, cards: List[Card]):
+        """
+        Args:
+            version: Versão do catálogo analisado
+            cards: Cartas jogáveis do catálogo
+        """
+        self.catalog_version = version
+        self.kinds: Dict[str, str] = {}
+        self.by_kind: Dict[str, List[Card]] = {kind: [] for kind in MARKET_ACCESS_KINDS}
+        self.access_by_faction: Dict[str, List[Card]] = {}
+        self.eligible_by_faction: Dict[str, List[str]] = {}
+
+        for card in cards:
+            kind = market_access_kind(card)
+            if kind is None:
+                # Cartas de acesso só funcionam no deck principal, nunca no mercado
+                for faction in _faction_keys(card):
+                    self.eligible_by_faction.setdefault(faction, []).append(card.name)
+                continue
+
+            if card.name in self.kinds:
+                continue  # Reimpressão
+            self.kinds[card.name] = kind
+            self.by_kind[kind].append(card)
+
+        rank = {kind: position for position, kind in enumerate(MARKET_ACCESS_KINDS)}
+        self.access_cards_by_cost = sorted(
+            (card for cards_of_kind in self.by_kind.values() for card in cards_of_kind),
+            key=lambda card: (card.cost, rank[self.kinds[card.name]])
+        )
+        for card in self.access_cards_by_cost:
+            for faction in _faction_keys(card):
+                self.access_by_faction.setdefault(faction, []).append(card)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def is_access(self, card: Card) -> bool:
+        return card.name in self.kinds
+
+    def kind(self, card: Card) -> Optional[str]:
+        return self.kinds.get(card.name)
+
+    def access_cards(self,
+                     factions: Optional[List[str]] = None,
+                     exclude: Iterable[str] = (),
+                     limit: Optional[int] = None) -> List[Card]:
+        """
+        Cartas de acesso permitidas nas facções, mais baratas primeiro
+
+        Args:
+            factions: Facções permitidas (None = todas)
+            exclude: Nomes a ignorar (ex: já presentes no resultado)
+            limit: Máximo de cartas
+        """
+        excluded = set(exclude)
+        result = [
+            card for card in self.access_cards_by_cost
+            if card.name not in excluded and _allowed(card, factions)
+        ]
+        return result[:limit] if limit is not None else result
+
+    def market_eligible(self, factions: Optional[List[str]] = None) -> List[str]:
+        """Nomes das cartas que podem ir para o mercado (não são de acesso)"""
+        keys = list(factions) + [NEUTRAL] if factions else list(self.eligible_by_faction)
+        return list(dict.fromkeys(name for key in keys for name in self.eligible_by_faction.get(key, [])))
+
+
+# Cache por versão do catálogo (compartilhado entre sessões), um por catálogo
+_indexes: "OrderedDict[str, MarketAccessIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_market_index(cards: List[Card]) -> MarketAccessIndex:
+    """Retorna o índice de mercado, recalculando só quando o catálogo muda"""
+    version = get_catalog_version(cards)
+
+    with _indexes_lock:
+        index = _indexes.get(version)
+        if index is None:
+            index = MarketAccessIndex(version, cards)
+            _indexes[version] = index
+            while len(_indexes) > MAX_CACHED_CATALOGS:
+                _indexes.popitem(last=False)  # Versão menos usada
+        else:
+            _indexes.move_to_end(version)
+
+    return index
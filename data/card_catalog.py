@@ -0,0 +1,77 @@
+"""Utilitários de catálogo: identificação e versionamento das cartas"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+from data.models import Card
+
+# Catálogos distintos mantidos nos caches derivados (ex.: catálogo completo e
+# só as cartas construíveis do builder não se expulsam)
+MAX_CACHED_CATALOGS = 4
+
+# Versões já calculadas por identidade da lista: catálogos são carregados uma
+# vez e trocados por referência, nunca alterados no lugar
+_versions: "OrderedDict[int, Tuple[List[Card], int, str]]" = OrderedDict()
+_versions_lock = threading.Lock()
+
+
+def card_id(card: Card) -> str:
+    """ID estável da carta (mesmo formato usado nos ids do ChromaDB)"""
+    return f"{card.set_number}_{card.eternal_id}_{card.name.replace(' ', '_')}"
+
+
+def card_fingerprint(card: Card) -> Tuple:
+    """Tupla com todos os campos que afetam análises e formatação da carta"""
+    return (
+        card.name,
+        card.cost,
+        card.influence_string or '',
+        card.card_type,
+        tuple(card.factions),
+        card.attack,
+        card.health,
+        card.text,
+        card.rarity,
+        card.set_number,
+        card.eternal_id,
+        card.deck_buildable,
+    )
+
+
+def catalog_version(cards: List[Card]) -> str:
+    """
+    Calcula a versão do catálogo a partir do conteúdo das cartas
+
+    Qualquer alteração em uma carta (custo, texto, stats...) gera uma
+    versão diferente, permitindo invalidar caches derivados do catálogo.
+    """
+    digest = hashlib.sha1()
+    for fingerprint in sorted(repr(card_fingerprint(card)) for card in cards):
+        digest.update(fingerprint.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def get_catalog_version(cards: List[Card]) -> str:
+    """
+    catalog_version() calculada uma vez por lista de cartas
+
+    Chamadas repetidas com a mesma lista (o catálogo carregado) são O(1);
+    uma lista nova ou de tamanho diferente é re-hasheada.
+    """
+    key = id(cards)
+
+    with _versions_lock:
+        entry = _versions.get(key)
+        if entry is not None and entry[0] is cards and entry[1] == len(cards):
+            _versions.move_to_end(key)
+            return entry[2]
+
+    version = catalog_version(cards)
+
+    with _versions_lock:
+        _versions[key] = (cards, len(cards), version)  # Referência impede reuso do id
+        _versions.move_to_end(key)
+        while len(_versions) > MAX_CACHED_CATALOGS:
+            _versions.popitem(last=False)
+
+    return version
@@ -3,6 +3,7 @@ import streamlit as st
 from langchain_openai import ChatOpenAI
 from data.google_sheets_client import GoogleSheetsClient
 from core.deck_validator import DeckValidator
+from utils.card_line_cache import get_card_line_cache
 from config.settings import settings
 from utils.deck_post_processor import DeckPostProcessor
 import json
@@ -71,7 +72,9 @@ validator = DeckValidator()
 @st.cache_data(ttl=3600)
 def load_all_cards():
     client = GoogleSheetsClient()
-    return client.get_all_cards()
+    all_cards = client.get_all_cards()
+    get_card_line_cache().sync(all_cards)
+    return all_cards
 
 # Função para preparar contexto de cartas
 def prepare_cards_context(cards, strategy):
@@ -124,20 +127,8 @@ def prepare_cards_context(cards, strategy):
         "sites": []
     }
     
-    # Função auxiliar para formatar influência
-    def format_influence(card):
-        """Formata influência no estilo {F}{T}{J}"""
-        if not card.influence:
-            return str(card.cost)
-        
-        influence_str = str(card.cost)
-        influence_map = {'FIRE': 'F', 'TIME': 'T', 'JUSTICE': 'J', 'PRIMAL': 'P', 'SHADOW': 'S'}
-        
-        for faction, count in sorted(card.influence.items()):
-            symbol = influence_map.get(faction, '?')
-            influence_str += '{' + symbol + '}' * count
-            
-        return influence_str
+    # Custo + influência pré-formatados (ver utils/card_line_cache.py)
+    format_influence = get_card_line_cache().cost_string
     
     # Scoring para relevância
     def calculate_relevance(card):
@@ -3,6 +3,8 @@ import streamlit as st
 from langchain_openai import ChatOpenAI
 from data.google_sheets_client import GoogleSheetsClient
 from core.deck_validator import DeckValidator
+from utils.card_line_cache import get_card_line_cache
+from core.market_access import is_market_access_card
 from config.settings import settings
 import json
 
@@ -88,31 +90,9 @@ validator = DeckValidator()
 @st.cache_data(ttl=3600)
 def load_all_cards():
     client = GoogleSheetsClient()
-    return client.get_all_cards()
-
-def is_market_access_card(card):
-    """Identifica se uma carta pode acessar o mercado"""
-    if not card.text:
-        return False
-    
-    text_lower = card.text.lower()
-    
-    # Termos que indicam acesso ao mercado
-    market_access_terms = [
-        'your market',
-        'bargain',
-    ]
-    
-    # Verificar se tem algum termo de acesso
-    has_access = any(term in text_lower for term in market_access_terms)
-    
-    # Verificar se é um merchant pelo nome
-    is_merchant = 'merchant' in card.name.lower()
-    
-    # Verificar smugglers (também acessam mercado)
-    is_smuggler = 'smuggler' in card.name.lower()
-    
-    return has_access or is_merchant or is_smuggler
+    all_cards = client.get_all_cards()
+    get_card_line_cache().sync(all_cards)
+    return all_cards
 
 # Função para preparar contexto de cartas ATUALIZADA
 def prepare_cards_context(cards, strategy, filters=None):
@@ -199,27 +179,8 @@ def prepare_cards_context(cards, strategy, filters=None):
             else:
                 st.error(f"❌ Carta '{required_name}' não encontrada de forma alguma na base!")
     
-    # Função auxiliar para formatar influência
-    def format_influence(card):
-        """Formata influência no estilo {F}{T}{J}"""
-        # Usar influence_string se disponível
-        if hasattr(card, 'influence_string') and card.influence_string:
-            return f"{card.cost}{card.influence_string}"
-        
-        # Fallback para o método antigo
-        if not card.influence:
-            return str(card.cost)
-        
-        influence_str = str(card.cost)
-        influence_map = {'FIRE': 'F', 'TIME': 'T', 'JUSTICE': 'J', 'PRIMAL': 'P', 'SHADOW': 'S'}
-        
-        for faction in ['FIRE', 'TIME', 'JUSTICE', 'PRIMAL', 'SHADOW']:
-            if faction in card.influence:
-                count = card.influence[faction]
-                symbol = influence_map[faction]
-                influence_str += '{' + symbol + '}' * count
-                
-        return influence_str
+    # Custo + influência pré-formatados (ver utils/card_line_cache.py)
+    format_influence = get_card_line_cache().cost_string
     
     # Inicializar categorias
     relevant_cards = {
@@ -406,7 +367,7 @@ def prepare_cards_context(cards, strategy, filters=None):
             # 6. IMPORTANTE: Se usar mercado, garantir que temos merchants/smugglers
             if filters['use_market']:
                 # Dar boost para cartas que acessam mercado
-                if any(term in card.text.lower() for term in ['your market', 'smuggler', 'merchant', 'bargain']):
+                if is_market_access_card(card):
                     score += 20  # Boost significativo
             
             # 7. Score mínimo mais permissivo
@@ -506,7 +467,7 @@ def prepare_cards_context(cards, strategy, filters=None):
         market_access_cards = []
         for category in relevant_cards.values():
             for card in category:
-                if any(term in card.text.lower() for term in ['your market', 'smuggler', 'merchant', 'bargain']):
+                if is_market_access_card(card):
                     market_access_cards.append(card)
         
         if market_access_cards:
@@ -7,7 +7,6 @@ Dependências: OpenAI, Streamlit, ChromaDB, Google Sheets
 
 import streamlit as st
 import sys
-import time
 from typing import List, Optional, Dict, Tuple
 from dotenv import load_dotenv
 
@@ -19,7 +18,9 @@ from langchain_openai import ChatOpenAI
 from data.google_sheets_client import GoogleSheetsClient
 from core.deck_validator import DeckValidator
 from config.settings import settings
-from config.constants import FACTIONS
+from config.constants import CONTEXT_TYPE_QUOTAS, FACTIONS
+from utils.card_line_cache import get_card_line_cache
+from core.market_access import get_market_index
 import json
 
 # Carregar variáveis de ambiente
@@ -109,10 +110,39 @@ def create_llm(model_key):
 def get_sheets_client():
     return GoogleSheetsClient()
 
+def load_playable_cards(client):
+    """Carrega o catálogo e sincroniza o cache de linhas de contexto"""
+    all_cards = client.get_all_cards()
+    get_card_line_cache().sync(all_cards)
+    return all_cards
+
 @st.cache_resource
 def get_validator():
     return DeckValidator()
 
+@st.fragment(run_every=2)
+def show_index_build_progress():
+    """Progresso do build do índice RAG em segundo plano (atualiza sozinho)"""
+    from rag.index_build_job import read_build_job
+    
+    job = read_build_job()
+    if job.get('status') != 'running':
+        # Build terminou: rerun completo para atualizar o status do RAG (o
+        # searcher compartilhado recarrega o catálogo se a versão ativa mudou)
+        st.rerun()
+    
+    if job['total']:
+        st.progress(
+            min(job['done'] / job['total'], 1.0),
+            text=f"🔧 {job['phase']}: {job['done']:,}/{job['total']:,} cartas"
+        )
+    else:
+        st.progress(0.0, text=f"🔧 {job['phase']}...")
+    
+    if job.get('cards_per_second'):
+        eta = f" - ETA {job['eta_seconds']:.0f}s" if job.get('eta_seconds') else ""
+        st.caption(f"{job['cards_per_second']:.0f} cartas/s{eta}")
+
 # ===============================================
 # SIDEBAR - FILTROS E CONFIGURAÇÕES
 # ===============================================
@@ -219,6 +249,13 @@ with st.sidebar:
         help="Filtrado: ~100 cartas relevantes | Completo: 500+ cartas"
     ) == "Filtrar cartas relevantes"
     
+    # 7. Remover cartas dominadas
+    remove_dominated = st.checkbox(
+        "🧹 Remover cartas dominadas",
+        value=False,
+        help="Remove cartas estritamente piores que outra do mesmo tipo, facções e keywords"
+    )
+    
     # ===============================================
     # CONFIGURAÇÃO RAG
     # ===============================================
@@ -232,14 +269,22 @@ with st.sidebar:
         help="Usa IA para encontrar as cartas mais relevantes para sua estratégia"
     )
     
-    # Verificar status do RAG
+    hybrid_search = st.checkbox(
+        "🔀 Busca híbrida (BM25 + semântica)",
+        value=False,
+        disabled=not use_rag,
+        help="Combina palavras exatas (Warcry, Killer, nomes de cartas) com a busca semântica"
+    )
+    
+    # Verificar status do RAG (leitura do metadata, sem carregar modelo/catálogo)
     if use_rag:
         try:
-            from rag.semantic_search import create_semantic_search
-            from rag.chromadb_setup import ChromaDBManager
+            from rag.index_status import get_rag_status, rag_dependencies_installed
+            
+            if not rag_dependencies_installed():
+                raise ImportError("chromadb/sentence-transformers")
             
-            searcher = create_semantic_search()
-            stats = searcher.get_search_statistics()
+            stats = get_rag_status()
             
             if stats['chromadb_status'] == 'ready':
                 st.success(f"✅ RAG ativo: {stats['total_embeddings']:,} cartas indexadas")
@@ -251,16 +296,31 @@ with st.sidebar:
                         st.caption(f"Índice criado: {created[:10]}")
             else:
                 st.warning("⚠️ RAG não inicializado")
-                
-                if st.button("🔧 Inicializar RAG", type="primary", use_container_width=True):
-                    with st.spinner("Criando embeddings... (2-3 minutos)"):
-                        manager = ChromaDBManager()
-                        result = manager.setup_card_embeddings()
-                        st.success(f"✅ {result['embedded_cards']:,} cartas indexadas!")
-                        time.sleep(1)
-                        st.rerun()
-                
                 use_rag = False
+            
+            # 🚨 ÂNCORA: BACKGROUND_INDEX_BUILD - Build fora do script do Streamlit
+            # Contexto: Subprocesso sobrevive a reruns/abas fechadas; a versão ativa
+            #           continua servindo até a troca do ponteiro
+            # Cuidado: Só um build por vez (start_build_job devolve o que já roda)
+            # Dependências: rag/index_build_job.py
+            from rag.index_build_job import read_build_job, start_build_job
+            
+            build_job = read_build_job()
+            if build_job.get('status') == 'running':
+                show_index_build_progress()
+            else:
+                if build_job.get('status') == 'failed':
+                    st.error(f"❌ Último build falhou: {build_job.get('error')}")
+                
+                rag_ready = stats['chromadb_status'] == 'ready'
+                if st.button(
+                    "🔄 Reconstruir índice" if rag_ready else "🔧 Inicializar RAG",
+                    type="secondary" if rag_ready else "primary",
+                    use_container_width=True,
+                    help="Roda em segundo plano; a busca atual continua funcionando"
+                ):
+                    start_build_job(force_recreate=True)
+                    st.rerun()
                 
         except ImportError:
             st.error("❌ Módulos RAG não instalados")
@@ -301,7 +361,8 @@ with st.sidebar:
 
 def prepare_cards_context(strategy, allowed_factions=None, use_market=False, 
                          required_cards=None, forbidden_cards=None, 
-                         use_filtering=True, use_rag=True):
+                         use_filtering=True, use_rag=True, remove_dominated=False,
+                         search_mode='vector'):
     """
     🚨 ÂNCORA: RAG_CONTEXT - Preparação de contexto principal
     Contexto: Usa RAG quando disponível, fallback para tradicional
@@ -318,28 +379,64 @@ def prepare_cards_context(strategy, allowed_factions=None, use_market=False,
     # Tentar usar RAG
     if use_rag and use_filtering:
         try:
-            from rag.semantic_search import create_semantic_search
+            from rag.index_status import get_rag_status
             
-            searcher = create_semantic_search()
-            stats = searcher.get_search_statistics()
-            
-            if stats['chromadb_status'] == 'ready':
+            if get_rag_status()['chromadb_status'] == 'ready':
+                from rag.semantic_search import get_shared_semantic_search
+                
+                searcher = get_shared_semantic_search()
+                
                 if debug_mode:
                     st.info("🚀 Usando busca semântica RAG...")
                 
                 # Buscar cartas via RAG
-                relevant_cards = searcher.search_cards_for_strategy(
-                    strategy=strategy,
-                    allowed_factions=allowed_factions,
-                    use_market=use_market,
-                    required_cards=required_cards,
-                    forbidden_cards=forbidden_cards,
-                    max_results=80
-                )
+                if search_mode == 'vector':
+                    # Uma query por tipo: cada seção do contexto recebe sua cota cheia
+                    cards_by_type = searcher.search_scored_cards_by_type(
+                        strategy,
+                        allowed_factions=allowed_factions,
+                        use_market=use_market,
+                        required_cards=required_cards,
+                        forbidden_cards=forbidden_cards,
+                        quotas=CONTEXT_TYPE_QUOTAS,
+                        exclude_dominated=remove_dominated
+                    )
+                    relevant_cards = [
+                        scored.card for cards in cards_by_type.values() for scored in cards
+                    ]
+                else:
+                    relevant_cards = searcher.search_cards_for_strategy(
+                        strategy=strategy,
+                        allowed_factions=allowed_factions,
+                        use_market=use_market,
+                        required_cards=required_cards,
+                        forbidden_cards=forbidden_cards,
+                        max_results=80,
+                        exclude_dominated=remove_dominated,
+                        search_mode=search_mode
+                    )
+                
+                if debug_mode and search_mode == 'vector':
+                    timings = searcher.last_search_timings
+                    st.caption(
+                        "⏱️ " + " | ".join(
+                            f"{category} {timings.get(f'{category}_ms', 0):.0f}ms"
+                            for category in CONTEXT_TYPE_QUOTAS
+                        ) + f" | Total {timings.get('total_ms', 0):.0f}ms"
+                    )
+                
+                if debug_mode and search_mode == 'hybrid':
+                    timings = searcher.last_search_timings
+                    st.caption(
+                        f"⏱️ Vetorial {timings.get('vector_ms', 0):.0f}ms | "
+                        f"BM25 {timings.get('lexical_ms', 0):.0f}ms | "
+                        f"Fusão {timings.get('fusion_ms', 0):.1f}ms | "
+                        f"Total {timings.get('total_ms', 0):.0f}ms"
+                    )
                 
                 return format_cards_context_from_rag(
                     relevant_cards, strategy, required_cards, 
-                    forbidden_cards, use_market
+                    forbidden_cards, use_market, searcher.market_index
                 )
                 
         except Exception as e:
@@ -349,13 +446,16 @@ def prepare_cards_context(strategy, allowed_factions=None, use_market=False,
     # Fallback para método tradicional
     return prepare_cards_context_traditional(
         client, strategy, allowed_factions, use_market, 
-        required_cards, forbidden_cards
+        required_cards, forbidden_cards, remove_dominated
     )
 
 def format_cards_context_from_rag(cards, strategy, required_cards, 
-                                 forbidden_cards, use_market):
+                                 forbidden_cards, use_market, market_index):
     """Formata contexto a partir dos resultados RAG"""
     
+    # Linhas pré-renderizadas por carta (ver utils/card_line_cache.py)
+    line_cache = get_card_line_cache()
+    
     # Separar por tipo
     units = []
     spells = []
@@ -365,44 +465,20 @@ def format_cards_context_from_rag(cards, strategy, required_cards,
     markets = []
     
     for card in cards:
-        # Usar influence_string diretamente da planilha
-        influence = card.influence_string or ""
-        
         if card.is_unit:
-            info = f"• {card.name} | {card.cost}{influence} | {card.attack}/{card.health} | {card.rarity}"
-            if card.card_text:
-                info += f" | {card.card_text}"
-            units.append(info)
-            
+            units.append(line_cache.line(card, 'full'))
         elif card.is_power:
-            info = f"• {card.name} | {card.cost}{influence}"
-            if card.card_text:
-                info += f" | {card.card_text}"
-            powers.append(info)
-            
-        elif 'Spell' in card.type:
-            info = f"• {card.name} | {card.cost}{influence} | {card.rarity}"
-            if card.card_text:
-                info += f" | {card.card_text}"
-            spells.append(info)
-            
-        elif 'Weapon' in card.type:
-            stats = f"+{card.attack}/+{card.health}" if card.attack else ""
-            info = f"• {card.name} | {card.cost}{influence} | {stats} | {card.rarity}"
-            if card.card_text:
-                info += f" | {card.card_text}"
-            weapons.append(info)
-            
-        elif 'Relic' in card.type:
-            info = f"• {card.name} | {card.cost}{influence} | {card.rarity}"
-            if card.card_text:
-                info += f" | {card.card_text}"
-            relics.append(info)
+            powers.append(line_cache.line(card, 'full'))
+        elif 'Spell' in card.card_type:
+            spells.append(line_cache.line(card, 'full'))
+        elif 'Weapon' in card.card_type:
+            weapons.append(line_cache.line(card, 'full'))
+        elif 'Relic' in card.card_type:
+            relics.append(line_cache.line(card, 'full'))
         
-        # Detectar merchants
-        if card.card_text and any(term in card.card_text.lower() 
-                                for term in ['market', 'merchant', 'smuggler', 'etchings']):
-            markets.append(f"• {card.name} | {card.cost}{influence} | {card.card_text}")
+        # Detectar merchants (índice de mercado do catálogo)
+        if market_index.is_access(card):
+            markets.append(line_cache.line(card, 'market'))
     
     # Construir contexto
     parts = []
@@ -415,27 +491,27 @@ def format_cards_context_from_rag(cards, strategy, required_cards,
     
     if units:
         parts.append(f"=== UNIDADES ({len(units)}) ===")
-        parts.extend(units[:30])
+        parts.extend(units[:CONTEXT_TYPE_QUOTAS['units']])
         parts.append("")
     
     if spells:
         parts.append(f"=== SPELLS ({len(spells)}) ===")
-        parts.extend(spells[:20])
+        parts.extend(spells[:CONTEXT_TYPE_QUOTAS['spells']])
         parts.append("")
     
     if weapons:
         parts.append(f"=== WEAPONS ({len(weapons)}) ===")
-        parts.extend(weapons[:10])
+        parts.extend(weapons[:CONTEXT_TYPE_QUOTAS['weapons']])
         parts.append("")
     
     if relics:
         parts.append(f"=== RELICS ({len(relics)}) ===")
-        parts.extend(relics[:10])
+        parts.extend(relics[:CONTEXT_TYPE_QUOTAS['relics']])
         parts.append("")
     
     if powers:
         parts.append(f"=== POWERS ({len(powers)}) ===")
-        parts.extend(powers[:15])
+        parts.extend(powers[:CONTEXT_TYPE_QUOTAS['powers']])
         parts.append("")
     
     if use_market and markets:
@@ -460,7 +536,8 @@ def format_cards_context_from_rag(cards, strategy, required_cards,
     return "\n".join(parts)
 
 def prepare_cards_context_traditional(client, strategy, allowed_factions, 
-                                    use_market, required_cards, forbidden_cards):
+                                    use_market, required_cards, forbidden_cards,
+                                    remove_dominated=False):
     """
     🚨 ÂNCORA: TRADITIONAL_CONTEXT - Método tradicional de filtragem
     Contexto: Usado quando RAG não está disponível
@@ -469,7 +546,8 @@ def prepare_cards_context_traditional(client, strategy, allowed_factions,
     """
     
     # Buscar todas as cartas
-    all_cards = client.get_all_cards()
+    all_cards = load_playable_cards(client)
+    market_index = get_market_index(all_cards)
     
     # Filtrar jogáveis
     playable_cards = [c for c in all_cards if c.deck_buildable]
@@ -490,6 +568,15 @@ def prepare_cards_context_traditional(client, strategy, allowed_factions,
                          if not any(f.lower() in c.name.lower() 
                                    for f in forbidden_cards)]
     
+    # Remover cartas estritamente piores (nunca remove obrigatórias)
+    if remove_dominated:
+        from core.card_dominance import get_dominance_report
+        
+        report = get_dominance_report(all_cards)
+        playable_cards = report.filter_cards(playable_cards, keep=required_cards,
+                                             allowed_factions=allowed_factions,
+                                             forbidden=forbidden_cards)
+    
     # Detectar arquétipo da estratégia
     strategy_lower = strategy.lower()
     is_aggro = any(word in strategy_lower for word in ['aggro', 'aggressive', 'fast', 'rush'])
@@ -504,8 +591,8 @@ def prepare_cards_context_traditional(client, strategy, allowed_factions,
         score = 0
         
         # Score baseado no texto da carta
-        if card.card_text:
-            text_lower = card.card_text.lower()
+        if card.text:
+            text_lower = card.text.lower()
             
             # Aggro scoring
             if is_aggro:
@@ -530,7 +617,7 @@ def prepare_cards_context_traditional(client, strategy, allowed_factions,
                     score += 2
             
             # Mercado
-            if use_market and any(kw in text_lower for kw in ['market', 'merchant', 'smuggler']):
+            if use_market and market_index.is_access(card):
                 score += 10
         
         # Score por tipo e custo
@@ -569,20 +656,21 @@ def prepare_cards_context_traditional(client, strategy, allowed_factions,
     
     # Formatar contexto
     return format_traditional_context(top_cards, strategy, required_cards, 
-                                    forbidden_cards, use_market)
+                                    forbidden_cards, use_market, market_index)
 
 def format_traditional_context(cards, strategy, required_cards, 
-                             forbidden_cards, use_market):
+                             forbidden_cards, use_market, market_index):
     """Formata contexto tradicional"""
     
+    line_cache = get_card_line_cache()
+    
     # Separar por tipo
     units = [c for c in cards if c.is_unit]
-    spells = [c for c in cards if 'Spell' in c.type]
+    spells = [c for c in cards if 'Spell' in c.card_type]
     powers = [c for c in cards if c.is_power]
-    weapons = [c for c in cards if 'Weapon' in c.type]
-    relics = [c for c in cards if 'Relic' in c.type]
-    markets = [c for c in cards if c.card_text and 
-               any(term in c.card_text.lower() for term in ['market', 'merchant'])]
+    weapons = [c for c in cards if 'Weapon' in c.card_type]
+    relics = [c for c in cards if 'Relic' in c.card_type]
+    markets = [c for c in cards if market_index.is_access(c)]
     
     parts = []
     parts.append(f"=== ESTRATÉGIA SOLICITADA ===")
@@ -593,44 +681,32 @@ def format_traditional_context(cards, strategy, required_cards,
     
     if units:
         parts.append(f"=== UNIDADES ({len(units)}) ===")
-        for card in units[:40]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence} | {card.attack}/{card.health} | {card.rarity}")
+        parts.extend(line_cache.lines(units[:40], 'compact'))
     
     if spells:
         parts.append("")
         parts.append(f"=== SPELLS ({len(spells)}) ===")
-        for card in spells[:25]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence} | {card.rarity}")
+        parts.extend(line_cache.lines(spells[:25], 'compact'))
     
     if weapons:
         parts.append("")
         parts.append(f"=== WEAPONS ({len(weapons)}) ===")
-        for card in weapons[:10]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence} | {card.rarity}")
+        parts.extend(line_cache.lines(weapons[:10], 'compact'))
     
     if relics:
         parts.append("")
         parts.append(f"=== RELICS ({len(relics)}) ===")
-        for card in relics[:10]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence} | {card.rarity}")
+        parts.extend(line_cache.lines(relics[:10], 'compact'))
     
     if powers:
         parts.append("")
         parts.append(f"=== POWERS ({len(powers)}) ===")
-        for card in powers[:20]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence}")
+        parts.extend(line_cache.lines(powers[:20], 'compact'))
     
     if use_market and markets:
         parts.append("")
         parts.append(f"=== MERCHANTS/MARKET ACCESS ({len(markets)}) ===")
-        for card in markets[:5]:
-            influence = card.influence_string or ""
-            parts.append(f"• {card.name} | {card.cost}{influence}")
+        parts.extend(line_cache.lines(markets[:5], 'market_compact'))
     
     if required_cards:
         parts.append("")
@@ -650,13 +726,13 @@ def format_traditional_context(cards, strategy, required_cards,
 
 def prepare_all_cards_context(client):
     """Contexto com todas as cartas (sem filtro)"""
-    all_cards = client.get_all_cards()
+    all_cards = load_playable_cards(client)
     playable = [c for c in all_cards if c.deck_buildable]
     
     return format_traditional_context(
         playable[:250], 
         "Todas as cartas disponíveis",
-        None, None, False
+        None, None, False, get_market_index(all_cards)
     )
 
 # ===============================================
@@ -793,7 +869,9 @@ if generate_button:
                 required_cards=required_cards,
                 forbidden_cards=forbidden_cards,
                 use_filtering=use_filtering,
-                use_rag=use_rag
+                use_rag=use_rag,
+                remove_dominated=remove_dominated,
+                search_mode='hybrid' if hybrid_search else 'vector'
             )
             
             # Debug info
@@ -0,0 +1,151 @@
+# rag/benchmark_encoder.py
+"""
+🚨 ÂNCORA: ENCODER_BENCHMARK - sentence-transformers vs ONNX Runtime (float32/int8)
+Contexto: Decide o RAG_QUERY_ENCODER dos nós: latência p50/p99 de uma query,
+          tempo de startup (processo novo: imports + modelo + 1º encode) e
+          concordância (cosseno) com os vetores do índice
+Cuidado: Startup medido em subprocesso - torch já importado contaminaria a medida;
+         requer o export ONNX (python -m rag.onnx_encoder)
+Dependências: rag/onnx_encoder.py, rag/embeddings.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from typing import Dict, List
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.embeddings import EMBEDDING_MODEL_NAME, get_embedding_function
+from rag.onnx_encoder import (
+    ONNX_CONFIG_FILENAME, VALIDATION_TEXTS, OnnxQueryEncoder, cosine_agreement, onnx_model_directory
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código executado em processo novo para medir o startup de cada backend
+STARTUP_SNIPPETS = {
+    'sentence-transformers': (
+        "from rag.embeddings import get_embedding_function\n"
+        "encoder = get_embedding_function()\n"
+    ),
+    'onnx': (
+        "from rag.onnx_encoder import OnnxQueryEncoder\n"
+        "encoder = OnnxQueryEncoder()\n"
+    ),
+    'onnx-int8': (
+        "from rag.onnx_encoder import OnnxQueryEncoder\n"
+        "encoder = OnnxQueryEncoder(quantized=True)\n"
+    ),
+}
+
+
+def available_backends(model_name: str = EMBEDDING_MODEL_NAME) -> List[str]:
+    """Backends com export disponível (sentence-transformers sempre)"""
+    backends = ['sentence-transformers']
+    config_path = os.path.join(onnx_model_directory(model_name), ONNX_CONFIG_FILENAME)
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            validation = json.load(f).get('validation', {})
+        backends += [
+            'onnx' if variant == 'float32' else 'onnx-int8'
+            for variant in ('float32', 'int8') if variant in validation
+        ]
+    return backends
+
+
+def make_encoder(backend: str):
+    if backend == 'sentence-transformers':
+        return get_embedding_function()
+    return OnnxQueryEncoder(quantized=backend == 'onnx-int8', allow_unvalidated=True)
+
+
+def measure_startup(backend: str) -> float:
+    """Milissegundos até o 1º encode em um processo Python novo"""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        + STARTUP_SNIPPETS[backend] +
+        "encoder.encode(['warmup query'])\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_latency(encoder, queries: List[str], repeats: int) -> Dict[str, float]:
+    """Latência de encode de uma query por vez (modelo já carregado)"""
+    encoder.encode(queries[:1])  # aquecimento
+
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            encoder.encode([query])
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'mean_ms': float(np.mean(timings))
+    }
+
+
+def run_benchmark(repeats: int = 20, include_startup: bool = True) -> Dict:
+    """
+    Compara os backends disponíveis
+
+    Returns:
+        {'queries': N, 'backends': {backend: {p50_ms, p99_ms, startup_ms, min_cosine, ...}}}
+    """
+    queries = VALIDATION_TEXTS
+    reference = None
+    report = {'queries': len(queries) * repeats, 'backends': {}}
+
+    for backend in available_backends():
+        encoder = make_encoder(backend)
+        row = measure_latency(encoder, queries, repeats)
+
+        vectors = encoder.encode(queries)
+        if reference is None:
+            reference = vectors
+        row.update(cosine_agreement(reference, vectors))
+
+        if include_startup:
+            row['startup_ms'] = measure_startup(backend)
+
+        report['backends'][backend] = row
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do encoder de queries")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--no-startup', action='store_true', help="Não mede startup em processo novo")
+    parser.add_argument('--json', help="Grava o relatório neste arquivo")
+    args = parser.parse_args()
+
+    print("⏱️ Benchmark do encoder de queries")
+    report = run_benchmark(args.repeats, include_startup=not args.no_startup)
+
+    print(f"\nQueries codificadas por backend: {report['queries']}")
+    print(f"\n{'Backend':<24}{'p50':>9}{'p99':>10}{'startup':>11}{'cos mín':>10}")
+    for backend, row in report['backends'].items():
+        startup = f"{row['startup_ms']:>9.0f}ms" if 'startup_ms' in row else f"{'-':>11}"
+        print(f"{backend:<24}{row['p50_ms']:>7.2f}ms{row['p99_ms']:>8.2f}ms{startup}{row['min_cosine']:>10.5f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRelatório salvo em {args.json}")
@@ -0,0 +1,126 @@
+# rag/benchmark_index.py
+"""
+🚨 ÂNCORA: INDEX_BENCHMARK - Latência ChromaDB (HNSW) vs índice NumPy (exato)
+Contexto: Decide qual backend usar em RAG_BACKEND para o tamanho atual do catálogo
+Cuidado: Requer a coleção já criada (python rag/chromadb_setup.py)
+Dependências: ChromaDBManager, NumpyVectorIndex
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.chromadb_setup import ChromaDBManager
+from rag.numpy_index import NumpyVectorIndex
+
+BENCHMARK_QUERIES = [
+    "aggressive fire creatures with charge",
+    "control deck with removal and card draw",
+    "flying units with aegis",
+    "ramp strategies with big creatures",
+    "lifesteal units and healing",
+    "void recursion and graveyard value",
+    "cheap spells that deal damage to units",
+    "weapons and relic weapons for aggro"
+]
+
+BENCHMARK_FILTERS = {
+    'sem filtro': None,
+    'sem mercado': {"is_market": False},
+    'custo 1-3': {"$and": [{"cost": {"$gte": 1}}, {"cost": {"$lte": 3}}]}
+}
+
+
+def _time_queries(search: Callable[[np.ndarray], Dict], queries: np.ndarray, repeats: int) -> List[float]:
+    """Latências (ms) de cada query individual"""
+    latencies = []
+    for _ in range(repeats):
+        for query in queries:
+            t0 = time.perf_counter()
+            search(query[np.newaxis, :])
+            latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def run_benchmark(n_results: int = 60, repeats: int = 20, dtype: str = 'float32') -> Dict:
+    """
+    Compara latência e sobreposição dos top-k entre os dois backends
+
+    Returns:
+        Dict por filtro com p50/p95 de cada backend e overlap@k
+    """
+    manager = ChromaDBManager(backend='chroma')
+    collection = manager._get_collection()
+
+    t0 = time.perf_counter()
+    index = NumpyVectorIndex.from_collection(collection, dtype=dtype)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    queries = manager.encode_queries(BENCHMARK_QUERIES)
+
+    report = {
+        'cards': len(index),
+        'dtype': dtype,
+        'numpy_build_ms': build_ms,
+        'numpy_matrix_mb': index.nbytes / 1024 / 1024,
+        'filters': {}
+    }
+
+    for label, where in BENCHMARK_FILTERS.items():
+        def chroma_search(query, where=where):
+            return collection.query(
+                query_embeddings=query.tolist(),
+                n_results=n_results,
+                where=where,
+                include=["metadatas", "distances"]
+            )
+
+        def numpy_search(query, where=where):
+            return index.query(query, n_results=n_results, where=where,
+                               include=["metadatas", "distances"])
+
+        # Aquecimento (carrega HNSW/SQLite e caches)
+        chroma_search(queries[:1])
+        numpy_search(queries[:1])
+
+        chroma_latencies = _time_queries(chroma_search, queries, repeats)
+        numpy_latencies = _time_queries(numpy_search, queries, repeats)
+
+        overlaps = []
+        for query in queries:
+            chroma_ids = set(chroma_search(query[np.newaxis, :])['ids'][0])
+            numpy_ids = set(numpy_search(query[np.newaxis, :])['ids'][0])
+            if numpy_ids:
+                overlaps.append(len(chroma_ids & numpy_ids) / len(numpy_ids))
+
+        report['filters'][label] = {
+            'chroma_p50_ms': float(np.percentile(chroma_latencies, 50)),
+            'chroma_p95_ms': float(np.percentile(chroma_latencies, 95)),
+            'numpy_p50_ms': float(np.percentile(numpy_latencies, 50)),
+            'numpy_p95_ms': float(np.percentile(numpy_latencies, 95)),
+            'overlap_at_k': float(np.mean(overlaps)) if overlaps else 0.0
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ChromaDB vs índice NumPy")
+    parser.add_argument('--n-results', type=int, default=60)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+    args = parser.parse_args()
+
+    print("⏱️ Benchmark de busca vetorial: ChromaDB vs NumPy")
+    report = run_benchmark(args.n_results, args.repeats, args.dtype)
+
+    print(f"\nCartas: {report['cards']} | dtype: {report['dtype']} | "
+          f"matriz: {report['numpy_matrix_mb']:.2f} MB | build: {report['numpy_build_ms']:.0f} ms")
+    print(f"\n{'Filtro':<14}{'Chroma p50':>12}{'p95':>9}{'NumPy p50':>12}{'p95':>9}{'overlap@k':>11}")
+    for label, row in report['filters'].items():
+        print(f"{label:<14}{row['chroma_p50_ms']:>10.2f}ms{row['chroma_p95_ms']:>7.2f}ms"
+              f"{row['numpy_p50_ms']:>10.2f}ms{row['numpy_p95_ms']:>7.2f}ms{row['overlap_at_k']:>11.1%}")
@@ -0,0 +1,144 @@
+# rag/benchmark_query_priors.py
+"""
+🚨 ÂNCORA: QUERY_PRIORS_BENCHMARK - Priors vetoriais vs enriquecimento textual
+Contexto: Decide o RAG_QUERY_PRIORS: latência de encode da query (texto
+          enriquecido vs estratégia crua + centróides), tamanho da query e
+          qualidade da busca vetorial (recall@k/nDCG@k) nas estratégias fixas
+          de rag/benchmark_retrieval.py
+Cuidado: Encode medido direto no encoder (sem o cache LRU de queries); sem
+         arquivo de rótulos só latência e sobreposição entre os modos
+Dependências: rag/benchmark_retrieval.py, rag/query_priors.py, SemanticCardSearch
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.benchmark_retrieval import (
+    BENCHMARK_STRATEGIES, DEFAULT_LABELS_PATH, benchmark_mode, latency_summary,
+    load_labels, make_mode_search, mode_overlap
+)
+
+PRIORS_MODES = ('text', 'vector')
+
+
+def query_lengths(queries: Sequence[str]) -> Dict[str, float]:
+    """Tamanho médio das queries codificadas (caracteres e palavras)"""
+    if not queries:
+        return {'chars': 0.0, 'words': 0.0}
+    return {
+        'chars': float(np.mean([len(query) for query in queries])),
+        'words': float(np.mean([len(query.split()) for query in queries]))
+    }
+
+
+def measure_encode(encode: Callable[[Dict], np.ndarray],
+                   strategies: List[Dict],
+                   repeats: int) -> Dict[str, float]:
+    """Latência de `encode` por estratégia (uma query por vez, modelo já carregado)"""
+    encode(strategies[0])  # aquecimento
+
+    timings = []
+    for _ in range(repeats):
+        for item in strategies:
+            start = time.perf_counter()
+            encode(item)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return latency_summary(timings)
+
+
+def run_benchmark(k: int = 50,
+                  repeats: int = 5,
+                  labels_path: str = DEFAULT_LABELS_PATH,
+                  strategies: Optional[List[Dict]] = None) -> Dict:
+    """
+    Compara os dois modos de priors na busca vetorial
+
+    Returns:
+        {'k', 'cards', 'modes': {'text'|'vector': {'encode', 'query_length',
+         'cold', 'warm', 'quality', ...}}, 'overlap_with_text'}
+    """
+    from rag.semantic_search import SemanticCardSearch
+
+    strategies = strategies or BENCHMARK_STRATEGIES
+    labels = load_labels(labels_path)
+
+    searcher = SemanticCardSearch(search_mode='vector')
+    manager = searcher.chromadb_manager
+    encoder = manager.query_encoder
+    priors = manager.get_query_priors()
+    cards = searcher._all_cards
+
+    encoders = {
+        'text': lambda item: encoder.encode(
+            [searcher._enrich_strategy_query(item['strategy'], item['factions'])]
+        )[0],
+        'vector': lambda item: priors.apply(
+            encoder.encode([item['strategy']])[0], item['strategy'], item['factions']
+        ),
+    }
+    encoded_queries = {
+        'text': [searcher._enrich_strategy_query(item['strategy'], item['factions']) for item in strategies],
+        'vector': [item['strategy'] for item in strategies],
+    }
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'k': k,
+        'repeats': repeats,
+        'cards': len(cards),
+        'strategies': len(strategies),
+        'labelled_strategies': sum(1 for item in strategies if labels.get(item['id'])),
+        'prior_counts': priors.counts,
+        'modes': {}
+    }
+
+    for mode in PRIORS_MODES:
+        searcher.query_priors = mode
+        row = benchmark_mode(
+            make_mode_search('vector', searcher, cards, k),
+            strategies, labels, k, repeats, measure_memory=False
+        )
+        row['encode'] = measure_encode(encoders[mode], strategies, repeats)
+        row['query_length'] = query_lengths(encoded_queries[mode])
+        report['modes'][mode] = row
+
+    report['overlap_with_text'] = mode_overlap(report, 'text', k)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos priors da query: vetoriais vs texto")
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--labels', default=DEFAULT_LABELS_PATH,
+                        help="JSON {id da estratégia: [cartas relevantes]}")
+    parser.add_argument('--json', help="Grava o relatório neste arquivo")
+    args = parser.parse_args()
+
+    print("⏱️ Benchmark dos priors da query: enriquecimento textual vs centróides")
+    report = run_benchmark(args.k, args.repeats, args.labels)
+
+    print(f"\nCartas: {report['cards']} | estratégias: {report['strategies']} "
+          f"(rotuladas: {report['labelled_strategies']})")
+    print(f"\n{'Priors':<9}{'palavras':>10}{'encode p50':>12}{'p99':>9}{'busca fria':>12}"
+          f"{'quente':>10}{'recall':>8}{'nDCG':>7}{'∩text':>8}")
+    for mode, row in report['modes'].items():
+        quality = row.get('quality', {})
+        recall = quality.get(f"recall@{report['k']}")
+        ndcg = quality.get(f"ndcg@{report['k']}")
+        print(f"{mode:<9}{row['query_length']['words']:>10.1f}{row['encode']['p50_ms']:>10.2f}ms"
+              f"{row['encode']['p99_ms']:>7.2f}ms{row['cold']['p50_ms']:>10.1f}ms{row['warm']['p50_ms']:>8.1f}ms"
+              f"{recall if recall is not None else '-':>8.3}{ndcg if ndcg is not None else '-':>7.3}"
+              f"{report['overlap_with_text'].get(mode, 0.0):>8.1%}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRelatório salvo em {args.json}")
@@ -0,0 +1,361 @@
+# rag/benchmark_retrieval.py
+"""
+🚨 ÂNCORA: RETRIEVAL_BENCHMARK - Qualidade e latência dos modos de busca (sem Streamlit)
+Contexto: Versão headless de test_rag_comparison.py: estratégias fixas por
+          arquétipo/facções, recall@k e nDCG@k contra cartas rotuladas à mão,
+          latência p50/p95/p99 (fria e quente) e memória por modo, em JSON
+          para comparar execuções
+Cuidado: Requer a coleção já criada; sem arquivo de rótulos só latência,
+         memória e sobreposição entre modos são medidas. Medição de memória
+         roda em passada separada (tracemalloc distorce a latência)
+Dependências: SemanticCardSearch, rag/query_cache.py, GoogleSheetsClient.search_cards
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from data.google_sheets_client import GoogleSheetsClient
+from data.models import Card
+from rag.query_cache import get_query_cache
+
+DEFAULT_LABELS_PATH = "./data/retrieval_labels.json"
+RETRIEVAL_MODES = ('traditional', 'vector', 'hybrid', 'quota')
+
+# Combinações de facções por arquétipo (ids estáveis: chaves do arquivo de rótulos)
+BENCHMARK_STRATEGIES = [
+    {'id': 'aggro_fire', 'archetype': 'aggro', 'factions': ['FIRE'],
+     'strategy': "Deck agressivo com criaturas pequenas e dano direto"},
+    {'id': 'aggro_fire_justice', 'archetype': 'aggro', 'factions': ['FIRE', 'JUSTICE'],
+     'strategy': "Aggro with cheap units, weapons and charge"},
+    {'id': 'control_primal_shadow', 'archetype': 'control', 'factions': ['PRIMAL', 'SHADOW'],
+     'strategy': "Controle com muita remoção e card draw"},
+    {'id': 'control_justice_primal', 'archetype': 'control', 'factions': ['JUSTICE', 'PRIMAL'],
+     'strategy': "Control deck with removal, lifegain and late game finishers"},
+    {'id': 'midrange_time_justice', 'archetype': 'midrange', 'factions': ['TIME', 'JUSTICE'],
+     'strategy': "Midrange com unidades eficientes e boas trocas"},
+    {'id': 'midrange_primal', 'archetype': 'midrange', 'factions': ['PRIMAL'],
+     'strategy': "Midrange com unidades voadoras eficientes"},
+    {'id': 'combo_shadow', 'archetype': 'combo', 'factions': ['SHADOW'],
+     'strategy': "Combo com sinergias de void e sacrifício"},
+    {'id': 'combo_fire_shadow', 'archetype': 'combo', 'factions': ['FIRE', 'SHADOW'],
+     'strategy': "Sacrifice engine that rewards units dying"},
+    {'id': 'ramp_time', 'archetype': 'ramp', 'factions': ['TIME'],
+     'strategy': "Ramp para jogar criaturas grandes rapidamente"},
+    {'id': 'ramp_time_primal', 'archetype': 'ramp', 'factions': ['TIME', 'PRIMAL'],
+     'strategy': "Ramp into big creatures with power acceleration"},
+]
+
+
+# ----------------------------------------------------------------------
+# Busca tradicional (baseline por palavras-chave)
+# ----------------------------------------------------------------------
+
+def keyword_search(client: GoogleSheetsClient,
+                   cards: List[Card],
+                   strategy: str,
+                   factions: Optional[List[str]] = None,
+                   limit: int = 50,
+                   max_keywords: int = 5,
+                   per_keyword: int = 20) -> List[Card]:
+    """
+    Busca tradicional: primeiras palavras da estratégia como filtro de texto
+
+    Args:
+        client: Cliente da planilha (só search_cards é usado)
+        cards: Catálogo em memória
+        strategy: Descrição da estratégia
+        factions: Facções permitidas (None = todas)
+        limit: Máximo de cartas
+        max_keywords: Palavras da estratégia usadas
+        per_keyword: Cartas aproveitadas por palavra
+    """
+    keywords = strategy.lower().split()[:max_keywords]
+
+    unique_cards: Dict[str, Card] = {}
+    for keyword in keywords:
+        for card in client.search_cards(cards, factions=factions, text_contains=keyword)[:per_keyword]:
+            unique_cards.setdefault(card.name, card)
+
+    return list(unique_cards.values())[:limit]
+
+
+# ----------------------------------------------------------------------
+# Métricas
+# ----------------------------------------------------------------------
+
+def recall_at_k(retrieved: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    """Fração das cartas relevantes presentes no top-k (nomes, sem caixa)"""
+    relevant_set = {name.lower() for name in relevant}
+    if not relevant_set:
+        return 0.0
+    hits = {name.lower() for name in retrieved[:k]} & relevant_set
+    return len(hits) / len(relevant_set)
+
+
+def ndcg_at_k(retrieved: Sequence[str], relevant: Sequence[str], k: int) -> float:
+    """nDCG@k com relevância binária"""
+    relevant_set = {name.lower() for name in relevant}
+    if not relevant_set:
+        return 0.0
+
+    dcg = sum(
+        1.0 / math.log2(position + 2)
+        for position, name in enumerate(retrieved[:k])
+        if name.lower() in relevant_set
+    )
+    ideal = sum(1.0 / math.log2(position + 2) for position in range(min(len(relevant_set), k)))
+    return dcg / ideal
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'mean_ms': 0.0}
+    return {
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(np.mean(latencies_ms))
+    }
+
+
+def max_rss_mb() -> float:
+    """Pico de memória residente do processo (Linux: ru_maxrss em KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_labels(path: str = DEFAULT_LABELS_PATH) -> Dict[str, List[str]]:
+    """Cartas relevantes rotuladas à mão: {id da estratégia: [nomes]}"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+
+def make_mode_search(mode: str, searcher, cards: List[Card], k: int) -> Callable[[Dict], List[Card]]:
+    """Função estratégia -> cartas para um modo de busca"""
+    if mode == 'traditional':
+        return lambda item: keyword_search(searcher.sheets_client, cards, item['strategy'], item['factions'], limit=k)
+
+    if mode == 'quota':
+        # Cotas de CONTEXT_TYPE_QUOTAS; tipos intercalados por score para o corte em k
+        def by_type(item: Dict) -> List[Card]:
+            results = searcher.search_scored_cards_by_type(item['strategy'], allowed_factions=item['factions'])
+            merged = [scored for cards_of_type in results.values() for scored in cards_of_type]
+            return [scored.card for scored in sorted(merged, key=lambda scored: scored.score, reverse=True)]
+        return by_type
+
+    def semantic(item: Dict) -> List[Card]:
+        results = searcher.search_scored_cards_for_strategy(
+            item['strategy'],
+            allowed_factions=item['factions'],
+            max_results=k,
+            search_mode=mode
+        )
+        return [scored.card for scored in results]
+
+    return semantic
+
+
+def benchmark_mode(search: Callable[[Dict], List[Card]],
+                   strategies: List[Dict],
+                   labels: Dict[str, List[str]],
+                   k: int,
+                   repeats: int,
+                   measure_memory: bool = True) -> Dict:
+    """
+    Mede um modo de busca
+
+    Fria = primeira execução de cada estratégia com o cache de queries vazio
+    (inclui o encode); quente = `repeats` passadas seguintes.
+
+    Returns:
+        Latências fria/quente, memória, métricas de qualidade e top-k por estratégia
+    """
+    query_cache = get_query_cache()
+
+    cold = []
+    rankings: Dict[str, List[str]] = {}
+    for item in strategies:
+        query_cache.clear()
+        start = time.perf_counter()
+        found = search(item)
+        cold.append((time.perf_counter() - start) * 1000)
+        rankings[item['id']] = [card.name for card in found]
+
+    warm = []
+    for _ in range(repeats):
+        for item in strategies:
+            start = time.perf_counter()
+            search(item)
+            warm.append((time.perf_counter() - start) * 1000)
+
+    row = {
+        'cold': latency_summary(cold),
+        'warm': latency_summary(warm),
+        'results': rankings
+    }
+
+    if measure_memory:
+        tracemalloc.start()
+        for item in strategies:
+            search(item)
+        row['peak_alloc_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    labelled = [item['id'] for item in strategies if labels.get(item['id'])]
+    if labelled:
+        recalls = {sid: recall_at_k(rankings[sid], labels[sid], k) for sid in labelled}
+        ndcgs = {sid: ndcg_at_k(rankings[sid], labels[sid], k) for sid in labelled}
+        row['quality'] = {
+            'labelled_strategies': len(labelled),
+            f'recall@{k}': float(np.mean(list(recalls.values()))),
+            f'ndcg@{k}': float(np.mean(list(ndcgs.values()))),
+            'per_strategy': {sid: {'recall': recalls[sid], 'ndcg': ndcgs[sid]} for sid in labelled}
+        }
+
+    return row
+
+
+def mode_overlap(report: Dict, reference: str, k: int) -> Dict[str, float]:
+    """Sobreposição média do top-k de cada modo com o modo de referência"""
+    modes = report['modes']
+    if reference not in modes:
+        return {}
+
+    overlaps = {}
+    for mode, row in modes.items():
+        values = []
+        for sid, names in row['results'].items():
+            reference_names = set(modes[reference]['results'].get(sid, [])[:k])
+            if reference_names:
+                values.append(len(set(names[:k]) & reference_names) / len(reference_names))
+        overlaps[mode] = float(np.mean(values)) if values else 0.0
+    return overlaps
+
+
+def run_benchmark(modes: Sequence[str] = RETRIEVAL_MODES,
+                  k: int = 50,
+                  repeats: int = 5,
+                  labels_path: str = DEFAULT_LABELS_PATH,
+                  measure_memory: bool = True,
+                  strategies: Optional[List[Dict]] = None) -> Dict:
+    """
+    Compara os modos de busca nas estratégias fixas
+
+    Returns:
+        {'k', 'cards', 'startup_ms', 'modes': {modo: {...}}, 'overlap_with_vector', ...}
+    """
+    from rag.semantic_search import SemanticCardSearch
+
+    strategies = strategies or BENCHMARK_STRATEGIES
+    labels = load_labels(labels_path)
+
+    start = time.perf_counter()
+    searcher = SemanticCardSearch()
+    startup_ms = (time.perf_counter() - start) * 1000
+    cards = searcher._all_cards
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'k': k,
+        'repeats': repeats,
+        'cards': len(cards),
+        'strategies': len(strategies),
+        'labelled_strategies': sum(1 for item in strategies if labels.get(item['id'])),
+        'startup_ms': startup_ms,
+        'modes': {}
+    }
+
+    for mode in modes:
+        search = make_mode_search(mode, searcher, cards, k)
+
+        # Primeira chamada do processo: carrega modelo/índices do modo
+        start = time.perf_counter()
+        search(strategies[0])
+        first_call_ms = (time.perf_counter() - start) * 1000
+
+        row = benchmark_mode(search, strategies, labels, k, repeats, measure_memory)
+        row['first_call_ms'] = first_call_ms
+        row['max_rss_mb'] = max_rss_mb()
+        report['modes'][mode] = row
+
+    report['overlap_with_vector'] = mode_overlap(report, 'vector', k)
+    return report
+
+
+def compare_reports(baseline: Dict, current: Dict) -> Dict[str, Dict[str, float]]:
+    """Diferença (atual - base) das métricas principais por modo presente nos dois"""
+    deltas = {}
+    for mode, row in current['modes'].items():
+        base = baseline.get('modes', {}).get(mode)
+        if not base:
+            continue
+
+        delta = {
+            f'{phase}_{stat}': row[phase][stat] - base[phase][stat]
+            for phase in ('cold', 'warm')
+            for stat in ('p50_ms', 'p95_ms', 'p99_ms')
+        }
+        for metric, value in row.get('quality', {}).items():
+            if metric.startswith(('recall@', 'ndcg@')) and metric in base.get('quality', {}):
+                delta[metric] = value - base['quality'][metric]
+        deltas[mode] = delta
+    return deltas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark headless de qualidade/latência da busca")
+    parser.add_argument('--modes', nargs='+', choices=RETRIEVAL_MODES, default=list(RETRIEVAL_MODES))
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--labels', default=DEFAULT_LABELS_PATH,
+                        help="JSON {id da estratégia: [cartas relevantes]}")
+    parser.add_argument('--no-memory', action='store_true', help="Não mede alocação com tracemalloc")
+    parser.add_argument('--json', help="Grava o relatório neste arquivo")
+    parser.add_argument('--compare', help="Relatório JSON anterior para comparar")
+    args = parser.parse_args()
+
+    print("⏱️ Benchmark de busca: tradicional vs vetorial vs híbrida vs cotas por tipo")
+    report = run_benchmark(args.modes, args.k, args.repeats, args.labels,
+                           measure_memory=not args.no_memory)
+
+    print(f"\nCartas: {report['cards']} | estratégias: {report['strategies']} "
+          f"(rotuladas: {report['labelled_strategies']}) | startup: {report['startup_ms']:.0f} ms")
+    print(f"\n{'Modo':<13}{'fria p50':>10}{'quente p50':>12}{'p95':>9}{'p99':>9}"
+          f"{'alloc':>10}{'recall':>8}{'nDCG':>7}{'∩vector':>9}")
+    for mode, row in report['modes'].items():
+        quality = row.get('quality', {})
+        recall = quality.get(f"recall@{report['k']}")
+        ndcg = quality.get(f"ndcg@{report['k']}")
+        alloc = f"{row['peak_alloc_mb']:>8.1f}MB" if 'peak_alloc_mb' in row else f"{'-':>10}"
+        print(f"{mode:<13}{row['cold']['p50_ms']:>8.1f}ms{row['warm']['p50_ms']:>10.1f}ms"
+              f"{row['warm']['p95_ms']:>7.1f}ms{row['warm']['p99_ms']:>7.1f}ms{alloc}"
+              f"{recall if recall is not None else '-':>8.3}{ndcg if ndcg is not None else '-':>7.3}"
+              f"{report['overlap_with_vector'].get(mode, 0.0):>9.1%}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            deltas = compare_reports(json.load(f), report)
+        print(f"\n📈 Diferença em relação a {args.compare}:")
+        for mode, delta in deltas.items():
+            changes = ', '.join(f"{metric} {value:+.3f}" for metric, value in delta.items())
+            print(f"   {mode}: {changes}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRelatório salvo em {args.json}")
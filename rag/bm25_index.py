@@ -0,0 +1,125 @@
+# rag/bm25_index.py
+"""
+🚨 ÂNCORA: BM25_INDEX - Índice lexical local sobre os textos de embedding
+Contexto: Embeddings perdem palavras exatas (Warcry, Killer, nomes de cartas);
+          BM25 sobre os mesmos documentos de _create_embedding_text complementa
+Cuidado: Mesmos IDs e metadata da coleção ChromaDB (filtros where compatíveis)
+Dependências: numpy, rag.metadata_filter
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag.metadata_filter import MetadataFilter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens em minúsculas (mantém termos como card-draw e hard-removal)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """BM25 (Okapi) com listas invertidas em arrays numpy"""
+
+    def __init__(self,
+                 ids: List[str],
+                 documents: List[str],
+                 metadatas: Optional[List[Dict]] = None,
+                 k1: float = 1.5,
+                 b: float = 0.75):
+        """
+        Args:
+            ids: IDs das cartas (mesmos do ChromaDB)
+            documents: Textos indexados
+            metadatas: Metadata por carta (usada nos filtros where)
+            k1, b: Parâmetros do BM25
+        """
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas) if metadatas is not None else [{} for _ in self.ids]
+        self.k1 = k1
+        self.b = b
+
+        tokenized = [tokenize(document) for document in self.documents]
+        lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 0.0
+
+        # Normalização de tamanho do documento, pré-calculada
+        self._length_norm = k1 * (1 - b + b * lengths / (avg_length or 1.0))
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for row, tokens in enumerate(tokenized):
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((row, frequency))
+
+        n_docs = len(self.ids)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        for term, entries in postings.items():
+            rows = np.array([row for row, _ in entries], dtype=np.int64)
+            frequencies = np.array([freq for _, freq in entries], dtype=np.float32)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = (rows, frequencies, idf)
+
+        self._filter = MetadataFilter(self.metadatas)
+
+    @classmethod
+    def from_collection(cls, collection, **kwargs) -> 'BM25Index':
+        """Cria o índice a partir dos documentos de uma coleção ChromaDB"""
+        data = collection.get(include=['metadatas', 'documents'])
+        return cls(data['ids'], data['documents'], data['metadatas'], **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Score BM25 de todos os documentos para a query"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+
+        for term, query_frequency in Counter(tokenize(query)).items():
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+
+            rows, frequencies, idf = posting
+            term_scores = idf * frequencies * (self.k1 + 1) / (frequencies + self._length_norm[rows])
+            scores[rows] += query_frequency * term_scores
+
+        return scores
+
+    def query(self,
+              query_texts: List[str],
+              n_results: int = 10,
+              where: Optional[Dict] = None) -> Dict[str, List]:
+        """
+        Top-k lexical por query
+
+        Returns:
+            Dict no formato do ChromaDB ({'ids', 'metadatas', 'documents', 'scores'});
+            documentos sem nenhum termo da query não são retornados
+        """
+        mask = self._filter.mask(where)
+        results = {'ids': [], 'metadatas': [], 'documents': [], 'scores': []}
+
+        for query_text in query_texts:
+            scores = self.scores(query_text)
+            candidates = np.flatnonzero(mask & (scores > 0))
+            k = min(n_results, len(candidates))
+
+            if k:
+                top = np.argpartition(-scores[candidates], k - 1)[:k]
+                rows = candidates[top[np.argsort(-scores[candidates][top])]]
+            else:
+                rows = np.array([], dtype=np.int64)
+
+            results['ids'].append([self.ids[r] for r in rows])
+            results['metadatas'].append([self.metadatas[r] for r in rows])
+            results['documents'].append([self.documents[r] for r in rows])
+            results['scores'].append([float(scores[r]) for r in rows])
+
+        return results
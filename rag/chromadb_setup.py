@@ -8,28 +8,91 @@ Dependências: Google Sheets como fonte única
 
 import chromadb
 from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-import json
+import hashlib
 import os
-from typing import List, Dict, Optional
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
+import numpy as np
 import sys
 sys.path.append('..')
 
 from data.google_sheets_client import GoogleSheetsClient
 from data.models import Card
+from data.card_catalog import catalog_version
+from core.market_access import get_market_index
 from config.settings import Settings as AppSettings
+from rag.index_status import (
+    DEFAULT_PERSIST_DIRECTORY, activate_version, active_collection_name, build_file_lock,
+    collection_versions, read_collection_metadata, versioned_collection_name, write_collection_metadata
+)
+from rag.embeddings import EMBEDDING_MODEL_NAME, get_embedding_function
+from rag.onnx_encoder import get_query_encoder, query_encoder_key
+from rag.embedding_pipeline import EmbeddingPipeline
+from rag.embedding_cache import EmbeddingCache
+from rag.query_cache import get_query_cache
+from rag.numpy_index import NumpyVectorIndex
+from rag.index_artifact import IndexArtifact
+from rag.synergy_graph import SynergyGraph
+from rag.query_priors import QueryPriors
+from rag.bm25_index import BM25Index
+from rag.fusion import reciprocal_rank_fusion, weighted_score_fusion
+from rag.metadata_filter import (
+    METADATA_SCHEMA_VERSION, TYPE_FILTERS, build_where_clause, combine_where, faction_flags,
+    upgrade_metadata
+)
+
+RAG_BACKENDS = ('chroma', 'numpy')
+FUSION_METHODS = ('rrf', 'weighted')
+NUMPY_INDEX_DIRNAME = "numpy_index"
+SYNERGY_GRAPH_DIRNAME = "synergy_graph"
+QUERY_PRIORS_DIRNAME = "query_priors"
+ARTIFACT_INSERT_BATCH = 1000
+# Distância de cosseno (1 - cos), a mesma do backend NumPy; coleções antigas
+# sem "hnsw:space" usam L2² (2 - 2cos em vetores unitários)
+COLLECTION_SPACE = "cosine"
+
+# Cartas fixas cujo texto de embedding identifica o formato (embedding_format_hash)
+FORMAT_PROBE_CARDS = [
+    Card(name="Probe Unit", cost=3, influence_string="{F}{J}", card_type="Unit",
+         factions=["FIRE", "JUSTICE"], attack=2, health=3, rarity="Rare",
+         text="Flying, Lifesteal. Warcry. When played, deal 2 damage and draw a card; +1/+1 to your units."),
+    Card(name="Probe Spell", cost=1, card_type="Spell", factions=["SHADOW"],
+         text="Kill a unit. Play a power from your void. Merchant: look at your market."),
+]
+
+
+def cosine_distances(results: Dict, collection_metadata: Optional[Dict]) -> Dict:
+    """
+    Converte as distâncias de uma coleção L2 (versões criadas antes do espaço
+    de cosseno) para 1 - cos, como no backend NumPy: em vetores unitários
+    L2² = 2 - 2cos
+    """
+    space = (collection_metadata or {}).get("hnsw:space", "l2")
+    if space == COLLECTION_SPACE or not results.get('distances'):
+        return results
+    
+    results['distances'] = [[distance / 2 for distance in row] for row in results['distances']]
+    return results
 
 
 class ChromaDBManager:
     """Gerenciador de embeddings de cartas usando ChromaDB"""
     
-    def __init__(self, persist_directory: str = "./data/embeddings"):
+    def __init__(self, persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                 idle_timeout: Optional[float] = None,
+                 backend: Optional[str] = None):
         """
         Inicializa o ChromaDB com persistência local
         
         Args:
             persist_directory: Diretório para armazenar os embeddings
+            idle_timeout: Segundos sem uso até liberar o modelo de embeddings (None = nunca)
+            backend: 'chroma' (HNSW) ou 'numpy' (busca exata em memória);
+                     padrão vem de RAG_BACKEND
         """
         # 🚨 ÂNCORA: CHROMADB_CONFIG - Configuração local sem dependência externa
         # Contexto: ChromaDB rodando localmente com persistência em disco
@@ -48,63 +111,374 @@ class ChromaDBManager:
             )
         )
         
-        # Modelo de embeddings - usando sentence-transformers
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Modelo de embeddings - sentence-transformers carregado só no primeiro uso
+        # e usado pela coleção como embedding_function (um único modelo em memória)
+        self.embedding_function = get_embedding_function(EMBEDDING_MODEL_NAME, idle_timeout)
+        self._query_encoder = None  # RAG_QUERY_ENCODER, resolvido na primeira query
+        
+        # Versões antigas do índice mantidas para rollback instantâneo
+        self.keep_versions = AppSettings.RAG_KEEP_VERSIONS
+        self._build_lock = threading.Lock()
+        
+        # Cliente Google Sheets (conectado apenas quando necessário)
+        self._sheets_client = None
+        
+        # Backend de busca - o ChromaDB continua sendo a fonte dos embeddings
+        self.backend = backend or AppSettings.RAG_BACKEND
+        if self.backend not in RAG_BACKENDS:
+            raise ValueError(f"Backend RAG inválido '{self.backend}' (use {RAG_BACKENDS})")
+        self._numpy_index: Optional[NumpyVectorIndex] = None
+        self._bm25_index: Optional[BM25Index] = None
+        self._synergy_graph: Optional[SynergyGraph] = None
+        self._query_priors: Optional[QueryPriors] = None
+        self._index_lock = threading.RLock()
+        self._schema_checked = False
+        self._loaded_collection: Optional[str] = None  # versão dos índices em memória
+        
+        # Busca híbrida: retrievers lexical e vetorial em paralelo. Criados aqui
+        # (threads só sobem no primeiro submit): o manager é compartilhado entre
+        # sessões e criar sob demanda abriria uma corrida check-then-create
+        self._retrieval_executor = ThreadPoolExecutor(
+            max_workers=2,
+            thread_name_prefix="hybrid-retrieval"
+        )
+        # Busca com cotas: uma query filtrada por tipo de carta em paralelo
+        self._type_query_executor = ThreadPoolExecutor(
+            max_workers=len(TYPE_FILTERS),
+            thread_name_prefix="type-quota-retrieval"
+        )
+        # Latências da última busca de cada thread (uma sessão não vê as da outra)
+        self._search_timings = threading.local()
+    
+    @property
+    def last_search_timings(self) -> Dict[str, float]:
+        """Latências por etapa (ms) da última busca feita pela thread atual"""
+        return getattr(self._search_timings, 'value', {})
+    
+    @last_search_timings.setter
+    def last_search_timings(self, timings: Dict[str, float]):
+        self._search_timings.value = timings
+    
+    @property
+    def embedding_model(self):
+        """SentenceTransformer compartilhado (carregado sob demanda)"""
+        return self.embedding_function.model
+    
+    @property
+    def sheets_client(self) -> GoogleSheetsClient:
+        if self._sheets_client is None:
+            self._sheets_client = GoogleSheetsClient()
+        return self._sheets_client
+    
+    @property
+    def query_encoder(self):
+        """Encoder das queries: sentence-transformers ou ONNX Runtime (mesmo espaço vetorial)"""
+        if self._query_encoder is None:
+            self._query_encoder = get_query_encoder(
+                self.embedding_function,
+                AppSettings.RAG_QUERY_ENCODER,
+                quantized=AppSettings.RAG_ONNX_QUANTIZED
+            )
+        return self._query_encoder
+    
+    def encode_queries(self, texts: List[str]):
+        """Embeddings das queries (matriz numpy), via cache LRU compartilhado"""
+        encoder = self.query_encoder
+        return get_query_cache().get_many(texts, encoder.encode, query_encoder_key(encoder))
+    
+    def encode_strategy_queries(self, strategies: List[str],
+                                factions: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Vetores das estratégias com priors de facção/arquétipo somados
+        
+        Só a estratégia crua passa pelo encoder (cache LRU); os priors são
+        centróides pré-calculados da versão ativa do índice.
+        """
+        return self.get_query_priors().apply_batch(self.encode_queries(strategies), strategies, factions)
+    
+    def _get_embedding_cache(self) -> EmbeddingCache:
+        """Cache de embeddings por conteúdo, ao lado do diretório do ChromaDB"""
+        cache_directory = os.path.join(
+            os.path.dirname(os.path.abspath(self.persist_directory)),
+            'embedding_cache'
+        )
+        return EmbeddingCache(cache_directory, self.embedding_function.model_name)
+    
+    @property
+    def collection_name(self) -> str:
+        """Coleção ativa (segue o ponteiro em collection_metadata.json)"""
+        return active_collection_name(read_collection_metadata(self.persist_directory))
+    
+    def _sync_active_collection(self):
+        """Descarta índices em memória se o ponteiro mudou (build ou rollback)"""
+        collection_name = self.collection_name
+        if collection_name == self._loaded_collection:
+            return
+        
+        with self._index_lock:
+            if collection_name != self._loaded_collection:
+                self._numpy_index = None
+                self._bm25_index = None
+                self._synergy_graph = None
+                self._query_priors = None
+                self._schema_checked = False
+                self._loaded_collection = collection_name
+    
+    def _get_collection(self):
+        """Obtém a coleção principal usando o modelo compartilhado"""
+        self._sync_active_collection()
+        collection = self.chroma_client.get_collection(
+            self.collection_name,
+            embedding_function=self.embedding_function
+        )
+        self._ensure_metadata_schema(collection)
+        return collection
+    
+    def _ensure_metadata_schema(self, collection):
+        """
+        Atualiza a metadata de coleções antigas (facções só em string, regra
+        antiga de mercado) para o esquema atual - sem recalcular embeddings
+        """
+        if self._schema_checked:
+            return
+        
+        with self._index_lock:
+            if self._schema_checked:
+                return
+            self._schema_checked = True
+            
+            metadata = read_collection_metadata(self.persist_directory)
+            if not metadata or metadata.get('metadata_schema', 1) >= METADATA_SCHEMA_VERSION:
+                return
+            
+            print("Atualizando metadata da coleção para o esquema atual...")
+            data = collection.get(include=['metadatas', 'documents'])
+            collection.update(
+                ids=data['ids'],
+                metadatas=[
+                    upgrade_metadata(m, document)
+                    for m, document in zip(data['metadatas'], data['documents'])
+                ]
+            )
+            
+            metadata = dict(metadata, metadata_schema=METADATA_SCHEMA_VERSION)
+            for entry in metadata.get('versions', []):
+                if entry['collection_name'] == collection.name:
+                    entry['metadata_schema'] = METADATA_SCHEMA_VERSION
+            write_collection_metadata(metadata, self.persist_directory)
+            
+            # Índices locais guardam cópia da metadata antiga
+            self._bm25_index = None
+            if os.path.exists(os.path.join(self.numpy_index_directory, 'index.json')):
+                self.get_numpy_index(rebuild=True)
+    
+    @property
+    def numpy_index_directory(self) -> str:
+        return self._numpy_index_directory_for(self.collection_name)
+    
+    def _numpy_index_directory_for(self, collection_name: str) -> str:
+        """Cada versão da coleção tem seu próprio índice NumPy"""
+        return os.path.join(self.persist_directory, NUMPY_INDEX_DIRNAME, collection_name)
+    
+    def _build_numpy_index(self, collection, index_directory: str) -> NumpyVectorIndex:
+        index_dtype = AppSettings.RAG_INDEX_DTYPE
+        index = NumpyVectorIndex.from_collection(collection, dtype=index_dtype)
+        index.save(index_directory)
+        print(f"Índice NumPy ({index_dtype}) salvo com {len(index)} cartas")
+        return index
+    
+    def get_numpy_index(self, rebuild: bool = False) -> NumpyVectorIndex:
+        """
+        Índice NumPy da coleção (carregado do disco com memory-map ou
+        construído a partir do ChromaDB na primeira vez)
+        """
+        self._sync_active_collection()
+        
+        with self._index_lock:
+            if self._numpy_index is not None and not rebuild:
+                return self._numpy_index
+            
+            index_directory = self.numpy_index_directory
+            index_dtype = AppSettings.RAG_INDEX_DTYPE
+            
+            if not self._schema_checked:
+                self._get_collection()  # Pode reconstruir o índice (esquema antigo)
+                if self._numpy_index is not None and not rebuild:
+                    return self._numpy_index
+            
+            if not rebuild and os.path.exists(os.path.join(index_directory, 'index.json')):
+                self._numpy_index = NumpyVectorIndex.load(index_directory, mmap=True)
+                # Armazenamento salvo com outro dtype (ex.: mudou RAG_INDEX_DTYPE)
+                rebuild = self._numpy_index.dtype != index_dtype
+            else:
+                rebuild = True
+            
+            if rebuild:
+                self._numpy_index = self._build_numpy_index(self._get_collection(), index_directory)
+            
+            return self._numpy_index
+    
+    def get_bm25_index(self, rebuild: bool = False) -> BM25Index:
+        """Índice BM25 sobre os mesmos documentos/metadata da coleção"""
+        self._sync_active_collection()
+        
+        with self._index_lock:
+            if self._bm25_index is None or rebuild:
+                if self.backend == 'numpy':
+                    # Documentos já estão em memória no índice NumPy
+                    index = self.get_numpy_index()
+                    self._bm25_index = BM25Index(index.ids, index.documents, index.metadatas)
+                else:
+                    self._bm25_index = BM25Index.from_collection(self._get_collection())
+            
+            return self._bm25_index
+    
+    def _synergy_graph_path(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, SYNERGY_GRAPH_DIRNAME, f"{collection_name}.npz")
+    
+    def _build_synergy_graph(self, collection, numpy_index: Optional[NumpyVectorIndex] = None) -> SynergyGraph:
+        """Grafo kNN da coleção (vetores do índice NumPy quando já carregado)"""
+        if numpy_index is not None:
+            graph = SynergyGraph.from_numpy_index(numpy_index)
+        else:
+            data = collection.get(include=['embeddings', 'metadatas', 'documents'])
+            graph = SynergyGraph.build(data['ids'], data['embeddings'], data['documents'], data['metadatas'])
+        graph.save(self._synergy_graph_path(collection.name))
+        print(f"Grafo de sinergia salvo: {len(graph)} cartas, {len(graph.indices)} arestas")
+        return graph
+    
+    def get_synergy_graph(self, rebuild: bool = False) -> SynergyGraph:
+        """Grafo de sinergia da versão ativa (construído no build; aqui só para versões antigas)"""
+        self._sync_active_collection()
+        
+        with self._index_lock:
+            if self._synergy_graph is not None and not rebuild:
+                return self._synergy_graph
+            
+            path = self._synergy_graph_path(self.collection_name)
+            if not rebuild and os.path.exists(path):
+                self._synergy_graph = SynergyGraph.load(path)
+            else:
+                numpy_index = self.get_numpy_index() if self.backend == 'numpy' else None
+                self._synergy_graph = self._build_synergy_graph(self._get_collection(), numpy_index)
+            
+            return self._synergy_graph
+    
+    def _query_priors_path(self, collection_name: str) -> str:
+        return os.path.join(self.persist_directory, QUERY_PRIORS_DIRNAME, f"{collection_name}.npz")
+    
+    def _build_query_priors(self, collection, numpy_index: Optional[NumpyVectorIndex] = None) -> QueryPriors:
+        """Centróides de facção/arquétipo da coleção (vetores do índice NumPy quando já carregado)"""
+        if numpy_index is not None:
+            priors = QueryPriors.from_numpy_index(numpy_index)
+        else:
+            data = collection.get(include=['embeddings', 'metadatas', 'documents'])
+            priors = QueryPriors.build(data['embeddings'], data['documents'], data['metadatas'])
+        priors.save(self._query_priors_path(collection.name))
+        return priors
+    
+    def get_query_priors(self, rebuild: bool = False) -> QueryPriors:
+        """Priors da query da versão ativa (construídos no build; aqui só para versões antigas)"""
+        self._sync_active_collection()
+        
+        with self._index_lock:
+            if self._query_priors is not None and not rebuild:
+                return self._query_priors
+            
+            path = self._query_priors_path(self.collection_name)
+            if not rebuild and os.path.exists(path):
+                self._query_priors = QueryPriors.load(path)
+            else:
+                numpy_index = self.get_numpy_index() if self.backend == 'numpy' else None
+                self._query_priors = self._build_query_priors(self._get_collection(), numpy_index)
+            
+            return self._query_priors
+    
+    def _query_index(self, query_embeddings, n_results: int,
+                     where: Optional[Dict] = None,
+                     include: Optional[List[str]] = None) -> Dict:
+        """Executa a busca no backend configurado (mesmo formato de resultado)"""
+        include = include or ["documents", "metadatas", "distances"]
         
-        # Nome da coleção principal
-        self.collection_name = "eternal_cards"
+        if self.backend == 'numpy':
+            return self.get_numpy_index().query(
+                query_embeddings,
+                n_results=n_results,
+                where=where,
+                include=include
+            )
         
-        # Cliente Google Sheets
-        self.sheets_client = GoogleSheetsClient()
+        collection = self._get_collection()
+        results = collection.query(
+            query_embeddings=query_embeddings.tolist(),
+            n_results=n_results,
+            where=where,
+            include=include
+        )
+        return cosine_distances(results, collection.metadata)
     
-    def setup_card_embeddings(self, force_recreate: bool = False) -> Dict[str, int]:
+    def setup_card_embeddings(self, force_recreate: bool = False,
+                              num_workers: int = 0,
+                              use_cache: bool = True,
+                              progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, int]:
         """
-        Configura embeddings iniciais das cartas
+        Configura embeddings das cartas em uma nova versão da coleção
         
         Args:
-            force_recreate: Se True, recria a coleção do zero
+            force_recreate: Se True, constrói uma nova versão mesmo com índice existente
+            num_workers: Processos para calcular embeddings (0 = processo atual)
+            use_cache: Reutiliza vetores de cartas com texto inalterado
+            progress_callback: Chamado com (fase, cartas_processadas, total) a cada etapa
             
         Returns:
             Dict com estatísticas: {'total_cards': X, 'embedded_cards': Y, 'time_taken': Z}
         """
-        start_time = datetime.now()
-        
-        # 🚨 ÂNCORA: COLLECTION_RESET - Reset controlado da coleção
-        # Contexto: Permite recriar embeddings sem perder dados acidentalmente
-        # Cuidado: force_recreate=True apaga todos os embeddings existentes
+        # 🚨 ÂNCORA: COLLECTION_RESET - Rebuild sem derrubar a busca
+        # Contexto: A nova versão é construída em eternal_cards_v{n} enquanto a
+        #           atual continua servindo; o ponteiro só muda após validação
+        # Cuidado: Um build por diretório (lock de thread + .build.lock entre processos);
+        #          versões além de RAG_KEEP_VERSIONS são apagadas
         # Dependências: Necessário recarregar todas as cartas do Google Sheets
         
-        if force_recreate:
-            try:
-                self.chroma_client.delete_collection(self.collection_name)
-                print(f"Coleção '{self.collection_name}' deletada para recriação")
-            except:
-                print(f"Coleção '{self.collection_name}' não existia, criando nova")
-        
-        # Criar ou obter coleção
-        collection = self.chroma_client.get_or_create_collection(
-            name=self.collection_name,
-            metadata={"description": "Eternal Card Game cards with semantic embeddings"}
-        )
+        with self._build_lock, build_file_lock(self.persist_directory):
+            if not force_recreate:
+                existing_count = self._active_collection_count()
+                if existing_count > 0:
+                    print(f"Coleção já contém {existing_count} cartas")
+                    return {
+                        'total_cards': existing_count,
+                        'embedded_cards': 0,
+                        'time_taken': 0,
+                        'status': 'already_exists'
+                    }
+            
+            return self._build_collection_version(num_workers, use_cache, progress_callback)
+    
+    def _active_collection_count(self) -> int:
+        try:
+            return self._get_collection().count()
+        except Exception:
+            return 0
+    
+    def _build_collection_version(self, num_workers: int, use_cache: bool,
+                                  progress_callback: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, int]:
+        """Constrói, valida e ativa uma nova versão da coleção"""
+        start_time = datetime.now()
+        report = progress_callback or (lambda phase, done, total: None)
         
-        # Verificar se já tem dados
-        existing_count = collection.count()
-        if existing_count > 0 and not force_recreate:
-            print(f"Coleção já contém {existing_count} cartas")
-            return {
-                'total_cards': existing_count,
-                'embedded_cards': 0,
-                'time_taken': 0,
-                'status': 'already_exists'
-            }
+        version, collection = self._create_version_collection()
+        collection_name = collection.name
+        print(f"Construindo '{collection_name}' (a versão atual continua ativa)")
         
         # Carregar todas as cartas do Google Sheets
         print("Carregando cartas do Google Sheets...")
+        report('loading_cards', 0, 0)
         all_cards = self.sheets_client.get_all_cards()
         
         # Filtrar apenas cartas jogáveis
         playable_cards = [card for card in all_cards if card.deck_buildable]
         print(f"Total de cartas jogáveis: {len(playable_cards)}")
+        market_index = get_market_index(playable_cards)
         
         # Preparar dados para embedding
         documents = []
@@ -128,42 +502,52 @@ class ChromaDBManager:
                 'attack': card.attack or 0,
                 'health': card.health or 0,
                 'rarity': card.rarity or 'Common',
-                'type': card.type,
+                'type': card.card_type,
                 'factions': ','.join(card.factions) if card.factions else '',
+                **faction_flags(card.factions or []),
                 'set_number': card.set_number or 0,
                 'eternal_id': card.eternal_id or 0,
                 'is_unit': card.is_unit,
-                'is_spell': 'Spell' in card.type,
+                'is_spell': 'Spell' in card.card_type,
                 'is_power': card.is_power,
-                'is_relic': 'Relic' in card.type,
-                'is_weapon': 'Weapon' in card.type,
-                'is_market': self._is_market_card(card)
+                'is_relic': 'Relic' in card.card_type,
+                'is_weapon': 'Weapon' in card.card_type,
+                'is_market': market_index.is_access(card)
             }
             
             documents.append(embedding_text)
             metadatas.append(metadata)
             ids.append(f"{card.set_number}_{card.eternal_id}_{card.name.replace(' ', '_')}")
         
-        # Adicionar em batches para performance
-        batch_size = 100
-        total_added = 0
+        # 🚨 ÂNCORA: PRECOMPUTED_EMBEDDINGS - Vetores calculados fora do ChromaDB
+        # Contexto: Encode em lotes grandes (opcionalmente em vários processos),
+        #           sobreposto com a inserção do lote anterior
+        # Cuidado: Mesmo modelo da embedding_function da coleção
+        # Dependências: rag/embedding_pipeline.py
         
         print(f"Criando embeddings para {len(documents)} cartas...")
+        report('encoding', 0, len(documents))
         
-        for i in range(0, len(documents), batch_size):
-            batch_docs = documents[i:i+batch_size]
-            batch_meta = metadatas[i:i+batch_size]
-            batch_ids = ids[i:i+batch_size]
-            
-            # ChromaDB cria embeddings automaticamente
-            collection.add(
-                documents=batch_docs,
-                metadatas=batch_meta,
-                ids=batch_ids
-            )
-            
-            total_added += len(batch_docs)
-            print(f"Progresso: {total_added}/{len(documents)} cartas processadas")
+        def encoding_progress(done: int, total: int):
+            print(f"Progresso: {done}/{total} cartas processadas")
+            report('encoding', done, total)
+        
+        pipeline = EmbeddingPipeline(
+            model_name=self.embedding_function.model_name,
+            num_workers=num_workers
+        )
+        pipeline_stats = pipeline.run(
+            collection, ids, documents, metadatas,
+            progress_callback=encoding_progress,
+            cache=self._get_embedding_cache() if use_cache else None
+        )
+        
+        report('validating', len(ids), len(ids))
+        try:
+            self._validate_collection(collection, ids)
+        except Exception:
+            self.chroma_client.delete_collection(collection_name)
+            raise
         
         # Salvar estatísticas
         time_taken = (datetime.now() - start_time).total_seconds()
@@ -172,19 +556,316 @@ class ChromaDBManager:
             'total_cards': len(all_cards),
             'embedded_cards': len(documents),
             'time_taken': time_taken,
+            'cards_per_second': pipeline_stats['cards_per_second'],
+            'encoded_cards': pipeline_stats['encoded_cards'],
+            'cache_hits': pipeline_stats['cache_hits'],
             'status': 'created'
         }
         
-        # Salvar metadata da coleção
-        self._save_collection_metadata(stats)
+        # Índice NumPy da nova versão pronto antes da troca
+        numpy_index = None
+        if self._uses_numpy_index():
+            report('indexing', len(ids), len(ids))
+            numpy_index = self._build_numpy_index(
+                collection,
+                self._numpy_index_directory_for(collection_name)
+            )
+        
+        synergy_graph = self._build_synergy_graph(collection, numpy_index)
+        query_priors = self._build_query_priors(collection, numpy_index)
         
-        print(f"\n✅ Embeddings criados com sucesso!")
+        report('activating', len(ids), len(ids))
+        self._activate_collection_version(
+            self._version_entry(version, collection_name, stats, catalog_version(playable_cards)),
+            numpy_index,
+            synergy_graph,
+            query_priors
+        )
+        
+        print(f"\n✅ Embeddings criados com sucesso! Versão ativa: {collection_name}")
         print(f"   Total de cartas: {stats['total_cards']}")
         print(f"   Cartas com embeddings: {stats['embedded_cards']}")
         print(f"   Tempo gasto: {stats['time_taken']:.2f} segundos")
+        print(f"   Throughput: {stats['cards_per_second']:.1f} cartas/segundo")
+        print(f"   Reaproveitadas do cache: {stats['cache_hits']} (codificadas: {stats['encoded_cards']})")
         
         return stats
     
+    def _create_version_collection(self):
+        """Cria a coleção vazia da próxima versão (a ativa continua servindo)"""
+        versions = collection_versions(read_collection_metadata(self.persist_directory))
+        version = max((entry['version'] for entry in versions), default=0) + 1
+        collection_name = versioned_collection_name(version)
+        
+        # Sobra de um build interrompido com o mesmo número
+        try:
+            self.chroma_client.delete_collection(collection_name)
+        except Exception:
+            pass
+        
+        collection = self.chroma_client.create_collection(
+            name=collection_name,
+            metadata={
+                "description": "Eternal Card Game cards with semantic embeddings",
+                "hnsw:space": COLLECTION_SPACE
+            },
+            embedding_function=self.embedding_function
+        )
+        return version, collection
+    
+    def _uses_numpy_index(self) -> bool:
+        return self.backend == 'numpy' or os.path.isdir(os.path.join(self.persist_directory, NUMPY_INDEX_DIRNAME))
+    
+    def embedding_format_hash(self) -> str:
+        """Hash do texto de embedding gerado para cartas fixas (muda junto com o formato)"""
+        digest = hashlib.sha1()
+        for card in FORMAT_PROBE_CARDS:
+            digest.update(self._create_embedding_text(card).encode('utf-8'))
+        return digest.hexdigest()[:12]
+    
+    # 🚨 ÂNCORA: INDEX_ARTIFACT_IO - Exportar/importar o índice sem encode
+    # Contexto: Nó novo importa o artefato publicado em vez de ler a planilha e
+    #           calcular embeddings; o import vira uma nova versão (troca atômica)
+    # Cuidado: Modelo e formato precisam bater com os locais (check_compatible)
+    # Dependências: rag/index_artifact.py
+    
+    def export_index_artifact(self, path: str, compressed: bool = False) -> Dict:
+        """
+        Exporta a versão ativa como artefato .npz
+        
+        Returns:
+            Manifesto gravado (modelo, formato, versão do catálogo, contagem...)
+        """
+        metadata = read_collection_metadata(self.persist_directory)
+        artifact = IndexArtifact.from_collection(
+            self._get_collection(),
+            catalog_version=metadata.get('catalog_version'),
+            embedding_model=metadata.get('embedding_model', EMBEDDING_MODEL_NAME),
+            embedding_format=metadata.get('embedding_format', self.embedding_format_hash()),
+            metadata_schema=metadata.get('metadata_schema', 1),
+            source_collection=self.collection_name
+        )
+        artifact.save(path, compressed=compressed)
+        return artifact.manifest
+    
+    def import_index_artifact(self, path: str, allow_format_mismatch: bool = False) -> Dict:
+        """
+        Importa um artefato como nova versão ativa (nenhuma carta é codificada)
+        
+        Args:
+            path: Arquivo .npz gerado por export_index_artifact
+            allow_format_mismatch: Aceita artefato com formato de texto diferente
+            
+        Returns:
+            Dict com estatísticas no formato de setup_card_embeddings
+        """
+        start = time.perf_counter()
+        
+        artifact = IndexArtifact.load(path)
+        artifact.check_compatible(
+            EMBEDDING_MODEL_NAME,
+            None if allow_format_mismatch else self.embedding_format_hash()
+        )
+        metadatas = [
+            upgrade_metadata(m, document)
+            for m, document in zip(artifact.metadatas, artifact.documents)
+        ]
+        
+        with self._build_lock, build_file_lock(self.persist_directory):
+            version, collection = self._create_version_collection()
+            print(f"Importando {len(artifact)} cartas em '{collection.name}'...")
+            
+            try:
+                for begin in range(0, len(artifact), ARTIFACT_INSERT_BATCH):
+                    end = begin + ARTIFACT_INSERT_BATCH
+                    collection.add(
+                        ids=artifact.ids[begin:end],
+                        embeddings=artifact.embeddings[begin:end].tolist(),
+                        documents=artifact.documents[begin:end],
+                        metadatas=metadatas[begin:end]
+                    )
+                self._validate_collection(collection, artifact.ids)
+            except Exception:
+                self.chroma_client.delete_collection(collection.name)
+                raise
+            
+            # Índice NumPy e grafo direto do artefato (sem reler a coleção)
+            numpy_index = None
+            if self._uses_numpy_index():
+                numpy_index = artifact.to_numpy_index(dtype=AppSettings.RAG_INDEX_DTYPE)
+                numpy_index.save(self._numpy_index_directory_for(collection.name))
+            synergy_graph = SynergyGraph.build(
+                artifact.ids, artifact.embeddings, artifact.documents, metadatas
+            )
+            synergy_graph.save(self._synergy_graph_path(collection.name))
+            query_priors = QueryPriors.build(artifact.embeddings, artifact.documents, metadatas)
+            query_priors.save(self._query_priors_path(collection.name))
+            
+            time_taken = time.perf_counter() - start
+            stats = {
+                'total_cards': len(artifact),
+                'embedded_cards': len(artifact),
+                'time_taken': time_taken,
+                'cards_per_second': len(artifact) / time_taken if time_taken > 0 else 0.0,
+                'encoded_cards': 0,
+                'cache_hits': 0,
+                'status': 'imported',
+                'artifact': os.path.basename(path)
+            }
+            
+            entry = self._version_entry(version, collection.name, stats, artifact.manifest.get('catalog_version'))
+            entry['embedding_format'] = artifact.manifest.get('embedding_format')
+            self._activate_collection_version(entry, numpy_index, synergy_graph, query_priors)
+        
+        print(f"✅ Artefato importado: versão ativa {collection.name} ({time_taken:.2f}s)")
+        return stats
+    
+    def _validate_collection(self, collection, ids: List[str]):
+        """Confere contagem e busca de uma carta pelo próprio vetor antes da troca"""
+        count = collection.count()
+        if count != len(ids):
+            raise RuntimeError(f"Build incompleto: {count} de {len(ids)} cartas na coleção")
+        
+        if not ids:
+            return
+        
+        sample = collection.get(ids=[ids[0]], include=['embeddings'])
+        results = collection.query(
+            query_embeddings=[list(sample['embeddings'][0])],
+            n_results=1,
+            include=['distances']
+        )
+        if not results['distances'][0] or results['distances'][0][0] > 1e-3:
+            raise RuntimeError(f"Build inválido: '{ids[0]}' não é encontrada pelo próprio vetor")
+    
+    def _version_entry(self, version: int, collection_name: str, stats: Dict,
+                       cards_version: Optional[str] = None) -> Dict:
+        return {
+            'version': version,
+            'collection_name': collection_name,
+            'created_at': datetime.now().isoformat(),
+            'stats': stats,
+            'embedding_model': EMBEDDING_MODEL_NAME,
+            'embedding_format': self.embedding_format_hash(),
+            'catalog_version': cards_version,
+            'metadata_schema': METADATA_SCHEMA_VERSION
+        }
+    
+    def _activate_collection_version(self, entry: Dict,
+                                     numpy_index: Optional[NumpyVectorIndex] = None,
+                                     synergy_graph: Optional[SynergyGraph] = None,
+                                     query_priors: Optional[QueryPriors] = None):
+        """Troca atômica do ponteiro para `entry` e limpeza das versões excedentes"""
+        with self._index_lock:
+            metadata, dropped = activate_version(
+                read_collection_metadata(self.persist_directory),
+                entry,
+                self.keep_versions
+            )
+            write_collection_metadata(metadata, self.persist_directory)
+            
+            # Índices em memória passam a ser os da nova versão
+            self._loaded_collection = entry['collection_name']
+            self._numpy_index = numpy_index
+            self._bm25_index = None
+            self._synergy_graph = synergy_graph
+            self._query_priors = query_priors
+            self._schema_checked = False
+        
+        for old in dropped:
+            try:
+                self.chroma_client.delete_collection(old['collection_name'])
+            except Exception:
+                pass
+            shutil.rmtree(self._numpy_index_directory_for(old['collection_name']), ignore_errors=True)
+            for path in (self._synergy_graph_path(old['collection_name']),
+                         self._query_priors_path(old['collection_name'])):
+                if os.path.exists(path):
+                    os.remove(path)
+            print(f"Versão antiga removida: {old['collection_name']}")
+    
+    def list_versions(self) -> List[Dict]:
+        """Versões disponíveis para rollback (marcando a ativa)"""
+        metadata = read_collection_metadata(self.persist_directory)
+        active = active_collection_name(metadata)
+        return [
+            dict(entry, active=entry['collection_name'] == active)
+            for entry in collection_versions(metadata)
+        ]
+    
+    def rollback_version(self, version: Optional[int] = None) -> Dict:
+        """
+        Volta o ponteiro para uma versão mantida (sem recalcular nada)
+        
+        Args:
+            version: Versão alvo (None = a mais nova anterior à ativa)
+            
+        Returns:
+            Registro da versão ativada
+        """
+        with self._build_lock, build_file_lock(self.persist_directory):
+            versions = self.list_versions()
+            active = next((entry for entry in versions if entry['active']), None)
+            
+            if version is None:
+                older = [
+                    entry for entry in versions
+                    if active is None or entry['version'] < active['version']
+                ]
+                if not older:
+                    raise ValueError("Nenhuma versão anterior disponível para rollback")
+                target = older[-1]
+            else:
+                target = next((entry for entry in versions if entry['version'] == version), None)
+                if target is None:
+                    available = [entry['version'] for entry in versions]
+                    raise ValueError(f"Versão {version} não encontrada (disponíveis: {available})")
+            
+            target = {key: value for key, value in target.items() if key != 'active'}
+            self._activate_collection_version(target)
+            print(f"Rollback: versão ativa agora é {target['collection_name']}")
+            return target
+    
+    def _build_where_clause(self,
+                            filter_factions: Optional[List[str]] = None,
+                            include_market: bool = False,
+                            cost_range: Optional[tuple] = None) -> Optional[Dict]:
+        """Monta o filtro de metadata (where) da busca semântica"""
+        # 🚨 ÂNCORA: SEMANTIC_FILTERS - Pré-filtro da busca vetorial
+        # Contexto: Booleanos por facção/mercado + faixa de custo em $and/$or
+        #           explícitos; o índice só pontua cartas elegíveis
+        # Cuidado: Cartas neutras sempre entram no filtro de facções
+        # Dependências: Metadata no esquema METADATA_SCHEMA_VERSION
+        return build_where_clause(
+            filter_factions,
+            include_neutral=True,
+            include_market=include_market,
+            cost_range=cost_range
+        )
+    
+    @staticmethod
+    def _format_results(results: Dict, row: int = 0) -> List[Dict]:
+        """Converte a linha `row` de um resultado de query em dicionários de cartas"""
+        formatted_results = []
+        
+        if results['ids'] and len(results['ids'][row]) > 0:
+            for i, card_id in enumerate(results['ids'][row]):
+                formatted_results.append({
+                    'id': card_id,
+                    'name': results['metadatas'][row][i]['name'],
+                    'metadata': results['metadatas'][row][i],
+                    'text': results['documents'][row][i],
+                    'similarity_score': 1 - results['distances'][row][i],  # Converter distância em similaridade
+                    'distance': results['distances'][row][i]
+                })
+            
+            # Vetores das cartas (re-ranking por diversidade)
+            if results.get('embeddings') is not None:
+                for result, embedding in zip(formatted_results, results['embeddings'][row]):
+                    result['embedding'] = np.asarray(embedding, dtype=np.float32)
+        
+        return formatted_results
+    
     def search_similar_cards(self, 
                            strategy_text: str, 
                            n_results: int = 60,
@@ -204,60 +885,287 @@ class ChromaDBManager:
         Returns:
             Lista de dicionários com cartas e scores de similaridade
         """
-        # Obter coleção
-        collection = self.chroma_client.get_collection(self.collection_name)
+        return self.search_similar_cards_batch(
+            [strategy_text],
+            n_results=n_results,
+            filter_factions=filter_factions,
+            include_market=include_market,
+            cost_range=cost_range
+        )[0]
+    
+    def search_similar_cards_batch(self,
+                                   strategy_texts: List[str],
+                                   n_results: int = 60,
+                                   filter_factions: Optional[List[str]] = None,
+                                   include_market: bool = False,
+                                   cost_range: Optional[tuple] = None,
+                                   include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Busca cartas similares para várias estratégias de uma vez
         
-        # 🚨 ÂNCORA: SEMANTIC_FILTERS - Filtros aplicados após busca semântica
-        # Contexto: ChromaDB permite where clauses para filtrar metadata
-        # Cuidado: Filtros muito restritivos podem reduzir qualidade semântica
-        # Dependências: Metadata deve estar correta na criação dos embeddings
+        Todas as queries ausentes do cache são codificadas num único forward
+        pass e enviadas numa única chamada ao índice; os filtros são os mesmos
+        para todas as estratégias. Com include_embeddings, cada resultado traz
+        o vetor da carta em 'embedding'.
         
-        # Construir filtros
-        where_clause = {}
+        Returns:
+            Uma lista de resultados (formato de search_similar_cards) por estratégia
+        """
+        if not strategy_texts:
+            return []
         
-        if filter_factions:
-            # Filtrar por facções usando operador $or
-            faction_filters = []
-            for faction in filter_factions:
-                faction_filters.append({"factions": {"$contains": faction}})
+        # Realizar busca semântica (embeddings das queries vêm do cache LRU)
+        return self.search_by_embeddings_batch(
+            self.encode_queries(strategy_texts),
+            n_results=n_results,
+            filter_factions=filter_factions,
+            include_market=include_market,
+            cost_range=cost_range,
+            include_embeddings=include_embeddings
+        )
+    
+    def search_by_embeddings_batch(self,
+                                   query_embeddings: np.ndarray,
+                                   n_results: int = 60,
+                                   filter_factions: Optional[List[str]] = None,
+                                   include_market: bool = False,
+                                   cost_range: Optional[tuple] = None,
+                                   include_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Busca vetorial a partir de vetores já prontos (sem encode de texto)
+        
+        Args:
+            query_embeddings: Matriz (n_queries, dim) no espaço do modelo de embeddings
             
-            if len(faction_filters) > 1:
-                where_clause["$or"] = faction_filters
-            else:
-                where_clause = faction_filters[0]
+        Returns:
+            Uma lista de resultados (formato de search_similar_cards) por vetor
+        """
+        query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        where_clause = self._build_where_clause(filter_factions, include_market, cost_range)
         
-        if not include_market:
-            where_clause["is_market"] = False
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
         
-        if cost_range:
-            where_clause["cost"] = {
-                "$gte": cost_range[0],
-                "$lte": cost_range[1]
-            }
+        results = self._query_index(
+            query_embeddings,
+            n_results=n_results,
+            where=where_clause,
+            include=include
+        )
         
-        # Realizar busca semântica
-        results = collection.query(
-            query_texts=[strategy_text],
+        return [self._format_results(results, row) for row in range(len(query_embeddings))]
+    
+    def search_hybrid_cards_batch(self,
+                                  strategy_texts: List[str],
+                                  n_results: int = 60,
+                                  filter_factions: Optional[List[str]] = None,
+                                  include_market: bool = False,
+                                  cost_range: Optional[tuple] = None,
+                                  fusion: str = 'rrf',
+                                  vector_weight: float = 1.0,
+                                  lexical_weight: float = 1.0,
+                                  include_embeddings: bool = False,
+                                  query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict]]:
+        """
+        Busca híbrida: BM25 + vetorial em paralelo, combinadas por fusão de ranks
+        
+        Args:
+            strategy_texts: Textos das estratégias
+            n_results: Resultados por estratégia (cada retriever busca n_results)
+            filter_factions, include_market, cost_range: Mesmos filtros da busca vetorial
+            fusion: 'rrf' (reciprocal rank fusion) ou 'weighted' (scores normalizados)
+            vector_weight, lexical_weight: Peso de cada retriever na fusão
+            include_embeddings: Traz o vetor das cartas vindas da busca vetorial
+            query_embeddings: Vetores prontos para o lado vetorial (ex.: com priors);
+                              sem eles os textos são codificados
+            
+        Returns:
+            Uma lista por estratégia no formato de search_similar_cards, onde
+            similarity_score é o score fundido normalizado (1.0 = melhor) e
+            vector_score/lexical_score trazem os scores brutos (None se ausente)
+        """
+        # 🚨 ÂNCORA: HYBRID_RETRIEVAL - Lexical + vetorial com fusão de ranks
+        # Contexto: BM25 acha mecânicas/nomes exatos, embeddings acham conceitos
+        # Cuidado: Latências por etapa ficam em last_search_timings (última busca da thread)
+        # Dependências: rag/bm25_index.py, rag/fusion.py
+        
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Fusão inválida '{fusion}' (use {FUSION_METHODS})")
+        if not strategy_texts:
+            return []
+        
+        where_clause = self._build_where_clause(filter_factions, include_market, cost_range)
+        
+        def timed(function, *args, **kwargs):
+            t0 = time.perf_counter()
+            result = function(*args, **kwargs)
+            return result, (time.perf_counter() - t0) * 1000
+        
+        start = time.perf_counter()
+        
+        if query_embeddings is None:
+            query_embeddings = self.encode_queries(strategy_texts)
+        
+        vector_future = self._retrieval_executor.submit(
+            timed, self.search_by_embeddings_batch, query_embeddings,
             n_results=n_results,
-            where=where_clause if where_clause else None,
-            include=["documents", "metadatas", "distances"]
+            filter_factions=filter_factions,
+            include_market=include_market,
+            cost_range=cost_range,
+            include_embeddings=include_embeddings
+        )
+        lexical_future = self._retrieval_executor.submit(
+            timed, lambda: self.get_bm25_index().query(
+                strategy_texts, n_results=n_results, where=where_clause
+            )
         )
         
-        # Formatar resultados
-        formatted_results = []
+        vector_batch, vector_ms = vector_future.result()
+        lexical_results, lexical_ms = lexical_future.result()
         
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i, card_id in enumerate(results['ids'][0]):
-                formatted_results.append({
-                    'id': card_id,
-                    'name': results['metadatas'][0][i]['name'],
-                    'metadata': results['metadatas'][0][i],
-                    'text': results['documents'][0][i],
-                    'similarity_score': 1 - results['distances'][0][i],  # Converter distância em similaridade
-                    'distance': results['distances'][0][i]
-                })
+        t0 = time.perf_counter()
+        fused_batch = []
         
-        return formatted_results
+        for row, vector_results in enumerate(vector_batch):
+            candidates = {result['id']: dict(result, vector_score=result['similarity_score'],
+                                             lexical_score=None)
+                          for result in vector_results}
+            
+            lexical_scores = {}
+            for i, card_id in enumerate(lexical_results['ids'][row]):
+                lexical_scores[card_id] = lexical_results['scores'][row][i]
+                if card_id not in candidates:
+                    candidates[card_id] = {
+                        'id': card_id,
+                        'name': lexical_results['metadatas'][row][i]['name'],
+                        'metadata': lexical_results['metadatas'][row][i],
+                        'text': lexical_results['documents'][row][i],
+                        'vector_score': None
+                    }
+                candidates[card_id]['lexical_score'] = lexical_scores[card_id]
+            
+            vector_scores = {result['id']: result['similarity_score'] for result in vector_results}
+            weights = [vector_weight, lexical_weight]
+            
+            if fusion == 'rrf':
+                fused = reciprocal_rank_fusion(
+                    [[result['id'] for result in vector_results], lexical_results['ids'][row]],
+                    weights
+                )
+            else:
+                fused = weighted_score_fusion([vector_scores, lexical_scores], weights)
+            
+            ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:n_results]
+            best = ranked[0][1] if ranked and ranked[0][1] > 0 else 1.0
+            
+            fused_results = []
+            for card_id, score in ranked:
+                result = candidates[card_id]
+                result['fusion_score'] = score
+                result['similarity_score'] = score / best
+                result['distance'] = 1 - result['similarity_score']
+                fused_results.append(result)
+            
+            fused_batch.append(fused_results)
+        
+        fusion_ms = (time.perf_counter() - t0) * 1000
+        
+        self.last_search_timings = {
+            'vector_ms': vector_ms,
+            'lexical_ms': lexical_ms,
+            'fusion_ms': fusion_ms,
+            'total_ms': (time.perf_counter() - start) * 1000
+        }
+        
+        return fused_batch
+    
+    def search_similar_cards_by_type(self,
+                                     strategy_text: str,
+                                     n_results_by_type: Dict[str, int],
+                                     filter_factions: Optional[List[str]] = None,
+                                     include_market: bool = False,
+                                     include_embeddings: bool = False,
+                                     query_embedding: Optional[np.ndarray] = None) -> Dict[str, List[Dict]]:
+        """
+        Uma busca vetorial filtrada por categoria de tipo, todas em paralelo
+        
+        Args:
+            strategy_text: Texto da estratégia (codificado uma única vez)
+            n_results_by_type: Categoria de TYPE_FILTERS -> resultados pedidos
+            filter_factions, include_market: Mesmos filtros da busca vetorial
+            include_embeddings: Cada resultado traz o vetor da carta em 'embedding'
+            query_embedding: Vetor pronto da estratégia (dispensa o encode do texto)
+            
+        Returns:
+            Categoria -> resultados no formato de search_similar_cards
+        """
+        # 🚨 ÂNCORA: TYPE_QUOTA_RETRIEVAL - Top-k por tipo em vez de top-k global
+        # Contexto: Cada query só pontua cartas do seu tipo; juntas custam o
+        #           mesmo que uma busca sem filtro de tipo e rodam em paralelo
+        # Cuidado: Categoria desconhecida gera KeyError (use TYPE_FILTERS)
+        # Dependências: Metadata is_unit/is_spell/is_weapon/is_relic/is_power
+        
+        wanted = {category: n for category, n in n_results_by_type.items() if n > 0}
+        if not wanted:
+            return {}
+        
+        start = time.perf_counter()
+        base_where = self._build_where_clause(filter_factions, include_market)
+        if query_embedding is None:
+            query_embedding = self.encode_queries([strategy_text])
+        query_embedding = np.atleast_2d(np.asarray(query_embedding, dtype=np.float32))
+        
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+        
+        def timed_query(category: str, n_results: int):
+            t0 = time.perf_counter()
+            results = self._query_index(
+                query_embedding,
+                n_results=n_results,
+                where=combine_where(base_where, TYPE_FILTERS[category]),
+                include=include
+            )
+            return results, (time.perf_counter() - t0) * 1000
+        
+        futures = {
+            category: self._type_query_executor.submit(timed_query, category, n)
+            for category, n in wanted.items()
+        }
+        
+        results_by_type = {}
+        timings = {}
+        for category, future in futures.items():
+            results, elapsed_ms = future.result()
+            results_by_type[category] = self._format_results(results)
+            timings[f"{category}_ms"] = elapsed_ms
+        
+        timings['total_ms'] = (time.perf_counter() - start) * 1000
+        self.last_search_timings = timings
+        
+        return results_by_type
+    
+    def get_card_embeddings(self, card_ids: List[str]) -> Dict[str, np.ndarray]:
+        """Vetores armazenados das cartas pedidas (id -> embedding float32)"""
+        if not card_ids:
+            return {}
+        
+        if self.backend == 'numpy':
+            index = self.get_numpy_index()
+            known = [card_id for card_id in card_ids if card_id in index]
+            return dict(zip(known, index.get_embeddings(known)))
+        
+        data = self._get_collection().get(ids=list(card_ids), include=['embeddings'])
+        return {
+            card_id: np.asarray(embedding, dtype=np.float32)
+            for card_id, embedding in zip(data['ids'], data['embeddings'])
+        }
+    
+    def search_hybrid_cards(self, strategy_text: str, n_results: int = 60, **kwargs) -> List[Dict]:
+        """Busca híbrida para uma única estratégia (ver search_hybrid_cards_batch)"""
+        return self.search_hybrid_cards_batch([strategy_text], n_results=n_results, **kwargs)[0]
     
     def _create_embedding_text(self, card: Card) -> str:
         """
@@ -276,7 +1184,7 @@ class ChromaDBManager:
         
         parts = [
             f"Card: {card.name}",
-            f"Type: {card.type}",
+            f"Type: {card.card_type}",
             f"Cost: {card.cost}",
         ]
         
@@ -286,8 +1194,8 @@ class ChromaDBManager:
         if card.is_unit:
             parts.append(f"Stats: {card.attack}/{card.health}")
         
-        if card.card_text:
-            parts.append(f"Text: {card.card_text}")
+        if card.text:
+            parts.append(f"Text: {card.text}")
         
         if card.rarity:
             parts.append(f"Rarity: {card.rarity}")
@@ -303,10 +1211,10 @@ class ChromaDBManager:
         """Extrai keywords relevantes do texto da carta"""
         keywords = []
         
-        if not card.card_text:
+        if not card.text:
             return keywords
         
-        text_lower = card.card_text.lower()
+        text_lower = card.text.lower()
         
         # Keywords de mecânicas
         mechanics = [
@@ -328,7 +1236,7 @@ class ChromaDBManager:
             keywords.append('removal')
         if 'kill' in text_lower or 'destroy' in text_lower:
             keywords.append('hard-removal')
-        if '+' in card.card_text and '/' in card.card_text:
+        if '+' in card.text and '/' in card.text:
             keywords.append('buff')
         if 'power' in text_lower and 'play' in text_lower:
             keywords.append('ramp')
@@ -337,42 +1245,11 @@ class ChromaDBManager:
         
         return keywords
     
-    def _is_market_card(self, card: Card) -> bool:
-        """Detecta se é uma carta relacionada a mercado"""
-        if not card.card_text:
-            return False
-        
-        market_terms = ['market', 'merchant', 'smuggler', 'etchings']
-        text_lower = card.card_text.lower()
-        
-        return any(term in text_lower for term in market_terms)
-    
-    def _save_collection_metadata(self, stats: Dict):
-        """Salva metadata sobre a coleção"""
-        metadata_path = os.path.join(self.persist_directory, 'collection_metadata.json')
-        
-        metadata = {
-            'created_at': datetime.now().isoformat(),
-            'stats': stats,
-            'embedding_model': 'all-MiniLM-L6-v2',
-            'collection_name': self.collection_name
-        }
-        
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-    
     def get_collection_info(self) -> Dict:
-        """Retorna informações sobre a coleção atual"""
+        """Retorna informações sobre a coleção atual (não carrega o modelo)"""
         try:
-            collection = self.chroma_client.get_collection(self.collection_name)
-            
-            metadata_path = os.path.join(self.persist_directory, 'collection_metadata.json')
-            
-            if os.path.exists(metadata_path):
-                with open(metadata_path, 'r') as f:
-                    metadata = json.load(f)
-            else:
-                metadata = {}
+            collection = self._get_collection()
+            metadata = read_collection_metadata(self.persist_directory)
             
             return {
                 'exists': True,
@@ -393,12 +1270,20 @@ if __name__ == "__main__":
     
     manager = ChromaDBManager()
     
+    # python rag/chromadb_setup.py rollback [versão]
+    if sys.argv[1:2] == ['rollback']:
+        manager.rollback_version(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        for entry in manager.list_versions():
+            marker = '*' if entry['active'] else ' '
+            print(f" {marker} v{entry['version']}: {entry['collection_name']} ({entry['created_at']})")
+        sys.exit(0)
+    
     # Verificar se já existe
     info = manager.get_collection_info()
     
     if info['exists']:
         print(f"\n📊 Coleção existente encontrada com {info['count']} cartas")
-        response = input("Deseja recriar do zero? (s/n): ")
+        response = input("Deseja construir uma nova versão? (s/n): ")
         force_recreate = response.lower() == 's'
     else:
         print("\n📊 Nenhuma coleção encontrada, criando nova...")
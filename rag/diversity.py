@@ -0,0 +1,94 @@
+# rag/diversity.py
+"""
+🚨 ÂNCORA: MMR_RERANK - Re-ranking por Maximal Marginal Relevance
+Contexto: Ordena candidatos equilibrando relevância e redundância semântica,
+          com cotas opcionais por tipo de carta
+Cuidado: Opera só sobre a matriz de embeddings dos candidatos (~160 x 384);
+         candidatos além da cota vão para o fim, por relevância
+Dependências: numpy
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def mmr_rerank(embeddings: np.ndarray,
+               relevance: Sequence[float],
+               lambda_: float = 0.7,
+               categories: Optional[Sequence[str]] = None,
+               quotas: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """
+    Ordem MMR dos candidatos
+
+    score(i) = λ·relevância(i) - (1-λ)·max_{j selecionado} cos(i, j)
+
+    Args:
+        embeddings: Matriz (n, dim) dos candidatos
+        relevance: Score de relevância de cada candidato
+        lambda_: 1.0 = só relevância, 0.0 = só diversidade
+        categories: Categoria de cada candidato (ex.: tipo da carta)
+        quotas: Máximo de candidatos por categoria na parte diversificada
+
+    Returns:
+        Índices dos candidatos na nova ordem (todos os n)
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = len(relevance)
+    if n == 0:
+        return np.array([], dtype=np.int64)
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = matrix / norms
+
+    # Cota restante por candidato (via código da categoria)
+    if categories is not None and quotas:
+        labels, codes = np.unique(np.asarray(categories, dtype=object), return_inverse=True)
+        remaining = np.array([quotas.get(label, n) for label in labels], dtype=np.int64)
+    else:
+        codes = np.zeros(n, dtype=np.int64)
+        remaining = np.array([n], dtype=np.int64)
+
+    # Relevância ponderada com -inf nos inelegíveis: score = base - penalty
+    base = lambda_ * relevance
+    base[remaining[codes] <= 0] = -np.inf
+    # penalty = (1-λ)·max cos(i, j) sobre os selecionados, atualizada com
+    # uma linha da similaridade (já ponderada) por escolha
+    similarity = matrix @ matrix.T
+    similarity *= np.float32(1 - lambda_)
+    penalty = np.zeros(n, dtype=np.float32)
+    scores = np.empty(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    order = []
+
+    # Cotas em listas Python: acessos escalares no laço sem overhead do NumPy
+    code_of = codes.tolist()
+    left = remaining.tolist()
+
+    for _ in range(n):
+        np.subtract(base, penalty, out=scores)
+        best = int(scores.argmax())
+        if scores[best] == -np.inf:
+            break
+
+        order.append(best)
+        available[best] = False
+        base[best] = -np.inf
+
+        code = code_of[best]
+        left[code] -= 1
+        if left[code] == 0:
+            base[codes == code] = -np.inf
+
+        if len(order) == 1:
+            penalty[:] = similarity[best]
+        else:
+            np.maximum(penalty, similarity[best], out=penalty)
+
+    # Excedentes das cotas, por relevância
+    rest = np.flatnonzero(available)
+    rest = rest[np.argsort(-relevance[rest], kind='stable')]
+
+    return np.concatenate([np.array(order, dtype=np.int64), rest])
@@ -0,0 +1,152 @@
+# rag/embedding_cache.py
+"""
+🚨 ÂNCORA: EMBEDDING_CACHE - Cache em disco de embeddings por hash de conteúdo
+Contexto: Recriar o índice só codifica cartas novas ou com texto alterado
+Cuidado: Chave = hash(modelo + texto de _create_embedding_text); mudar o formato
+         do texto invalida apenas as cartas cujo texto mudou
+Dependências: numpy, rag.embeddings (nome do modelo)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from rag.embeddings import EMBEDDING_MODEL_NAME
+
+DEFAULT_CACHE_DIRECTORY = "./data/embedding_cache"
+
+
+class EmbeddingCache:
+    """Vetores de embedding persistidos em disco, indexados por hash do texto"""
+
+    def __init__(self,
+                 cache_directory: str = DEFAULT_CACHE_DIRECTORY,
+                 model_name: str = EMBEDDING_MODEL_NAME):
+        """
+        Args:
+            cache_directory: Diretório do cache (ao lado de data/embeddings)
+            model_name: Modelo que gerou os vetores (faz parte da chave)
+        """
+        # Um subdiretório por modelo (dimensões podem diferir entre modelos)
+        self.cache_directory = os.path.join(cache_directory, model_name.replace('/', '_'))
+        self.model_name = model_name
+
+        self._keys_path = os.path.join(self.cache_directory, 'keys.json')
+        self._vectors_path = os.path.join(self.cache_directory, 'vectors.npy')
+
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._new_vectors: Dict[str, np.ndarray] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        # Estatísticas da última execução
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        """Chave do cache: sha256 de modelo + texto"""
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode('utf-8')).hexdigest()
+
+    def _load(self):
+        if self._loaded:
+            return
+
+        if os.path.exists(self._keys_path) and os.path.exists(self._vectors_path):
+            try:
+                with open(self._keys_path, 'r') as f:
+                    keys = json.load(f)
+                vectors = np.load(self._vectors_path)
+
+                if len(keys) == len(vectors):
+                    self._rows = {key: row for row, key in enumerate(keys)}
+                    self._vectors = vectors
+                else:
+                    print("⚠️ Cache de embeddings inconsistente, ignorando")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Erro ao ler cache de embeddings: {e}")
+
+        self._loaded = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._rows) + len(self._new_vectors)
+
+    def lookup(self, texts: List[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """
+        Busca vetores em cache
+
+        Returns:
+            (vetores alinhados com texts - None quando ausente, índices ausentes)
+        """
+        with self._lock:
+            self._load()
+
+            found: List[Optional[np.ndarray]] = []
+            missing: List[int] = []
+
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                if key in self._new_vectors:
+                    found.append(self._new_vectors[key])
+                elif key in self._rows:
+                    found.append(self._vectors[self._rows[key]])
+                else:
+                    found.append(None)
+                    missing.append(i)
+
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def store(self, texts: List[str], vectors: np.ndarray):
+        """Adiciona vetores recém-calculados (persistidos em save())"""
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                self._new_vectors[self.key(text)] = np.asarray(vector, dtype=np.float32)
+
+    def save(self, keep_texts: Optional[List[str]] = None):
+        """
+        Persiste o cache em disco (escrita atômica)
+
+        Args:
+            keep_texts: Se informado, mantém apenas entradas desses textos
+                        (remove vetores de cartas que saíram do catálogo)
+        """
+        with self._lock:
+            self._load()
+
+            entries: Dict[str, np.ndarray] = {}
+            for key, row in self._rows.items():
+                entries[key] = self._vectors[row]
+            entries.update(self._new_vectors)
+
+            if keep_texts is not None:
+                keep_keys = {self.key(text) for text in keep_texts}
+                entries = {key: vec for key, vec in entries.items() if key in keep_keys}
+
+            if not entries:
+                return
+
+            keys = list(entries.keys())
+            vectors = np.vstack([entries[key] for key in keys]).astype(np.float32)
+
+            os.makedirs(self.cache_directory, exist_ok=True)
+
+            tmp_vectors = self._vectors_path + '.tmp.npy'
+            tmp_keys = self._keys_path + '.tmp'
+            np.save(tmp_vectors, vectors)
+            with open(tmp_keys, 'w') as f:
+                json.dump(keys, f)
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_keys, self._keys_path)
+
+            self._rows = {key: row for row, key in enumerate(keys)}
+            self._vectors = vectors
+            self._new_vectors = {}
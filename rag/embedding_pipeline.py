@@ -0,0 +1,201 @@
+# rag/embedding_pipeline.py
+"""
+🚨 ÂNCORA: EMBEDDING_PIPELINE - Criação de embeddings em lote com vetores pré-calculados
+Contexto: Substitui o embedding batch a batch feito internamente pelo ChromaDB
+Cuidado: Vetores devem vir do mesmo modelo usado nas queries (EMBEDDING_MODEL_NAME)
+Dependências: rag.embeddings, numpy, ChromaDB (collection.add com embeddings=)
+"""
+
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from rag.embeddings import EMBEDDING_MODEL_NAME, get_embedding_function
+from rag.embedding_cache import EmbeddingCache
+
+# Modelo carregado em cada processo worker
+_worker_model = None
+
+
+def _init_worker(model_name: str):
+    """Carrega o modelo uma vez por processo do pool"""
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    return _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        show_progress_bar=False
+    ).astype(np.float32)
+
+
+class EmbeddingPipeline:
+    """
+    Pipeline de embeddings: encode em lotes grandes + inserção sobreposta
+
+    Enquanto o lote N é inserido no ChromaDB (thread de inserção), o lote
+    N+1 já está sendo codificado - no processo atual ou em um pool de
+    processos quando num_workers > 1.
+    """
+
+    def __init__(self,
+                 model_name: str = EMBEDDING_MODEL_NAME,
+                 encode_batch_size: int = 256,
+                 chunk_size: int = 512,
+                 num_workers: int = 0,
+                 encoder=None):
+        """
+        Args:
+            model_name: Modelo sentence-transformers
+            encode_batch_size: Batch de cada forward pass do modelo
+            chunk_size: Documentos por lote de encode/inserção
+            num_workers: Processos para encode (0/1 = processo atual)
+            encoder: Objeto com encode(texts, batch_size) usado no processo
+                     atual (padrão: modelo compartilhado de get_embedding_function)
+        """
+        self.model_name = model_name
+        self.encode_batch_size = encode_batch_size
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers
+        self.encoder = encoder
+
+    def run(self,
+            collection,
+            ids: List[str],
+            documents: List[str],
+            metadatas: List[Dict],
+            progress_callback: Optional[Callable[[int, int], None]] = None,
+            cache: Optional[EmbeddingCache] = None) -> Dict:
+        """
+        Codifica e insere todos os documentos na coleção
+
+        Args:
+            collection: Coleção ChromaDB de destino
+            ids, documents, metadatas: Dados alinhados por índice
+            progress_callback: Chamado com (cartas_processadas, total) após cada lote
+            cache: Cache de embeddings por conteúdo; só textos ausentes são codificados
+
+        Returns:
+            Dict com tempos e throughput (cartas/segundo)
+        """
+        total = len(documents)
+        start = time.perf_counter()
+        encode_time = 0.0
+        insert_time = 0.0
+        done = 0
+
+        chunk_starts = list(range(0, total, self.chunk_size))
+
+        # Vetores já conhecidos (texto idêntico + mesmo modelo)
+        if cache is not None:
+            cached, _ = cache.lookup(documents)
+        else:
+            cached = [None] * total
+
+        def chunk_missing(begin: int) -> List[int]:
+            end = min(begin + self.chunk_size, total)
+            return [i for i in range(begin, end) if cached[i] is None]
+
+        def assemble(begin: int, missing: List[int], encoded: Optional[np.ndarray]) -> np.ndarray:
+            """Junta vetores do cache com os recém-codificados, na ordem do lote"""
+            if missing:
+                missing_texts = [documents[i] for i in missing]
+                if cache is not None:
+                    cache.store(missing_texts, encoded)
+                for i, vector in zip(missing, encoded):
+                    cached[i] = vector
+            end = min(begin + self.chunk_size, total)
+            return np.vstack(cached[begin:end]).astype(np.float32)
+
+        encoded_cards = sum(1 for vector in cached if vector is None)
+
+        def insert(begin: int, embeddings: np.ndarray) -> float:
+            t0 = time.perf_counter()
+            end = begin + len(embeddings)
+            collection.add(
+                ids=ids[begin:end],
+                embeddings=embeddings.tolist(),
+                documents=documents[begin:end],
+                metadatas=metadatas[begin:end]
+            )
+            return time.perf_counter() - t0
+
+        encode_pool = None
+        if self.num_workers > 1 and encoded_cards:
+            encode_pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.model_name,)
+            )
+
+        try:
+            # Encodes em paralelo no pool: todos os lotes enviados de uma vez
+            if encode_pool is not None:
+                encode_futures = []
+                for begin in chunk_starts:
+                    missing_texts = [documents[i] for i in chunk_missing(begin)]
+                    encode_futures.append(
+                        encode_pool.submit(_encode_in_worker, missing_texts, self.encode_batch_size)
+                        if missing_texts else None
+                    )
+            elif encoded_cards:
+                embedding_function = self.encoder or get_embedding_function(self.model_name)
+
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-insert") as inserter:
+                pending: Optional[Future] = None
+
+                for index, begin in enumerate(chunk_starts):
+                    # Encode do lote N+1 enquanto o lote N é inserido
+                    t0 = time.perf_counter()
+                    missing = chunk_missing(begin)
+                    encoded = None
+                    if missing and encode_pool is not None:
+                        encoded = encode_futures[index].result()
+                    elif missing:
+                        encoded = embedding_function.encode(
+                            [documents[i] for i in missing],
+                            batch_size=self.encode_batch_size
+                        ).astype(np.float32)
+                    embeddings = assemble(begin, missing, encoded)
+                    encode_time += time.perf_counter() - t0
+
+                    if pending is not None:
+                        insert_time += pending.result()
+                        done += self.chunk_size
+                        if progress_callback:
+                            progress_callback(min(done, total), total)
+
+                    pending = inserter.submit(insert, begin, embeddings)
+
+                if pending is not None:
+                    insert_time += pending.result()
+                    done = total
+                    if progress_callback:
+                        progress_callback(done, total)
+        finally:
+            if encode_pool is not None:
+                encode_pool.shutdown()
+
+        # Persistir cache mantendo só as cartas atuais do catálogo
+        if cache is not None:
+            cache.save(keep_texts=documents)
+
+        total_time = time.perf_counter() - start
+
+        return {
+            'embedded_cards': total,
+            'encoded_cards': encoded_cards,
+            'cache_hits': total - encoded_cards,
+            'encode_time': encode_time,
+            'insert_time': insert_time,
+            'pipeline_time': total_time,
+            'cards_per_second': total / total_time if total_time > 0 else 0.0,
+            'num_workers': max(self.num_workers, 1)
+        }
@@ -0,0 +1,146 @@
+# rag/embeddings.py
+"""
+🚨 ÂNCORA: RAG_EMBEDDINGS - Modelo de embeddings compartilhado e carregado sob demanda
+Contexto: Um único SentenceTransformer por processo, usado pelo ChromaDB e pelas queries
+Cuidado: Trocar o modelo exige recriar todos os embeddings da coleção
+Dependências: sentence-transformers (importado apenas no primeiro uso)
+"""
+
+import gc
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from chromadb import EmbeddingFunction
+except ImportError:  # Permite usar o encoder sem chromadb instalado
+    EmbeddingFunction = object
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+class LazySentenceTransformerEmbedding(EmbeddingFunction):
+    """
+    Função de embedding do ChromaDB com carregamento preguiçoso do modelo
+
+    O modelo só é carregado no primeiro encode e, com idle_timeout definido,
+    é descarregado após esse tempo sem uso (nós com pouco tráfego).
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME,
+                 idle_timeout: Optional[float] = None):
+        """
+        Args:
+            model_name: Nome do modelo sentence-transformers
+            idle_timeout: Segundos sem uso até liberar o modelo (None = nunca)
+        """
+        self.model_name = model_name
+        self.idle_timeout = idle_timeout
+
+        self._model = None
+        self._lock = threading.RLock()
+        self._last_used = 0.0
+        self._reaper: Optional[threading.Thread] = None
+
+        # Estatísticas de uso
+        self.load_count = 0
+        self.eviction_count = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self):
+        """Retorna o SentenceTransformer, carregando-o se necessário"""
+        with self._lock:
+            if self._model is None:
+                print(f"Carregando modelo de embeddings '{self.model_name}'...")
+                self._model = self._load_model()
+                self.load_count += 1
+                self._start_reaper()
+
+            self._last_used = time.monotonic()
+            return self._model
+
+    def _load_model(self):
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 32):
+        """Codifica textos em vetores numpy (float32)"""
+        model = self.model
+        embeddings = model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        self._last_used = time.monotonic()
+        return embeddings
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Interface EmbeddingFunction do ChromaDB"""
+        return self.encode(list(input)).tolist()
+
+    def unload(self):
+        """Libera o modelo da memória"""
+        with self._lock:
+            if self._model is not None:
+                self._model = None
+                self.eviction_count += 1
+                gc.collect()
+                print(f"Modelo '{self.model_name}' descarregado por inatividade")
+
+    def _start_reaper(self):
+        """Inicia a thread que descarrega o modelo ocioso"""
+        if not self.idle_timeout or (self._reaper and self._reaper.is_alive()):
+            return
+
+        self._reaper = threading.Thread(
+            target=self._reap_idle_model,
+            name=f"embedding-reaper-{self.model_name}",
+            daemon=True
+        )
+        self._reaper.start()
+
+    def _reap_idle_model(self):
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+
+        while self._model is not None and self.idle_timeout:
+            time.sleep(interval)
+
+            with self._lock:
+                idle_for = time.monotonic() - self._last_used
+                if self._model is not None and idle_for >= self.idle_timeout:
+                    self.unload()
+                    return
+
+
+# Uma instância por modelo no processo (evita dois modelos iguais em memória)
+_embedding_functions: Dict[str, LazySentenceTransformerEmbedding] = {}
+_embedding_functions_lock = threading.Lock()
+
+
+def get_embedding_function(model_name: str = EMBEDDING_MODEL_NAME,
+                           idle_timeout: Optional[float] = None) -> LazySentenceTransformerEmbedding:
+    """
+    Retorna a função de embedding compartilhada para o modelo
+
+    Args:
+        model_name: Nome do modelo sentence-transformers
+        idle_timeout: Se informado, ativa/atualiza a liberação por inatividade
+    """
+    with _embedding_functions_lock:
+        embedding_function = _embedding_functions.get(model_name)
+
+        if embedding_function is None:
+            embedding_function = LazySentenceTransformerEmbedding(model_name, idle_timeout)
+            _embedding_functions[model_name] = embedding_function
+        elif idle_timeout is not None:
+            embedding_function.idle_timeout = idle_timeout
+            if embedding_function.is_loaded:
+                embedding_function._start_reaper()
+
+    return embedding_function
@@ -0,0 +1,61 @@
+# rag/fusion.py
+"""
+🚨 ÂNCORA: RANK_FUSION - Combinação de rankings lexical (BM25) e vetorial
+Contexto: Busca híbrida em ChromaDBManager.search_hybrid_cards
+Cuidado: RRF usa só posições (escalas de score diferentes não importam);
+         a fusão ponderada normaliza cada lista por min-max antes de somar
+Dependências: Nenhuma
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[str]],
+                           weights: Optional[Sequence[float]] = None,
+                           k: int = RRF_K) -> Dict[str, float]:
+    """
+    Reciprocal Rank Fusion: score(d) = Σ w_i / (k + posição_i(d))
+
+    Args:
+        rankings: Listas de IDs ordenadas por relevância (uma por retriever)
+        weights: Peso de cada retriever (padrão 1.0)
+        k: Constante de suavização (60 no artigo original)
+
+    Returns:
+        Dict id -> score fundido
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+
+    for ranking, weight in zip(rankings, weights):
+        for position, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + weight / (k + position)
+
+    return fused
+
+
+def weighted_score_fusion(score_maps: Sequence[Dict[str, float]],
+                          weights: Optional[Sequence[float]] = None) -> Dict[str, float]:
+    """
+    Soma ponderada de scores normalizados (min-max) por retriever
+
+    Args:
+        score_maps: Dicts id -> score bruto (um por retriever)
+        weights: Peso de cada retriever (padrão 1.0)
+    """
+    weights = weights or [1.0] * len(score_maps)
+    fused: Dict[str, float] = {}
+
+    for scores, weight in zip(score_maps, weights):
+        if not scores:
+            continue
+
+        low, high = min(scores.values()), max(scores.values())
+        spread = (high - low) or 1.0
+
+        for item_id, score in scores.items():
+            fused[item_id] = fused.get(item_id, 0.0) + weight * (score - low) / spread
+
+    return fused
@@ -0,0 +1,161 @@
+# rag/index_artifact.py
+"""
+🚨 ÂNCORA: INDEX_ARTIFACT - Índice RAG pré-construído em um único arquivo .npz
+Contexto: Novos nós carregam embeddings + ids + metadata prontos, sem planilha,
+          sem modelo e sem encode (ChromaDB ou índice NumPy em segundos)
+Cuidado: Só é compatível com o mesmo modelo de embeddings (queries no mesmo espaço)
+         e o mesmo formato de texto (embedding_format); ambos checados no import
+Dependências: numpy (sem pickle - strings em arrays unicode e metadata em JSON)
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.numpy_index import NumpyVectorIndex
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+class IndexArtifact:
+    """Conteúdo de um artefato de índice (vetores como armazenados na coleção)"""
+
+    def __init__(self,
+                 ids: List[str],
+                 embeddings: np.ndarray,
+                 metadatas: List[Dict[str, Any]],
+                 documents: List[str],
+                 manifest: Dict[str, Any]):
+        if not (len(ids) == len(embeddings) == len(metadatas) == len(documents)):
+            raise ValueError("Artefato inconsistente: ids, embeddings, metadata e documentos com tamanhos diferentes")
+
+        self.ids = list(ids)
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.metadatas = list(metadatas)
+        self.documents = list(documents)
+        self.manifest = dict(manifest)
+
+    @classmethod
+    def from_collection(cls, collection, **manifest) -> 'IndexArtifact':
+        """
+        Artefato a partir de uma coleção ChromaDB
+
+        Args:
+            collection: Coleção de origem
+            **manifest: catalog_version, embedding_model, embedding_format, metadata_schema...
+        """
+        data = collection.get(include=['embeddings', 'metadatas', 'documents'])
+        return cls(data['ids'], data['embeddings'], data['metadatas'], data['documents'], manifest)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def check_compatible(self, embedding_model: str, embedding_format: Optional[str] = None):
+        """
+        Confere se o artefato pode ser usado com o modelo/formato locais
+
+        Raises:
+            ValueError: Modelo diferente (queries em outro espaço) ou formato
+                        de texto diferente (documentos incompatíveis)
+        """
+        if self.manifest.get('embedding_model') != embedding_model:
+            raise ValueError(
+                f"Artefato gerado com o modelo '{self.manifest.get('embedding_model')}', "
+                f"mas o local é '{embedding_model}'"
+            )
+        if embedding_format is not None and self.manifest.get('embedding_format') != embedding_format:
+            raise ValueError(
+                f"Formato de texto do artefato ({self.manifest.get('embedding_format')}) "
+                f"difere do atual ({embedding_format}) - reconstrua o artefato"
+            )
+
+    def to_numpy_index(self, dtype: str = 'float32', **kwargs) -> NumpyVectorIndex:
+        """Índice em memória direto do artefato (sem ChromaDB)"""
+        return NumpyVectorIndex(
+            ids=self.ids,
+            embeddings=self.embeddings,
+            metadatas=self.metadatas,
+            documents=self.documents,
+            dtype=dtype,
+            **kwargs
+        )
+
+    def save(self, path: str, compressed: bool = False):
+        """Grava o artefato (.npz) - compressed troca tempo de carga por tamanho"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        manifest = dict(
+            self.manifest,
+            format_version=ARTIFACT_FORMAT_VERSION,
+            count=len(self.ids),
+            dimension=int(self.embeddings.shape[1]) if len(self.ids) else 0,
+            exported_at=datetime.now().isoformat()
+        )
+        arrays = {
+            'embeddings': self.embeddings,
+            'ids': np.array(self.ids, dtype=str),
+            'documents': np.array(self.documents, dtype=str),
+            'metadatas': np.array(json.dumps(self.metadatas)),
+            'manifest': np.array(json.dumps(manifest))
+        }
+
+        # Gravação atômica: nós lendo o artefato publicado nunca veem arquivo parcial
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        (np.savez_compressed if compressed else np.savez)(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        self.manifest = manifest
+
+    @classmethod
+    def load(cls, path: str) -> 'IndexArtifact':
+        with np.load(path, allow_pickle=False) as data:
+            manifest = json.loads(str(data['manifest']))
+            if manifest.get('format_version', 0) > ARTIFACT_FORMAT_VERSION:
+                raise ValueError(
+                    f"Artefato na versão {manifest['format_version']} - "
+                    f"esta versão do código lê até {ARTIFACT_FORMAT_VERSION}"
+                )
+
+            return cls(
+                ids=data['ids'].tolist(),
+                embeddings=data['embeddings'],
+                metadatas=json.loads(str(data['metadatas'])),
+                documents=data['documents'].tolist(),
+                manifest=manifest
+            )
+
+
+def read_artifact_manifest(path: str) -> Dict[str, Any]:
+    """Só o manifesto (sem carregar a matriz)"""
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(str(data['manifest']))
+
+
+# python -m rag.index_artifact export|import|info <arquivo.npz>
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta/importa o índice RAG como artefato .npz")
+    parser.add_argument('command', choices=['export', 'import', 'info'])
+    parser.add_argument('path')
+    parser.add_argument('--compressed', action='store_true')
+    parser.add_argument('--allow-format-mismatch', action='store_true')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        print(json.dumps(read_artifact_manifest(args.path), indent=2))
+        sys.exit(0)
+
+    from rag.chromadb_setup import ChromaDBManager
+
+    manager = ChromaDBManager()
+    if args.command == 'export':
+        manifest = manager.export_index_artifact(args.path, compressed=args.compressed)
+        print(f"📦 {manifest['count']} cartas exportadas para {args.path}")
+    else:
+        stats = manager.import_index_artifact(args.path, allow_format_mismatch=args.allow_format_mismatch)
+        print(f"✅ {stats['embedded_cards']} cartas importadas em {stats['time_taken']:.2f}s (sem encode)")
@@ -0,0 +1,255 @@
+# rag/index_build_job.py
+"""
+🚨 ÂNCORA: INDEX_BUILD_JOB - Build do índice RAG em segundo plano
+Contexto: O build leva minutos; roda em um subprocesso que sobrevive a reruns
+          do Streamlit e grava o progresso em index_build_job.json (UI e CLI consultam)
+Cuidado: NÃO importar chromadb aqui no nível do módulo (UI consulta a cada rerun);
+         a busca continua na versão ativa até a troca atômica do ponteiro
+Dependências: ChromaDBManager.setup_card_embeddings (só dentro do subprocesso)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+sys.path.append('..')
+
+from rag.index_status import DEFAULT_PERSIST_DIRECTORY, build_file_lock, write_json_atomic
+
+JOB_FILENAME = "index_build_job.json"
+JOB_PHASES = ('starting', 'loading_cards', 'encoding', 'validating', 'indexing', 'activating', 'done')
+
+# O subprocesso renova updated_at a cada HEARTBEAT_SECONDS; sem renovação por
+# STALE_AFTER_SECONDS o job é considerado interrompido (processo morto)
+HEARTBEAT_SECONDS = 5
+STALE_AFTER_SECONDS = 60
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_start_lock = threading.Lock()
+
+
+def _job_path(persist_directory: str) -> str:
+    return os.path.join(persist_directory, JOB_FILENAME)
+
+
+def read_build_job(persist_directory: str = DEFAULT_PERSIST_DIRECTORY) -> Dict:
+    """
+    Estado do último build ({} se nunca houve)
+
+    Returns:
+        Dict com status ('running'|'succeeded'|'failed'), phase, done, total,
+        cards_per_second, eta_seconds, started_at, updated_at, error, result
+    """
+    try:
+        with open(_job_path(persist_directory), 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if state.get('status') == 'running' and time.time() - state.get('heartbeat', 0) > STALE_AFTER_SECONDS:
+        state['status'] = 'failed'
+        state['error'] = "Build interrompido (processo encerrado sem concluir)"
+
+    return state
+
+
+def is_build_running(persist_directory: str = DEFAULT_PERSIST_DIRECTORY) -> bool:
+    return read_build_job(persist_directory).get('status') == 'running'
+
+
+def start_build_job(persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                    force_recreate: bool = True,
+                    num_workers: int = 0) -> Dict:
+    """
+    Inicia o build em um subprocesso (não bloqueia)
+
+    Se já houver um build em andamento (ou outro processo iniciando um, com
+    o .build.lock ocupado), apenas retorna o estado dele.
+    """
+    with _start_lock, build_file_lock(persist_directory, blocking=False) as acquired:
+        state = read_build_job(persist_directory)
+        if not acquired or state.get('status') == 'running':
+            return state
+
+        os.makedirs(persist_directory, exist_ok=True)
+        state = _initial_state()
+        write_json_atomic(_job_path(persist_directory), state)
+
+        command = [
+            sys.executable, '-m', 'rag.index_build_job', 'run',
+            '--persist-directory', os.path.abspath(persist_directory),
+            '--workers', str(num_workers)
+        ]
+        if force_recreate:
+            command.append('--force')
+
+        # Nova sessão/grupo: o build não morre junto com o rerun ou a aba
+        if os.name == 'nt':
+            options = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            options = {'start_new_session': True}
+
+        process = subprocess.Popen(
+            command,
+            cwd=PROJECT_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **options
+        )
+
+        state['pid'] = process.pid
+        write_json_atomic(_job_path(persist_directory), state)
+        return state
+
+
+def _initial_state() -> Dict:
+    now = time.time()
+    return {
+        'status': 'running',
+        'phase': 'starting',
+        'done': 0,
+        'total': 0,
+        'cards_per_second': 0.0,
+        'eta_seconds': None,
+        'started_at': datetime.now().isoformat(),
+        'updated_at': datetime.now().isoformat(),
+        'heartbeat': now,
+        'pid': os.getpid(),
+        'error': None,
+        'result': None
+    }
+
+
+class BuildProgress:
+    """Progresso do build persistido em disco (progress_callback do ChromaDBManager)"""
+
+    def __init__(self, persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                 state: Optional[Dict] = None):
+        self.path = _job_path(persist_directory)
+        self.state = dict(state or _initial_state(), pid=os.getpid())
+        self._lock = threading.Lock()
+        self._encoding_started: Optional[float] = None
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def __call__(self, phase: str, done: int, total: int):
+        with self._lock:
+            self.state.update(phase=phase, done=done, total=total)
+
+            if phase == 'encoding':
+                now = time.perf_counter()
+                if self._encoding_started is None:
+                    self._encoding_started = now
+                elapsed = now - self._encoding_started
+                if done and elapsed > 0:
+                    rate = done / elapsed
+                    self.state['cards_per_second'] = round(rate, 1)
+                    self.state['eta_seconds'] = round((total - done) / rate, 1)
+            else:
+                self.state['eta_seconds'] = None
+
+            self._write()
+
+    def start_heartbeat(self):
+        """Renova o heartbeat enquanto o build roda (fases longas sem progresso)"""
+        def beat():
+            while not self._stop.wait(HEARTBEAT_SECONDS):
+                with self._lock:
+                    self._write()
+
+        self._heartbeat = threading.Thread(target=beat, daemon=True)
+        self._heartbeat.start()
+
+    def finish(self, result: Dict):
+        self._close(status='succeeded', phase='done', eta_seconds=0, result=result)
+
+    def fail(self, error: Exception):
+        self._close(status='failed', error=f"{type(error).__name__}: {error}")
+
+    def _close(self, **fields):
+        self._stop.set()
+        with self._lock:
+            self.state.update(fields)
+            self._write()
+
+    def _write(self):
+        self.state['updated_at'] = datetime.now().isoformat()
+        self.state['heartbeat'] = time.time()
+        write_json_atomic(self.path, self.state)
+
+
+def run_build_job(persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                  force_recreate: bool = True,
+                  num_workers: int = 0) -> Dict:
+    """Executa o build no processo atual, gravando o progresso (usado pelo subprocesso)"""
+    state = read_build_job(persist_directory)
+    progress = BuildProgress(persist_directory, state if state.get('status') == 'running' else None)
+    progress.start_heartbeat()
+
+    try:
+        # Import pesado (chromadb/modelo) já coberto pelo heartbeat
+        from rag.chromadb_setup import ChromaDBManager
+
+        manager = ChromaDBManager(persist_directory=persist_directory)
+        result = manager.setup_card_embeddings(
+            force_recreate=force_recreate,
+            num_workers=num_workers,
+            progress_callback=progress
+        )
+    except Exception as e:
+        progress.fail(e)
+        raise
+
+    progress.finish(result)
+    return result
+
+
+def format_build_job(state: Dict) -> str:
+    """Linha de status legível (CLI e UI)"""
+    if not state:
+        return "Nenhum build registrado"
+
+    line = f"{state['status']} | fase: {state['phase']}"
+    if state.get('total'):
+        line += f" | {state['done']}/{state['total']} cartas"
+    if state.get('cards_per_second'):
+        line += f" | {state['cards_per_second']:.0f} cartas/s"
+    if state.get('eta_seconds'):
+        line += f" | ETA {state['eta_seconds']:.0f}s"
+    if state.get('error'):
+        line += f" | erro: {state['error']}"
+    return line
+
+
+# python -m rag.index_build_job start|status|watch
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build do índice RAG em segundo plano")
+    parser.add_argument('command', choices=['start', 'status', 'watch', 'run'])
+    parser.add_argument('--persist-directory', default=DEFAULT_PERSIST_DIRECTORY)
+    parser.add_argument('--force', action='store_true', help="Constrói nova versão mesmo com índice existente")
+    parser.add_argument('--workers', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run_build_job(args.persist_directory, args.force, args.workers)
+        sys.exit(0)
+
+    if args.command == 'start':
+        state = start_build_job(args.persist_directory, args.force, args.workers)
+        print(f"🔧 Build em segundo plano (pid {state.get('pid', '?')})")
+
+    if args.command in ('start', 'watch'):
+        state = read_build_job(args.persist_directory)
+        while state.get('status') == 'running':
+            print(f"\r⏳ {format_build_job(state)}".ljust(100), end='', flush=True)
+            time.sleep(1)
+            state = read_build_job(args.persist_directory)
+        print()
+
+    print(format_build_job(read_build_job(args.persist_directory)))
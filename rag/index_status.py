@@ -0,0 +1,223 @@
+# rag/index_status.py
+"""
+🚨 ÂNCORA: RAG_STATUS - Verificação barata do estado do índice RAG
+Contexto: Sidebar do Streamlit consulta o status a cada rerun
+Cuidado: NÃO importar chromadb/sentence-transformers aqui (custo de import)
+Dependências: collection_metadata.json escrito pelo ChromaDBManager
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_PERSIST_DIRECTORY = "./data/embeddings"
+METADATA_FILENAME = "collection_metadata.json"
+BUILD_LOCK_FILENAME = ".build.lock"
+COLLECTION_BASE_NAME = "eternal_cards"
+
+# Cache do metadata lido, invalidado pelo mtime do arquivo
+_metadata_cache: Dict[str, tuple] = {}
+_metadata_lock = threading.Lock()
+
+
+def read_collection_metadata(persist_directory: str = DEFAULT_PERSIST_DIRECTORY) -> Dict:
+    """Lê collection_metadata.json (com cache por mtime)"""
+    metadata_path = os.path.join(persist_directory, METADATA_FILENAME)
+
+    try:
+        mtime = os.stat(metadata_path).st_mtime_ns
+    except OSError:
+        return {}
+
+    with _metadata_lock:
+        cached = _metadata_cache.get(metadata_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    try:
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    with _metadata_lock:
+        _metadata_cache[metadata_path] = (mtime, metadata)
+
+    return metadata
+
+
+def write_json_atomic(path: str, data: Dict):
+    """
+    Grava JSON atomicamente (arquivo temporário + os.replace)
+
+    Leitores concorrentes veem o conteúdo antigo ou o novo, nunca um JSON parcial.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_collection_metadata(metadata: Dict, persist_directory: str = DEFAULT_PERSIST_DIRECTORY):
+    """Grava collection_metadata.json atomicamente (troca do ponteiro da versão ativa)"""
+    metadata_path = os.path.join(persist_directory, METADATA_FILENAME)
+    write_json_atomic(metadata_path, metadata)
+
+    with _metadata_lock:
+        _metadata_cache.pop(metadata_path, None)
+
+
+# 🚨 ÂNCORA: INDEX_VERSIONS - Versões do índice e ponteiro da versão ativa
+# Contexto: Cada build vai para uma coleção nova (eternal_cards_v{n}); a busca
+#           segue o ponteiro 'collection_name' até a troca atômica do metadata
+# Cuidado: Coleções antigas sem histórico são tratadas como versão 0
+# Dependências: ChromaDBManager (build, troca e rollback)
+
+def versioned_collection_name(version: int) -> str:
+    return f"{COLLECTION_BASE_NAME}_v{version}"
+
+
+def active_collection_name(metadata: Dict) -> str:
+    """Coleção servida pela busca (ponteiro do metadata)"""
+    return metadata.get('collection_name', COLLECTION_BASE_NAME)
+
+
+def collection_versions(metadata: Dict) -> List[Dict]:
+    """Versões registradas no metadata, da mais antiga para a mais nova"""
+    if 'versions' in metadata:
+        return sorted(metadata['versions'], key=lambda entry: entry['version'])
+    if not metadata:
+        return []
+
+    # Coleção criada antes do versionamento
+    return [{
+        'version': 0,
+        'collection_name': active_collection_name(metadata),
+        'created_at': metadata.get('created_at'),
+        'stats': metadata.get('stats', {}),
+        'embedding_model': metadata.get('embedding_model'),
+        'metadata_schema': metadata.get('metadata_schema', 1)
+    }]
+
+
+def activate_version(metadata: Dict, entry: Dict, keep_versions: int) -> Tuple[Dict, List[Dict]]:
+    """
+    Metadata com `entry` como versão ativa
+
+    Args:
+        metadata: Metadata atual
+        entry: Versão a ativar (nova ou já registrada, para rollback)
+        keep_versions: Quantas versões além da ativa manter (as mais novas)
+
+    Returns:
+        (novo metadata, versões descartadas - coleções a apagar)
+    """
+    others = [
+        version for version in collection_versions(metadata)
+        if version['version'] != entry['version']
+    ]
+    others.sort(key=lambda version: version['version'], reverse=True)
+    kept, dropped = others[:keep_versions], others[keep_versions:]
+
+    updated = {key: value for key, value in entry.items() if key != 'version'}
+    updated['active_version'] = entry['version']
+    updated['versions'] = sorted(kept + [entry], key=lambda version: version['version'])
+
+    return updated, dropped
+
+
+# 🚨 ÂNCORA: BUILD_FILE_LOCK - Um build/troca de versão por diretório
+# Contexto: UI, CLI e subprocessos de build podem rodar em processos diferentes;
+#           o lock de thread do ChromaDBManager não impede dois processos de
+#           escolherem o mesmo número de versão ou trocarem o ponteiro juntos
+# Cuidado: Lock consultivo (flock) no arquivo .build.lock; liberado pelo SO se
+#          o processo morrer no meio do build
+# Dependências: ChromaDBManager (build, import, rollback), start_build_job
+
+def _try_lock_file(lock_file) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def build_file_lock(persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+                    blocking: bool = True) -> Iterator[bool]:
+    """
+    Lock exclusivo entre processos para build/ativação de versões
+
+    Args:
+        persist_directory: Diretório do índice (o lock é por diretório)
+        blocking: Se False, não espera - o valor do `with` diz se o lock foi obtido
+
+    Yields:
+        True se o lock foi obtido (sempre True com blocking=True)
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+
+    with open(os.path.join(persist_directory, BUILD_LOCK_FILENAME), 'a+') as lock_file:
+        if fcntl is not None and blocking:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            acquired = True
+        else:
+            acquired = _try_lock_file(lock_file)
+            while blocking and not acquired:
+                time.sleep(0.1)
+                acquired = _try_lock_file(lock_file)
+
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@lru_cache(maxsize=1)
+def rag_dependencies_installed() -> bool:
+    """Verifica se chromadb e sentence-transformers estão instalados (sem importá-los)"""
+    return all(
+        importlib.util.find_spec(module) is not None
+        for module in ('chromadb', 'sentence_transformers')
+    )
+
+
+def get_rag_status(persist_directory: str = DEFAULT_PERSIST_DIRECTORY) -> Dict:
+    """
+    Status do índice RAG sem carregar modelo, ChromaDB ou catálogo
+
+    Returns:
+        Dict no mesmo formato de SemanticCardSearch.get_search_statistics():
+        {'chromadb_status': 'ready'|'not_initialized', 'total_embeddings': N, 'metadata': {...}}
+    """
+    metadata = read_collection_metadata(persist_directory)
+    total = metadata.get('stats', {}).get('embedded_cards', 0)
+
+    return {
+        'chromadb_status': 'ready' if total > 0 else 'not_initialized',
+        'total_embeddings': total,
+        'metadata': metadata
+    }
@@ -0,0 +1,204 @@
+# rag/metadata_filter.py
+"""
+🚨 ÂNCORA: METADATA_FILTER - Filtros where (sintaxe ChromaDB) sobre colunas numpy
+Contexto: Compartilhado pelos índices locais (NumPy vetorial e BM25) e pela
+          construção dos filtros enviados ao ChromaDB
+Cuidado: Subconjunto dos operadores do ChromaDB; operador desconhecido gera ValueError
+Dependências: numpy, config.constants (facções)
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from config.constants import FACTIONS
+from core.market_access import market_access_kind_for
+
+# Versão do esquema de metadata da coleção
+# (2 = booleanos por facção, 3 = is_market pela regra de core/market_access.py)
+METADATA_SCHEMA_VERSION = 3
+
+
+def faction_field(faction: str) -> str:
+    """Nome do campo booleano da facção (ex.: FIRE -> faction_fire)"""
+    return f"faction_{faction.lower()}"
+
+
+def faction_flags(factions: Sequence[str]) -> Dict[str, bool]:
+    """Metadata booleana por facção + is_neutral (indexável pelo ChromaDB)"""
+    flags = {faction_field(faction): faction in factions for faction in FACTIONS}
+    flags['is_neutral'] = not factions
+    return flags
+
+
+# Filtro de cada categoria de tipo (mesmas categorias do re-ranking e do contexto;
+# relic weapons contam como weapons)
+TYPE_FILTERS = {
+    'units': {'is_unit': True},
+    'spells': {'is_spell': True},
+    'weapons': {'is_weapon': True},
+    'relics': {'$and': [{'is_relic': True}, {'is_weapon': False}]},
+    'powers': {'is_power': True}
+}
+
+
+def combine_where(*clauses: Optional[Dict]) -> Optional[Dict]:
+    """Combina filtros where com $and (ignora None, achata $and aninhados)"""
+    flat = []
+    for clause in clauses:
+        if not clause:
+            continue
+        if set(clause) == {'$and'}:
+            flat.extend(clause['$and'])
+        else:
+            flat.append(clause)
+
+    if not flat:
+        return None
+    return flat[0] if len(flat) == 1 else {'$and': flat}
+
+
+def build_where_clause(filter_factions: Optional[Sequence[str]] = None,
+                       include_neutral: bool = True,
+                       include_market: bool = False,
+                       cost_range: Optional[tuple] = None) -> Optional[Dict]:
+    """
+    Filtro where com um operador por cláusula ($and/$or explícitos)
+
+    Args:
+        filter_factions: Carta entra se tiver alguma dessas facções
+        include_neutral: Cartas sem facção também entram no filtro de facções
+        include_market: Se False, exclui cartas de mercado
+        cost_range: Tupla (min_cost, max_cost) opcional
+
+    Returns:
+        Dict where (None quando não há filtro)
+    """
+    clauses = []
+
+    if filter_factions:
+        faction_clauses = [{faction_field(faction): True} for faction in filter_factions]
+        if include_neutral:
+            faction_clauses.append({'is_neutral': True})
+
+        clauses.append(faction_clauses[0] if len(faction_clauses) == 1 else {'$or': faction_clauses})
+
+    if not include_market:
+        clauses.append({'is_market': False})
+
+    if cost_range:
+        clauses.append({'cost': {'$gte': cost_range[0]}})
+        clauses.append({'cost': {'$lte': cost_range[1]}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+
+def upgrade_metadata(metadata: Dict[str, Any], document: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Converte metadata de esquemas antigos para o esquema atual
+
+    Args:
+        metadata: Metadata da carta (facções em string no esquema 1)
+        document: Texto indexado da carta; quando informado, is_market é
+                  recalculado com a regra atual de acesso ao mercado
+    """
+    factions = [f for f in metadata.get('factions', '').split(',') if f]
+    upgraded = dict(metadata, **faction_flags(factions))
+    if document is not None:
+        upgraded['is_market'] = market_access_kind_for(metadata.get('name', ''), document) is not None
+    return upgraded
+
+
+def is_forbidden_name(name: str, forbidden: Optional[Sequence[str]]) -> bool:
+    """Regra única de cartas proibidas: nome parcial, sem diferenciar maiúsculas"""
+    if not forbidden:
+        return False
+    lowered = name.lower()
+    return any(term.lower() in lowered for term in forbidden)
+
+
+class MetadataFilter:
+    """Colunas de metadata (uma por chave) e avaliação de filtros where"""
+
+    def __init__(self, metadatas: List[Dict[str, Any]]):
+        self.size = len(metadatas)
+        self.columns = self._build_columns(metadatas)
+
+    @staticmethod
+    def _build_columns(metadatas: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Converte a lista de metadata em colunas numpy (uma por chave)"""
+        keys = set()
+        for metadata in metadatas:
+            keys.update(metadata.keys())
+
+        columns = {}
+        for key in keys:
+            values = [metadata.get(key) for metadata in metadatas]
+            sample = next((v for v in values if v is not None), None)
+
+            if isinstance(sample, bool):
+                columns[key] = np.array([bool(v) for v in values], dtype=bool)
+            elif isinstance(sample, (int, float)):
+                columns[key] = np.array([v if v is not None else np.nan for v in values], dtype=np.float64)
+            else:
+                columns[key] = np.array(['' if v is None else str(v) for v in values], dtype=object)
+
+        return columns
+
+    def _condition_mask(self, key: str, condition: Any) -> np.ndarray:
+        column = self.columns.get(key)
+        if column is None:
+            return np.zeros(self.size, dtype=bool)
+
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+
+        mask = np.ones(self.size, dtype=bool)
+
+        for operator, value in condition.items():
+            if operator == '$eq':
+                mask &= column == value
+            elif operator == '$ne':
+                mask &= column != value
+            elif operator == '$gt':
+                mask &= column > value
+            elif operator == '$gte':
+                mask &= column >= value
+            elif operator == '$lt':
+                mask &= column < value
+            elif operator == '$lte':
+                mask &= column <= value
+            elif operator == '$in':
+                mask &= np.isin(column, list(value))
+            elif operator == '$nin':
+                mask &= ~np.isin(column, list(value))
+            elif operator == '$contains':
+                mask &= np.array([value in str(v) for v in column], dtype=bool)
+            else:
+                raise ValueError(f"Operador where não suportado: {operator}")
+
+        return mask
+
+    def mask(self, where: Optional[Dict]) -> np.ndarray:
+        """Máscara booleana das linhas que satisfazem o filtro"""
+        mask = np.ones(self.size, dtype=bool)
+        if not where:
+            return mask
+
+        for key, condition in where.items():
+            if key == '$and':
+                for clause in condition:
+                    mask &= self.mask(clause)
+            elif key == '$or':
+                any_mask = np.zeros(self.size, dtype=bool)
+                for clause in condition:
+                    any_mask |= self.mask(clause)
+                mask &= any_mask
+            else:
+                mask &= self._condition_mask(key, condition)
+
+        return mask
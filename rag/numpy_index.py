@@ -0,0 +1,272 @@
+# rag/numpy_index.py
+"""
+🚨 ÂNCORA: NUMPY_INDEX - Índice vetorial em memória para catálogos pequenos
+Contexto: ~3k cartas x 384 dims cabem numa matriz; busca exata com um produto
+          matriz-vetor mascarado + argpartition, sem HNSW nem SQLite
+Cuidado: Resultados no mesmo formato de collection.query() do ChromaDB;
+         int8 usa quantização escalar por vetor (escala = max|v| / 127)
+Dependências: numpy (matriz opcionalmente memory-mapped do disco)
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from rag.metadata_filter import MetadataFilter
+
+SUPPORTED_DTYPES = ('float32', 'float16', 'int8')
+INT8_MAX = 127
+
+
+def quantize_int8(matrix: np.ndarray):
+    """
+    Quantização escalar simétrica por linha
+
+    Returns:
+        (matriz int8, escalas float32) com matrix ≈ int8 * escala[:, None]
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / INT8_MAX
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(matrix / scales[:, np.newaxis]), -INT8_MAX, INT8_MAX).astype(np.int8)
+    return np.ascontiguousarray(quantized), scales.astype(np.float32)
+
+
+class NumpyVectorIndex:
+    """Embeddings normalizados em array contíguo + colunas de metadata"""
+
+    def __init__(self,
+                 ids: List[str],
+                 embeddings: np.ndarray,
+                 metadatas: List[Dict[str, Any]],
+                 documents: Optional[List[str]] = None,
+                 dtype: str = 'float32',
+                 normalized: bool = False,
+                 scales: Optional[np.ndarray] = None,
+                 int8_scoring: str = 'dequantize'):
+        """
+        Args:
+            ids: IDs das cartas (mesmos do ChromaDB)
+            embeddings: Matriz (n, dim)
+            metadatas: Metadata por carta (usada nos filtros where)
+            documents: Textos de embedding (opcional)
+            dtype: 'float32', 'float16' ou 'int8' para armazenar a matriz
+            normalized: Se True, embeddings já estão normalizados e no dtype certo
+                        (permite usar um array memory-mapped sem cópia)
+            scales: Escalas por vetor (obrigatórias com normalized=True e int8)
+            int8_scoring: 'dequantize' (float32 on-the-fly) ou 'int8'
+                          (query também quantizada, produto acumulado em int32)
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"dtype deve ser um de {SUPPORTED_DTYPES}, recebido '{dtype}'")
+        if int8_scoring not in ('dequantize', 'int8'):
+            raise ValueError(f"int8_scoring inválido: '{int8_scoring}'")
+
+        self.ids = list(ids)
+        self.metadatas = list(metadatas)
+        self.documents = list(documents) if documents is not None else [''] * len(self.ids)
+        self.dtype = dtype
+        self.int8_scoring = int8_scoring
+        self.scales = scales
+
+        if normalized:
+            self.embeddings = embeddings
+            if dtype == 'int8' and scales is None:
+                raise ValueError("Índice int8 requer as escalas por vetor")
+        else:
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+
+            if dtype == 'int8':
+                self.embeddings, self.scales = quantize_int8(matrix)
+            else:
+                self.embeddings = np.ascontiguousarray(matrix, dtype=dtype)
+
+        self._id_rows = {card_id: row for row, card_id in enumerate(self.ids)}
+        self._filter = MetadataFilter(self.metadatas)
+        # Cópia de trabalho float32 do float16 (criada na primeira busca)
+        self._float32_rows: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # Construção / persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_collection(cls, collection, dtype: str = 'float32', **kwargs) -> 'NumpyVectorIndex':
+        """Cria o índice a partir de uma coleção ChromaDB existente"""
+        data = collection.get(include=['embeddings', 'metadatas', 'documents'])
+
+        return cls(
+            ids=data['ids'],
+            embeddings=np.asarray(data['embeddings'], dtype=np.float32),
+            metadatas=data['metadatas'],
+            documents=data['documents'],
+            dtype=dtype,
+            **kwargs
+        )
+
+    def astype(self, dtype: str, **kwargs) -> 'NumpyVectorIndex':
+        """Cópia do índice com outro armazenamento (a partir dos vetores atuais)"""
+        return NumpyVectorIndex(
+            ids=self.ids,
+            embeddings=self.dequantized(),
+            metadatas=self.metadatas,
+            documents=self.documents,
+            dtype=dtype,
+            **kwargs
+        )
+
+    def save(self, directory: str):
+        """Salva matriz (.npy) e metadata (.json) no diretório"""
+        os.makedirs(directory, exist_ok=True)
+
+        np.save(os.path.join(directory, 'embeddings.npy'), np.asarray(self.embeddings))
+        scales_path = os.path.join(directory, 'scales.npy')
+        if self.scales is not None:
+            np.save(scales_path, np.asarray(self.scales))
+        elif os.path.exists(scales_path):
+            os.remove(scales_path)
+
+        with open(os.path.join(directory, 'index.json'), 'w') as f:
+            json.dump({
+                'dtype': self.dtype,
+                'ids': self.ids,
+                'metadatas': self.metadatas,
+                'documents': self.documents
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, **kwargs) -> 'NumpyVectorIndex':
+        """
+        Carrega um índice salvo
+
+        Args:
+            directory: Diretório usado em save()
+            mmap: Mapeia a matriz do disco em vez de copiá-la para a memória
+        """
+        with open(os.path.join(directory, 'index.json'), 'r') as f:
+            data = json.load(f)
+
+        mmap_mode = 'r' if mmap else None
+        embeddings = np.load(os.path.join(directory, 'embeddings.npy'), mmap_mode=mmap_mode)
+
+        scales_path = os.path.join(directory, 'scales.npy')
+        scales = np.load(scales_path, mmap_mode=mmap_mode) if os.path.exists(scales_path) else None
+
+        return cls(
+            ids=data['ids'],
+            embeddings=embeddings,
+            metadatas=data['metadatas'],
+            documents=data.get('documents'),
+            dtype=data.get('dtype', 'float32'),
+            normalized=True,
+            scales=scales,
+            **kwargs
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._id_rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes da matriz de embeddings (+ escalas no int8)"""
+        total = np.asarray(self.embeddings).nbytes
+        if self.scales is not None:
+            total += np.asarray(self.scales).nbytes
+        return int(total)
+
+    def dequantized(self, rows=None) -> np.ndarray:
+        """Vetores normalizados em float32 (todas as linhas ou as pedidas)"""
+        rows = slice(None) if rows is None else rows
+        matrix = np.asarray(self.embeddings[rows], dtype=np.float32)
+        if self.dtype == 'int8':
+            matrix = matrix * np.asarray(self.scales[rows], dtype=np.float32)[:, np.newaxis]
+        return matrix
+
+    def where_mask(self, where: Optional[Dict]) -> np.ndarray:
+        """Máscara booleana das cartas que satisfazem o filtro"""
+        return self._filter.mask(where)
+
+    # ------------------------------------------------------------------
+    # Busca
+    # ------------------------------------------------------------------
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Embeddings normalizados (float32) das cartas pedidas"""
+        rows = [self._id_rows[card_id] for card_id in ids if card_id in self._id_rows]
+        return self.dequantized(rows)
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """Similaridade de cosseno (q, n) das queries já normalizadas contra todas as linhas"""
+        matrix = self.embeddings
+
+        if self.dtype == 'float32':
+            return np.asarray(queries @ matrix.T, dtype=np.float32)
+
+        if self.dtype == 'float16':
+            # GEMM em float16 não tem BLAS e converter a cada busca custa o
+            # mesmo: pontuar numa cópia float32 (o arquivo continua float16)
+            if self._float32_rows is None:
+                self._float32_rows = np.asarray(matrix, dtype=np.float32)
+            return queries @ self._float32_rows.T
+
+        scales = np.asarray(self.scales, dtype=np.float32)
+
+        if self.int8_scoring == 'int8':
+            query_int8, query_scales = quantize_int8(queries)
+            dots = query_int8.astype(np.int32) @ matrix.T.astype(np.int32)
+            return dots.astype(np.float32) * query_scales[:, np.newaxis] * scales[np.newaxis, :]
+
+        # Dequantização on-the-fly: (q @ int8ᵀ) * escala por vetor
+        return (queries @ matrix.T.astype(np.float32)) * scales[np.newaxis, :]
+
+    def query(self,
+              query_embeddings: np.ndarray,
+              n_results: int = 10,
+              where: Optional[Dict] = None,
+              include: Optional[List[str]] = None) -> Dict[str, List]:
+        """
+        Top-k exato por similaridade de cosseno
+
+        Returns:
+            Dict no formato do ChromaDB: {'ids': [[...]], 'distances': [[...]], ...}
+            com distance = 1 - cosseno
+        """
+        include = include or ['documents', 'metadatas', 'distances']
+
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+
+        mask = self.where_mask(where)
+
+        results = {'ids': [], 'distances': [], 'metadatas': [], 'documents': [], 'embeddings': []}
+
+        # (q, n) - um único produto matriz-matriz para todas as queries, sem
+        # copiar as linhas elegíveis; as demais ficam com -inf
+        scores = self._scores(queries)
+        scores[:, ~mask] = -np.inf
+        k = min(n_results, int(np.count_nonzero(mask)))
+
+        for row_scores in scores:
+            if k == 0:
+                rows = np.array([], dtype=np.int64)
+            else:
+                rows = np.argpartition(-row_scores, k - 1)[:k]
+                rows = rows[np.argsort(-row_scores[rows])]
+
+            results['ids'].append([self.ids[r] for r in rows])
+            results['distances'].append([float(1 - row_scores[r]) for r in rows])
+            results['metadatas'].append([self.metadatas[r] for r in rows])
+            results['documents'].append([self.documents[r] for r in rows])
+            results['embeddings'].append(self.dequantized(rows))
+
+        return {key: value for key, value in results.items() if key in include or key == 'ids'}
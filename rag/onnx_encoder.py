@@ -0,0 +1,338 @@
+# rag/onnx_encoder.py
+"""
+🚨 ÂNCORA: ONNX_QUERY_ENCODER - Encoder de queries via ONNX Runtime (sem torch)
+Contexto: Mesmo modelo do índice exportado uma vez para ONNX (opcionalmente com
+          quantização dinâmica int8); a busca só precisa de onnxruntime + tokenizers
+Cuidado: Só codifica QUERIES - documentos do índice continuam no sentence-transformers.
+         O export confere a compatibilidade (cosseno mínimo vs. o modelo original)
+         e o encoder recusa modelos exportados que não passaram
+Dependências: onnxruntime, tokenizers (uso); torch + sentence-transformers (só no export)
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.embeddings import EMBEDDING_MODEL_NAME
+
+DEFAULT_ONNX_DIRECTORY = "./data/onnx"
+ONNX_CONFIG_FILENAME = "onnx_encoder.json"
+ONNX_MODEL_FILENAME = "model.onnx"
+ONNX_QUANTIZED_FILENAME = "model.int8.onnx"
+
+# Tolerância de compatibilidade com o índice: cosseno mínimo entre o vetor
+# ONNX e o do sentence-transformers para os mesmos textos
+ONNX_MIN_COSINE = 0.98
+
+# Textos usados na checagem de compatibilidade do export
+VALIDATION_TEXTS = [
+    "aggressive fire creatures with charge",
+    "control deck with removal and card draw",
+    "flying units with aegis",
+    "ramp strategies with big creatures",
+    "void recursion and graveyard value",
+    "Card: Torch | Type: Spell | Cost: 1 | Factions: FIRE | Text: Deal 2 damage to a unit or player.",
+    "Card: Sandstorm Titan | Type: Unit | Cost: 6 | Factions: TIME | Stats: 6/6 | Keywords: endurance",
+    "Deck agressivo com criaturas pequenas e dano direto",
+]
+
+
+def onnx_model_directory(model_name: str = EMBEDDING_MODEL_NAME,
+                         base_directory: str = DEFAULT_ONNX_DIRECTORY) -> str:
+    return os.path.join(base_directory, model_name.replace('/', '__'))
+
+
+def mean_pool(last_hidden_state: np.ndarray, attention_mask: np.ndarray,
+              normalize: bool = True) -> np.ndarray:
+    """Pooling por média dos tokens válidos (igual ao módulo Pooling do sentence-transformers)"""
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    summed = (last_hidden_state * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    pooled = summed / counts
+
+    if normalize:
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        pooled = pooled / np.clip(norms, 1e-12, None)
+
+    return pooled.astype(np.float32)
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Cosseno linha a linha entre dois conjuntos de embeddings dos mesmos textos"""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    cosines = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    return {
+        'min_cosine': float(cosines.min()),
+        'mean_cosine': float(cosines.mean()),
+        'max_abs_diff': float(np.abs(reference - candidate).max())
+    }
+
+
+class OnnxQueryEncoder:
+    """
+    Encoder de queries com a mesma interface de LazySentenceTransformerEmbedding
+    (encode / __call__ / model_name), carregado só no primeiro uso
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME,
+                 model_directory: Optional[str] = None,
+                 quantized: bool = False,
+                 allow_unvalidated: bool = False):
+        """
+        Args:
+            model_name: Modelo original (precisa ser o mesmo do índice)
+            model_directory: Diretório do export (padrão: data/onnx/<modelo>)
+            quantized: Usa o modelo com quantização dinâmica int8
+            allow_unvalidated: Aceita export que não passou na checagem de tolerância
+        """
+        self.model_name = model_name
+        self.model_directory = model_directory or onnx_model_directory(model_name)
+        self.quantized = quantized
+        self.allow_unvalidated = allow_unvalidated
+
+        self._session = None
+        self._tokenizer = None
+        self._input_names: List[str] = []
+        self._config: Dict = {}
+        self._lock = threading.Lock()
+        self.load_count = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._session is not None
+
+    @property
+    def variant(self) -> str:
+        return 'int8' if self.quantized else 'float32'
+
+    def load(self):
+        """Carrega sessão ONNX e tokenizer (sem importar torch)"""
+        with self._lock:
+            if self._session is not None:
+                return
+
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            with open(os.path.join(self.model_directory, ONNX_CONFIG_FILENAME), 'r') as f:
+                config = json.load(f)
+
+            if config['model_name'] != self.model_name:
+                raise ValueError(
+                    f"Export ONNX é do modelo '{config['model_name']}', esperado '{self.model_name}'"
+                )
+            validation = config.get('validation', {}).get(self.variant)
+            if not self.allow_unvalidated and not (validation and validation['compatible']):
+                raise ValueError(
+                    f"Export ONNX ({self.variant}) não passou na checagem de compatibilidade "
+                    f"(cosseno mínimo {ONNX_MIN_COSINE}) - reexporte ou use sentence-transformers"
+                )
+
+            tokenizer = Tokenizer.from_file(os.path.join(self.model_directory, 'tokenizer.json'))
+            tokenizer.enable_truncation(max_length=config['max_seq_length'])
+            tokenizer.enable_padding(pad_id=config['pad_token_id'], pad_token=config['pad_token'])
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            filename = ONNX_QUANTIZED_FILENAME if self.quantized else ONNX_MODEL_FILENAME
+            session = ort.InferenceSession(
+                os.path.join(self.model_directory, filename),
+                sess_options=options,
+                providers=['CPUExecutionProvider']
+            )
+
+            self._config = config
+            self._tokenizer = tokenizer
+            self._input_names = [model_input.name for model_input in session.get_inputs()]
+            self._session = session
+            self.load_count += 1
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Codifica textos em vetores numpy (float32), como o SentenceTransformer"""
+        self.load()
+
+        batches = []
+        for begin in range(0, len(texts), batch_size):
+            encodings = self._tokenizer.encode_batch(list(texts[begin:begin + batch_size]))
+            features = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            last_hidden_state = self._session.run(
+                None,
+                {name: features[name] for name in self._input_names}
+            )[0]
+            batches.append(mean_pool(last_hidden_state, features['attention_mask'], self._config['normalize']))
+
+        if not batches:
+            return np.zeros((0, self._config.get('dimension', 0)), dtype=np.float32)
+        return np.vstack(batches)
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.encode(list(input)).tolist()
+
+    def unload(self):
+        with self._lock:
+            self._session = None
+            self._tokenizer = None
+
+
+# ----------------------------------------------------------------------
+# Export (roda uma vez, em máquina com torch)
+# ----------------------------------------------------------------------
+
+def export_onnx_model(model_name: str = EMBEDDING_MODEL_NAME,
+                      model_directory: Optional[str] = None,
+                      quantize: bool = True,
+                      opset_version: int = 14) -> Dict:
+    """
+    Exporta o transformer do SentenceTransformer para ONNX e valida contra ele
+
+    Args:
+        model_name: Modelo sentence-transformers do índice
+        model_directory: Destino (padrão: data/onnx/<modelo>)
+        quantize: Também gera a variante com quantização dinâmica int8
+        opset_version: Versão do opset ONNX
+
+    Returns:
+        Configuração gravada (inclui o resultado da validação por variante)
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model_directory = model_directory or onnx_model_directory(model_name)
+    os.makedirs(model_directory, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(model_directory)
+
+    module_names = [type(module).__name__ for module in st_model]
+    pooling = st_model[1] if len(st_model) > 1 else None
+    if pooling is None or not getattr(pooling, 'pooling_mode_mean_tokens', False):
+        raise ValueError(f"Modelo '{model_name}' não usa pooling por média - não suportado no export")
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids
+            )[0]
+
+    dummy = tokenizer(["exemplo de query"], return_tensors='pt')
+    input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+    model_path = os.path.join(model_directory, ONNX_MODEL_FILENAME)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer),
+            tuple(dummy[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes={
+                **{name: {0: 'batch', 1: 'sequence'} for name in input_names},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'}
+            },
+            opset_version=opset_version
+        )
+
+    variants = ['float32']
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            model_path,
+            os.path.join(model_directory, ONNX_QUANTIZED_FILENAME),
+            weight_type=QuantType.QInt8
+        )
+        variants.append('int8')
+
+    config = {
+        'model_name': model_name,
+        'max_seq_length': st_model.max_seq_length,
+        'pad_token': tokenizer.pad_token,
+        'pad_token_id': tokenizer.pad_token_id,
+        'normalize': 'Normalize' in module_names,
+        'dimension': st_model.get_sentence_embedding_dimension(),
+        'opset_version': opset_version,
+        'exported_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'validation': {}
+    }
+    with open(os.path.join(model_directory, ONNX_CONFIG_FILENAME), 'w') as f:
+        json.dump(config, f, indent=2)
+
+    # Checagem de compatibilidade com os vetores do índice
+    reference = st_model.encode(VALIDATION_TEXTS, convert_to_numpy=True, show_progress_bar=False)
+    for variant in variants:
+        encoder = OnnxQueryEncoder(model_name, model_directory, quantized=variant == 'int8',
+                                   allow_unvalidated=True)
+        agreement = cosine_agreement(reference, encoder.encode(VALIDATION_TEXTS))
+        agreement['compatible'] = agreement['min_cosine'] >= ONNX_MIN_COSINE
+        config['validation'][variant] = agreement
+
+    with open(os.path.join(model_directory, ONNX_CONFIG_FILENAME), 'w') as f:
+        json.dump(config, f, indent=2)
+
+    return config
+
+
+def query_encoder_key(encoder) -> str:
+    """Identificador do encoder para o cache de queries (backend, modelo e variante)"""
+    if isinstance(encoder, OnnxQueryEncoder):
+        return f"onnx:{encoder.model_name}:{encoder.variant}"
+    return f"sentence-transformers:{encoder.model_name}"
+
+
+def get_query_encoder(embedding_function, backend: str = 'sentence-transformers',
+                      quantized: bool = False):
+    """
+    Encoder de queries para o backend configurado (RAG_QUERY_ENCODER)
+
+    Sem onnxruntime/tokenizers ou sem export válido, volta ao sentence-transformers.
+    """
+    if backend == 'sentence-transformers':
+        return embedding_function
+    if backend != 'onnx':
+        raise ValueError(f"Encoder de queries inválido '{backend}' (use 'sentence-transformers' ou 'onnx')")
+
+    encoder = OnnxQueryEncoder(embedding_function.model_name, quantized=quantized)
+    try:
+        encoder.load()
+    except (ImportError, OSError, ValueError) as e:
+        print(f"⚠️ Encoder ONNX indisponível ({e}) - usando sentence-transformers")
+        return embedding_function
+    return encoder
+
+
+# python -m rag.onnx_encoder [--no-quantize]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta o modelo de embeddings para ONNX")
+    parser.add_argument('--model', default=EMBEDDING_MODEL_NAME)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--no-quantize', action='store_true')
+    args = parser.parse_args()
+
+    config = export_onnx_model(args.model, args.output, quantize=not args.no_quantize)
+    print(f"📦 Modelo ONNX exportado em {args.output or onnx_model_directory(args.model)}")
+    for variant, result in config['validation'].items():
+        status = "✅ compatível" if result['compatible'] else "❌ fora da tolerância"
+        print(f"  {variant}: cosseno mínimo {result['min_cosine']:.5f} "
+              f"(média {result['mean_cosine']:.5f}) - {status}")
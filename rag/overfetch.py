@@ -0,0 +1,59 @@
+# rag/overfetch.py
+"""
+🚨 ÂNCORA: ADAPTIVE_OVERFETCH - Tamanho da primeira página de busca por formato de query
+Contexto: Dedup por nome, proibidas e dominadas descartam parte dos resultados;
+          a razão buscados/aproveitados é aprendida (EMA) por formato de query
+Cuidado: Só ajusta o tamanho da página inicial - páginas extras garantem o total
+Dependências: SemanticCardSearch (compartilhado entre sessões, protegido por lock)
+"""
+
+import math
+import threading
+from typing import Dict, Hashable
+
+
+class OverfetchTracker:
+    """Média móvel exponencial da razão de over-fetch por formato de query"""
+
+    def __init__(self, alpha: float = 0.3, initial_ratio: float = 1.0,
+                 margin: float = 1.1, max_ratio: float = 4.0):
+        """
+        Args:
+            alpha: Peso da observação mais recente na EMA
+            initial_ratio: Razão usada para formatos ainda não vistos
+            margin: Folga aplicada sobre a razão estimada na primeira página
+            max_ratio: Limite da razão (evita páginas enormes após outliers)
+        """
+        self.alpha = alpha
+        self.initial_ratio = initial_ratio
+        self.margin = margin
+        self.max_ratio = max_ratio
+
+        self._ratios: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def ratio(self, shape: Hashable) -> float:
+        with self._lock:
+            return self._ratios.get(shape, self.initial_ratio)
+
+    def page_size(self, shape: Hashable, wanted: int) -> int:
+        """Tamanho da primeira página para obter `wanted` resultados"""
+        return max(wanted, math.ceil(wanted * self.ratio(shape) * self.margin))
+
+    def record(self, shape: Hashable, fetched: int, kept: int):
+        """Registra quantos candidatos foram buscados para aproveitar `kept`"""
+        if kept <= 0:
+            return
+
+        observed = min(max(fetched / kept, 1.0), self.max_ratio)
+
+        with self._lock:
+            previous = self._ratios.get(shape)
+            if previous is None:
+                self._ratios[shape] = observed
+            else:
+                self._ratios[shape] = (1 - self.alpha) * previous + self.alpha * observed
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {str(shape): round(ratio, 3) for shape, ratio in self._ratios.items()}
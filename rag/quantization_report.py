@@ -0,0 +1,127 @@
+# rag/quantization_report.py
+"""
+🚨 ÂNCORA: QUANTIZATION_REPORT - Memória economizada e recall@k por armazenamento
+Contexto: Valida float16/int8 contra o baseline float32 antes de trocar RAG_INDEX_DTYPE
+Cuidado: Conjunto de queries fixo (textos + amostra com seed fixa) para comparações estáveis
+Dependências: NumpyVectorIndex; ChromaDBManager apenas quando executado como script
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Dict, List, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from rag.numpy_index import NumpyVectorIndex
+
+QUANTIZED_DTYPES = ('float16', 'int8')
+
+
+def recall_at_k(baseline: List[List[str]], candidate: List[List[str]]) -> float:
+    """Fração média dos top-k do baseline recuperados pelo candidato"""
+    recalls = [
+        len(set(expected) & set(found)) / len(expected)
+        for expected, found in zip(baseline, candidate)
+        if expected
+    ]
+    return float(np.mean(recalls)) if recalls else 0.0
+
+
+def _directory_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for name in os.listdir(directory)
+        if name.endswith('.npy')
+    )
+
+
+def quantization_report(index: NumpyVectorIndex,
+                        queries: np.ndarray,
+                        k_values: Sequence[int] = (10, 60)) -> Dict:
+    """
+    Compara armazenamentos quantizados com o índice float32
+
+    Args:
+        index: Índice float32 (baseline)
+        queries: Matriz (q, dim) de queries fixas
+        k_values: Valores de k para recall@k
+
+    Returns:
+        Dict por dtype com bytes em memória/disco, economia e recall@k
+    """
+    if index.dtype != 'float32':
+        index = index.astype('float32')
+
+    max_k = max(k_values)
+    baseline_ids = index.query(queries, n_results=max_k, include=[])['ids']
+
+    variants = {'float32': index}
+    for dtype in QUANTIZED_DTYPES:
+        variants[dtype] = index.astype(dtype)
+    variants['int8 (dot int8)'] = index.astype('int8', int8_scoring='int8')
+
+    report = {}
+    for label, variant in variants.items():
+        with tempfile.TemporaryDirectory() as directory:
+            variant.save(directory)
+            disk_bytes = _directory_size(directory)
+
+        candidate_ids = variant.query(queries, n_results=max_k, include=[])['ids']
+
+        report[label] = {
+            'memory_bytes': variant.nbytes,
+            'disk_bytes': disk_bytes,
+            'memory_saved': 1 - variant.nbytes / index.nbytes,
+            'recall': {
+                k: recall_at_k([ids[:k] for ids in baseline_ids], [ids[:k] for ids in candidate_ids])
+                for k in k_values
+            }
+        }
+
+    return report
+
+
+def fixed_query_set(index: NumpyVectorIndex, query_texts: List[str] = None,
+                    encode=None, sample_size: int = 200, seed: int = 0) -> np.ndarray:
+    """
+    Queries fixas: textos de benchmark codificados + vetores de cartas amostrados
+    (seed fixa) com ruído, simulando queries próximas a cartas existentes
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), size=min(sample_size, len(index)), replace=False)
+
+    card_queries = index.dequantized(np.sort(rows))
+    card_queries = card_queries + rng.normal(scale=0.05, size=card_queries.shape).astype(np.float32)
+
+    if query_texts and encode is not None:
+        return np.vstack([np.asarray(encode(query_texts), dtype=np.float32), card_queries])
+    return card_queries
+
+
+if __name__ == "__main__":
+    from rag.benchmark_index import BENCHMARK_QUERIES
+    from rag.chromadb_setup import ChromaDBManager
+
+    parser = argparse.ArgumentParser(description="Relatório de quantização do índice de embeddings")
+    parser.add_argument('--k', type=int, nargs='+', default=[10, 60])
+    parser.add_argument('--sample-size', type=int, default=200)
+    args = parser.parse_args()
+
+    manager = ChromaDBManager(backend='chroma')
+    baseline = NumpyVectorIndex.from_collection(manager._get_collection(), dtype='float32')
+    queries = fixed_query_set(baseline, BENCHMARK_QUERIES, manager.encode_queries, args.sample_size)
+
+    print(f"📐 Quantização de {len(baseline)} embeddings | {len(queries)} queries fixas\n")
+    report = quantization_report(baseline, queries, args.k)
+
+    header = f"{'Armazenamento':<18}{'Memória':>10}{'Disco':>10}{'Economia':>10}"
+    header += ''.join(f"{f'R@{k}':>8}" for k in args.k)
+    print(header)
+    for label, row in report.items():
+        line = (f"{label:<18}{row['memory_bytes'] / 1024:>8.0f}KB{row['disk_bytes'] / 1024:>8.0f}KB"
+                f"{row['memory_saved']:>10.0%}")
+        line += ''.join(f"{row['recall'][k]:>8.3f}" for k in args.k)
+        print(line)
@@ -0,0 +1,112 @@
+# rag/query_cache.py
+"""
+🚨 ÂNCORA: QUERY_CACHE - Cache LRU de embeddings de queries
+Contexto: Queries enriquecidas se repetem muito (mesma estratégia + facções)
+Cuidado: Normalização em minúsculas é segura (all-MiniLM-L6-v2 é uncased);
+         a chave inclui o encoder (backend/modelo/variante) para não servir
+         vetores de outro espaço após trocar RAG_QUERY_ENCODER
+Dependências: Compartilhado entre sessões via get_query_cache()
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Normaliza a query para chave do cache (minúsculas, espaços colapsados)"""
+    return ' '.join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """Cache LRU limitado: (encoder, query normalizada) -> vetor de embedding"""
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self._encode_seconds = 0.0
+
+    def get_many(self, texts: List[str], encode: Callable[[List[str]], np.ndarray],
+                 encoder_key: str = '') -> np.ndarray:
+        """
+        Retorna os embeddings das queries, codificando apenas as ausentes
+
+        Args:
+            texts: Queries (serão normalizadas)
+            encode: Função que codifica uma lista de textos em matriz (n, dim)
+            encoder_key: Identificador do encoder (vetores de encoders diferentes não se misturam)
+        """
+        keys = [(encoder_key, normalize_query(text)) for text in texts]
+        vectors: Dict[Tuple[str, str], np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    vectors[key] = self._entries[key]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+
+        if missing:
+            start = time.perf_counter()
+            encoded = encode([text for _, text in missing])
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._encode_seconds += elapsed
+                for key, vector in zip(missing, encoded):
+                    vector = np.asarray(vector, dtype=np.float32)
+                    vector.setflags(write=False)
+                    vectors[key] = vector
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+
+        return np.vstack([vectors[key] for key in keys])
+
+    def get(self, text: str, encode: Callable[[List[str]], np.ndarray],
+            encoder_key: str = '') -> np.ndarray:
+        """Embedding de uma única query"""
+        return self.get_many([text], encode, encoder_key)[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Taxa de acerto e tempo de encode economizado (estimado pela média dos misses)"""
+        with self._lock:
+            total = self.hits + self.misses
+            avg_encode = self._encode_seconds / self.misses if self.misses else 0.0
+
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'avg_encode_ms': avg_encode * 1000,
+                'saved_encode_seconds': self.hits * avg_encode
+            }
+
+
+# Cache compartilhado pelo processo (todas as sessões Streamlit)
+_shared_query_cache = QueryEmbeddingCache()
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """Retorna o cache de queries compartilhado"""
+    return _shared_query_cache
@@ -0,0 +1,178 @@
+# rag/query_priors.py
+"""
+🚨 ÂNCORA: QUERY_PRIORS - Priors de facção e arquétipo no espaço vetorial
+Contexto: Em vez de concatenar traços de facção e palavras de arquétipo na
+          query (texto mais longo, encode mais lento, preso ao inglês), o vetor
+          da estratégia crua recebe a soma ponderada de centróides pré-calculados
+          a partir dos embeddings das próprias cartas
+Cuidado: Centróides são da versão do índice (recalculados no build); query e
+         cartas precisam estar no mesmo espaço (mesmo modelo de embeddings)
+Dependências: numpy, config/constants.py (STRATEGY_ARCHETYPES)
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from config.constants import (
+    FACTIONS, QUERY_PRIOR_ARCHETYPE_WEIGHT, QUERY_PRIOR_FACTION_WEIGHT, STRATEGY_ARCHETYPES
+)
+from rag.metadata_filter import faction_field
+
+
+# Uma regex por arquétipo (alternância dos gatilhos)
+_TRIGGER_PATTERNS = {
+    archetype: re.compile('|'.join(f"(?:{trigger})" for trigger in definition['triggers']))
+    for archetype, definition in STRATEGY_ARCHETYPES.items()
+}
+
+
+def detect_archetype(strategy: str) -> Optional[str]:
+    """Primeiro arquétipo de STRATEGY_ARCHETYPES cujos gatilhos aparecem na estratégia"""
+    strategy_lower = strategy.lower()
+    for archetype, pattern in _TRIGGER_PATTERNS.items():
+        if pattern.search(strategy_lower):
+            return archetype
+    return None
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class QueryPriors:
+    """Centróides normalizados por facção e por arquétipo"""
+
+    def __init__(self,
+                 factions: Dict[str, np.ndarray],
+                 archetypes: Dict[str, np.ndarray],
+                 counts: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            factions: Facção (ex.: 'FIRE') -> centróide
+            archetypes: Arquétipo (chave de STRATEGY_ARCHETYPES) -> centróide
+            counts: Cartas usadas em cada centróide (diagnóstico)
+        """
+        self.factions = {key: np.asarray(value, dtype=np.float32) for key, value in factions.items()}
+        self.archetypes = {key: np.asarray(value, dtype=np.float32) for key, value in archetypes.items()}
+        self.counts = dict(counts or {})
+
+    # ------------------------------------------------------------------
+    # Construção / persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls,
+              embeddings: np.ndarray,
+              documents: Sequence[str],
+              metadatas: Sequence[Dict[str, Any]]) -> 'QueryPriors':
+        """
+        Média dos vetores normalizados das cartas de cada grupo, menos a média
+        global: embeddings de frases são anisotrópicos e sem centralizar todos
+        os centróides apontam quase para a mesma direção
+
+        Facção: cartas com a flag faction_<facção> na metadata.
+        Arquétipo: cartas cujo texto de embedding contém algum dos `terms`.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+        global_mean = matrix.mean(axis=0) if len(matrix) else None
+
+        groups: Dict[str, np.ndarray] = {}
+        for faction in FACTIONS:
+            field = faction_field(faction)
+            groups[f"faction:{faction}"] = np.array([bool(m.get(field)) for m in metadatas], dtype=bool)
+
+        lowered = [(document or '').lower() for document in documents]
+        for archetype, definition in STRATEGY_ARCHETYPES.items():
+            groups[f"archetype:{archetype}"] = np.array(
+                [any(term in document for term in definition['terms']) for document in lowered],
+                dtype=bool
+            )
+
+        factions, archetypes, counts = {}, {}, {}
+        for key, mask in groups.items():
+            counts[key] = int(mask.sum())
+            if not counts[key]:
+                continue  # Grupo vazio não vira prior
+            kind, name = key.split(':', 1)
+            target = factions if kind == 'faction' else archetypes
+            target[name] = _unit(matrix[mask].mean(axis=0) - global_mean)
+
+        return cls(factions, archetypes, counts)
+
+    @classmethod
+    def from_numpy_index(cls, index) -> 'QueryPriors':
+        return cls.build(index.dequantized(), index.documents, index.metadatas)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        keys = [f"faction:{name}" for name in self.factions] + [f"archetype:{name}" for name in self.archetypes]
+        vectors = list(self.factions.values()) + list(self.archetypes.values())
+        np.savez(
+            tmp_path,
+            keys=np.array(keys, dtype=str),
+            centroids=np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32),
+            counts=np.array(json.dumps(self.counts))
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'QueryPriors':
+        with np.load(path, allow_pickle=False) as data:
+            factions, archetypes = {}, {}
+            for key, vector in zip(data['keys'].tolist(), data['centroids']):
+                kind, name = key.split(':', 1)
+                (factions if kind == 'faction' else archetypes)[name] = vector
+            return cls(factions, archetypes, json.loads(str(data['counts'])))
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def apply(self,
+              query: np.ndarray,
+              strategy: str,
+              factions: Optional[List[str]] = None,
+              faction_weight: float = QUERY_PRIOR_FACTION_WEIGHT,
+              archetype_weight: float = QUERY_PRIOR_ARCHETYPE_WEIGHT) -> np.ndarray:
+        """
+        q' = q̂ + wf·média(centróides das facções) + wa·centróide do arquétipo
+
+        Args:
+            query: Vetor da estratégia crua (dim,)
+            strategy: Texto da estratégia (só para detectar o arquétipo)
+            factions: Facções escolhidas
+            faction_weight, archetype_weight: Pesos dos priors
+
+        Returns:
+            Vetor (dim,) com norma 1
+        """
+        combined = _unit(np.asarray(query, dtype=np.float32))
+
+        faction_vectors = [self.factions[f] for f in factions or [] if f in self.factions]
+        if faction_vectors:
+            combined = combined + faction_weight * np.mean(faction_vectors, axis=0)
+
+        archetype = detect_archetype(strategy)
+        if archetype in self.archetypes:
+            combined = combined + archetype_weight * self.archetypes[archetype]
+
+        return _unit(combined).astype(np.float32)
+
+    def apply_batch(self, queries: np.ndarray, strategies: Sequence[str],
+                    factions: Optional[List[str]] = None, **weights) -> np.ndarray:
+        """apply() para cada linha de `queries` (mesmas facções para todas)"""
+        return np.vstack([
+            self.apply(query, strategy, factions, **weights)
+            for query, strategy in zip(queries, strategies)
+        ])
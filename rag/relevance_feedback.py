@@ -0,0 +1,51 @@
+# rag/relevance_feedback.py
+"""
+🚨 ÂNCORA: RELEVANCE_FEEDBACK - Refinamento Rocchio da query no espaço vetorial
+Contexto: "Mais como estas, menos como aquela" sem reescrever a estratégia:
+          o vetor da query anda na direção das cartas curtidas e se afasta
+          das descartadas, usando os vetores já guardados no índice
+Cuidado: Nenhum texto é codificado - query e cartas precisam estar no mesmo
+         espaço (mesmo modelo de embeddings do índice)
+Dependências: numpy
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from config.constants import ROCCHIO_ALPHA, ROCCHIO_BETA, ROCCHIO_GAMMA
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def rocchio_update(query: np.ndarray,
+                   liked: Optional[np.ndarray] = None,
+                   disliked: Optional[np.ndarray] = None,
+                   alpha: float = ROCCHIO_ALPHA,
+                   beta: float = ROCCHIO_BETA,
+                   gamma: float = ROCCHIO_GAMMA) -> np.ndarray:
+    """
+    q' = α·q + β·média(curtidas) - γ·média(descartadas), tudo normalizado
+
+    Args:
+        query: Vetor da query original (dim,)
+        liked: Vetores das cartas curtidas (n, dim) ou None
+        disliked: Vetores das cartas descartadas (m, dim) ou None
+        alpha, beta, gamma: Pesos de Rocchio
+
+    Returns:
+        Vetor refinado (dim,) com norma 1
+    """
+    refined = alpha * _unit_rows(query)[0]
+
+    if liked is not None and len(liked):
+        refined = refined + beta * _unit_rows(liked).mean(axis=0)
+    if disliked is not None and len(disliked):
+        refined = refined - gamma * _unit_rows(disliked).mean(axis=0)
+
+    return _unit_rows(refined)[0]
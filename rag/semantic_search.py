@@ -6,39 +6,171 @@ Cuidado: Manter compatibilidade com filtros estruturais existentes
 Dependências: ChromaDBManager, GoogleSheetsClient
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple
+import math
 import sys
+import numpy as np
+import threading
 sys.path.append('..')
 
 from rag.chromadb_setup import ChromaDBManager
 from data.google_sheets_client import GoogleSheetsClient
 from data.models import Card
-from config.constants import FACTIONS
+from config.constants import (
+    CONTEXT_TYPE_QUOTAS, FACTIONS, MMR_LAMBDA, MMR_TYPE_SHARES, STRATEGY_ARCHETYPES
+)
+from data.card_catalog import card_id
+from core.card_dominance import get_dominance_report
+from core.market_access import get_market_index
+from utils.card_line_cache import get_card_line_cache
+from rag.query_cache import get_query_cache
+from rag.overfetch import OverfetchTracker
+from rag.diversity import mmr_rerank
+from rag.relevance_feedback import rocchio_update
+from rag.query_priors import detect_archetype
+from rag.metadata_filter import build_where_clause, is_forbidden_name
+from config.settings import Settings as AppSettings
+
+SEARCH_MODES = ('vector', 'hybrid')
+QUERY_PRIORS_MODES = ('vector', 'text')
+
+
+class ScoredCard(NamedTuple):
+    """
+    Resultado de busca imutável: referência à carta do catálogo + score
+
+    As cartas do catálogo (_cards_cache) nunca são modificadas, então o
+    searcher pode ser compartilhado entre sessões concorrentes sem locks.
+    """
+    card: Card
+    score: float
+    source: str  # 'vector', 'hybrid', 'quota', 'feedback', 'required', 'market' ou 'synergy'
 
 
 class SemanticCardSearch:
     """Interface de busca semântica para cartas do Eternal"""
     
-    def __init__(self):
-        """Inicializa o sistema de busca semântica"""
+    def __init__(self, search_mode: Optional[str] = None, query_priors: Optional[str] = None):
+        """
+        Inicializa o sistema de busca semântica
+        
+        Args:
+            search_mode: 'vector' (só embeddings) ou 'hybrid' (BM25 + embeddings
+                         com fusão de ranks); padrão vem de RAG_SEARCH_MODE
+            query_priors: 'vector' (centróides de facção/arquétipo somados ao vetor
+                          da estratégia) ou 'text' (palavras concatenadas à query);
+                          padrão vem de RAG_QUERY_PRIORS
+        """
+        self.search_mode = self._validate_search_mode(search_mode or AppSettings.RAG_SEARCH_MODE)
+        self.query_priors = query_priors or AppSettings.RAG_QUERY_PRIORS
+        if self.query_priors not in QUERY_PRIORS_MODES:
+            raise ValueError(f"Priors de query inválidos '{self.query_priors}' (use {QUERY_PRIORS_MODES})")
         self.chromadb_manager = ChromaDBManager()
+        self._overfetch = OverfetchTracker()
         self.sheets_client = GoogleSheetsClient()
         
         # Cache de cartas para enriquecimento
         self._cards_cache = {}
+        self._all_cards = []
+        self._catalog_lock = threading.Lock()
         self._load_cards_cache()
     
-    def _load_cards_cache(self):
+    @staticmethod
+    def _validate_search_mode(search_mode: str) -> str:
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Modo de busca inválido '{search_mode}' (use {SEARCH_MODES})")
+        return search_mode
+    
+    def _search_batch(self, queries: List[str], query_vectors: Optional[np.ndarray],
+                      n_results: int, allowed_factions: Optional[List[str]], use_market: bool,
+                      search_mode: Optional[str]) -> List[List[Dict]]:
+        """
+        Busca no índice conforme o modo (vetorial ou híbrido)
+        
+        Com query_vectors (priors vetoriais ou feedback) o lado vetorial usa os
+        vetores prontos e os textos só alimentam o BM25.
+        """
+        if search_mode != 'feedback':
+            search_mode = self._validate_search_mode(search_mode or self.search_mode)
+        
+        if search_mode == 'hybrid':
+            return self.chromadb_manager.search_hybrid_cards_batch(
+                queries,
+                n_results=n_results,
+                filter_factions=allowed_factions,
+                include_market=use_market,
+                include_embeddings=True,
+                query_embeddings=query_vectors
+            )
+        
+        if query_vectors is not None:
+            return self.chromadb_manager.search_by_embeddings_batch(
+                query_vectors,
+                n_results=n_results,
+                filter_factions=allowed_factions,
+                include_market=use_market,
+                include_embeddings=True
+            )
+        
+        return self.chromadb_manager.search_similar_cards_batch(
+            queries,
+            n_results=n_results,
+            filter_factions=allowed_factions,
+            include_market=use_market,
+            include_embeddings=True
+        )
+    
+    @property
+    def last_search_timings(self) -> Dict[str, float]:
+        """Latências por etapa (ms) da última busca híbrida ou com cotas desta thread"""
+        return self.chromadb_manager.last_search_timings
+    
+    def _load_cards_cache(self, all_cards: Optional[List[Card]] = None):
         """Carrega cache de cartas para enriquecimento rápido"""
-        all_cards = self.sheets_client.get_all_cards()
+        # Versão do índice que acompanha este catálogo (lida antes das cartas)
+        self._catalog_collection = self.chromadb_manager.collection_name
+        if all_cards is None:
+            all_cards = self.sheets_client.get_all_cards()
         
+        cards_cache = {}
         for card in all_cards:
             # Usar múltiplas chaves para garantir match
             key1 = f"{card.set_number}_{card.eternal_id}_{card.name.replace(' ', '_')}"
             key2 = card.name
             
-            self._cards_cache[key1] = card
-            self._cards_cache[key2] = card
+            cards_cache[key1] = card
+            cards_cache[key2] = card
+        
+        get_card_line_cache().sync(all_cards)
+        self.market_index = get_market_index(all_cards)
+        # Troca por referência: buscas em andamento veem o catálogo antigo ou o novo inteiro
+        self._cards_cache = cards_cache
+        self._all_cards = all_cards
+    
+    def refresh_catalog_if_index_changed(self) -> bool:
+        """
+        Recarrega o catálogo se a versão ativa do índice mudou (build em outro
+        processo/sessão ou rollback); IDs novos do índice não achariam a carta
+        
+        Returns:
+            True se o catálogo foi recarregado
+        """
+        if self.chromadb_manager.collection_name == self._catalog_collection:
+            return False
+        
+        with self._catalog_lock:
+            collection_name = self.chromadb_manager.collection_name
+            if collection_name == self._catalog_collection:
+                return False
+            
+            all_cards = self.sheets_client.get_all_cards()
+            if not all_cards:
+                # Planilha indisponível: mantém o catálogo atual até a próxima versão
+                self._catalog_collection = collection_name
+                return False
+            
+            self._load_cards_cache(all_cards)
+            return True
     
     def search_cards_for_strategy(self,
                                  strategy: str,
@@ -46,7 +178,9 @@ class SemanticCardSearch:
                                  use_market: bool = False,
                                  required_cards: Optional[List[str]] = None,
                                  forbidden_cards: Optional[List[str]] = None,
-                                 max_results: int = 80) -> List[Card]:
+                                 max_results: int = 80,
+                                 exclude_dominated: bool = False,
+                                 search_mode: Optional[str] = None) -> List[Card]:
         """
         Busca cartas usando RAG para uma estratégia específica
         
@@ -57,54 +191,479 @@ class SemanticCardSearch:
             required_cards: Cartas que DEVEM estar no resultado
             forbidden_cards: Cartas que NÃO DEVEM estar no resultado
             max_results: Número máximo de resultados
+            exclude_dominated: Remove cartas estritamente piores que outra do catálogo
+            search_mode: Sobrescreve o modo da instância ('vector' ou 'hybrid')
             
         Returns:
             Lista de objetos Card relevantes para a estratégia
+            (scores disponíveis em search_scored_cards_for_strategy)
+        """
+        return [
+            scored.card
+            for scored in self.search_scored_cards_for_strategy(
+                strategy,
+                allowed_factions=allowed_factions,
+                use_market=use_market,
+                required_cards=required_cards,
+                forbidden_cards=forbidden_cards,
+                max_results=max_results,
+                exclude_dominated=exclude_dominated,
+                search_mode=search_mode
+            )
+        ]
+    
+    def search_cards_for_strategies(self, strategies: List[str], **kwargs) -> List[List[Card]]:
+        """
+        Versão em lote de search_cards_for_strategy (mesmos filtros para todas)
+        
+        Returns:
+            Uma lista de cartas por estratégia, na ordem de `strategies`
+        """
+        return [
+            [scored.card for scored in results]
+            for results in self.search_scored_cards_for_strategies(strategies, **kwargs)
+        ]
+    
+    def search_scored_cards_for_strategy(self, strategy: str, **kwargs) -> List[ScoredCard]:
+        """
+        Igual a search_cards_for_strategy, mas retorna ScoredCard(card, score, source)
+        
+        Args:
+            strategy: Descrição da estratégia do deck
+            **kwargs: Mesmos filtros de search_cards_for_strategy
+        """
+        return self.search_scored_cards_for_strategies([strategy], **kwargs)[0]
+    
+    def search_scored_cards_for_strategies(self,
+                                           strategies: List[str],
+                                           allowed_factions: Optional[List[str]] = None,
+                                           use_market: bool = False,
+                                           required_cards: Optional[List[str]] = None,
+                                           forbidden_cards: Optional[List[str]] = None,
+                                           max_results: int = 80,
+                                           exclude_dominated: bool = False,
+                                           search_mode: Optional[str] = None) -> List[List[ScoredCard]]:
+        """
+        Busca em lote com scores (mesmos filtros para todas as estratégias)
+        
+        Usada em benchmarks, aquecimento de cache e geração de vários decks:
+        um único encode e uma única consulta ao índice para N estratégias.
+        
+        Returns:
+            Uma lista de ScoredCard por estratégia, na ordem de `strategies`
         """
         # 🚨 ÂNCORA: HYBRID_SEARCH - Busca híbrida semântica + estrutural
         # Contexto: Combina relevância semântica com regras do jogo
         # Cuidado: Ordem importa - semântica primeiro, depois filtros
         # Dependências: ChromaDB para semântica, Google Sheets para dados
         
-        # 1. Preparar query semântica enriquecida
-        enriched_query = self._enrich_strategy_query(strategy, allowed_factions)
+        # 1. Preparar queries (priors de facção/arquétipo no vetor ou no texto)
+        queries, query_vectors = self._prepare_queries(strategies, allowed_factions)
+        
+        # 2-4. Buscar páginas até sobrarem max_results após os filtros
+        candidates = self._retrieve_candidates(
+            queries,
+            query_vectors=query_vectors,
+            allowed_factions=allowed_factions,
+            use_market=use_market,
+            required_cards=required_cards,
+            forbidden_cards=forbidden_cards,
+            max_results=max_results,
+            exclude_dominated=exclude_dominated,
+            search_mode=search_mode
+        )
         
-        # 2. Buscar semanticamente (com margem para filtros posteriores)
-        search_results = self.chromadb_manager.search_similar_cards(
-            strategy_text=enriched_query,
-            n_results=max_results * 2,  # Buscar mais para ter margem após filtros
-            filter_factions=allowed_factions,
-            include_market=use_market
+        # 5-8. Obrigatórias, mercado, limite e ordenação
+        return [
+            self._finalize_results(
+                scored_cards,
+                found_names,
+                embeddings,
+                allowed_factions=allowed_factions,
+                use_market=use_market,
+                required_cards=required_cards,
+                max_results=max_results
+            )
+            for scored_cards, found_names, embeddings in candidates
+        ]
+    
+    def search_scored_cards_by_type(self,
+                                    strategy: str,
+                                    allowed_factions: Optional[List[str]] = None,
+                                    use_market: bool = False,
+                                    required_cards: Optional[List[str]] = None,
+                                    forbidden_cards: Optional[List[str]] = None,
+                                    quotas: Optional[Dict[str, int]] = None,
+                                    exclude_dominated: bool = False) -> Dict[str, List[ScoredCard]]:
+        """
+        Busca com cotas por tipo: uma query vetorial filtrada por tipo, em paralelo
+        
+        O top-k global deixa powers/relics de fora e descarta unidades
+        excedentes; aqui cada tipo busca só o que cabe na sua cota.
+        
+        Args:
+            strategy: Descrição da estratégia do deck
+            allowed_factions, use_market, required_cards, forbidden_cards,
+            exclude_dominated: Mesmos filtros de search_cards_for_strategy
+            quotas: Categoria -> cartas (padrão CONTEXT_TYPE_QUOTAS)
+            
+        Returns:
+            Categoria -> ScoredCards por relevância: a cota de cada tipo em
+            cartas recuperadas (quando o índice tem cartas suficientes) mais as
+            obrigatórias/mercado injetadas (as de tipos sem cota ficam em 'others')
+        """
+        quotas = quotas or CONTEXT_TYPE_QUOTAS
+        queries, query_vectors = self._prepare_queries([strategy], allowed_factions)
+        report = get_dominance_report(self._all_cards) if exclude_dominated else None
+        
+        shape = self._query_shape(allowed_factions, use_market, forbidden_cards,
+                                  exclude_dominated, 'quota')
+        shapes = {category: shape + (category,) for category in quotas}
+        states = {category: self._new_page_state() for category in quotas}
+        page_sizes = {
+            category: self._overfetch.page_size(shapes[category], quota)
+            for category, quota in quotas.items() if quota > 0
+        }
+        
+        while page_sizes:
+            results_by_type = self.chromadb_manager.search_similar_cards_by_type(
+                queries[0],
+                page_sizes,
+                filter_factions=allowed_factions,
+                include_market=use_market,
+                include_embeddings=True,
+                query_embedding=query_vectors[0] if query_vectors is not None else None
+            )
+            
+            next_sizes = {}
+            for category, n_results in page_sizes.items():
+                search_results = results_by_type.get(category, [])
+                state = states[category]
+                self._accept_page(state, search_results, 'quota', required_cards, forbidden_cards,
+                                  report, allowed_factions)
+                
+                exhausted = len(search_results) < n_results
+                if len(state['cards']) < quotas[category] and not exhausted:
+                    next_sizes[category] = self._next_page_size(
+                        n_results, len(state['cards']), quotas[category]
+                    )
+            page_sizes = next_sizes
+        
+        for category, state in states.items():
+            self._record_overfetch(shapes[category], state, quotas[category])
+        
+        # Cota aplicada só às recuperadas; obrigatórias e mercado entram no topo
+        # do seu tipo, além da cota (mesmas regras da busca global)
+        scored_cards = [
+            scored for category, state in states.items()
+            for scored in state['cards'][:quotas[category]]
+        ]
+        found_names = set().union(*(state['names'] for state in states.values()))
+        if required_cards:
+            scored_cards = self._ensure_required_cards(scored_cards, required_cards, found_names)
+        if use_market:
+            scored_cards = self._ensure_market_cards(scored_cards, allowed_factions)
+        
+        by_type: Dict[str, List[ScoredCard]] = {category: [] for category in quotas}
+        for scored in scored_cards:
+            by_type.setdefault(self._diversity_category(scored.card), []).append(scored)
+        
+        return by_type
+    
+    def strategy_vector(self, strategy: str, allowed_factions: Optional[List[str]] = None) -> np.ndarray:
+        """Vetor da query da estratégia, com priors (vem do cache após a primeira busca)"""
+        queries, query_vectors = self._prepare_queries([strategy], allowed_factions)
+        if query_vectors is None:
+            query_vectors = self.chromadb_manager.encode_queries(queries)
+        return query_vectors[0]
+    
+    def _prepare_queries(self, strategies: List[str],
+                         allowed_factions: Optional[List[str]]) -> Tuple[List[str], Optional[np.ndarray]]:
+        """
+        Queries de texto e, com priors vetoriais, os vetores já combinados
+        
+        Returns:
+            ('vector') estratégias cruas + vetores com centróides somados;
+            ('text') queries enriquecidas + None (codificadas na busca)
+        """
+        if self.query_priors == 'text':
+            return [self._enrich_strategy_query(strategy, allowed_factions) for strategy in strategies], None
+        
+        strategies = list(strategies)
+        return strategies, self.chromadb_manager.encode_strategy_queries(strategies, allowed_factions)
+    
+    def search_scored_cards_with_feedback(self,
+                                          strategy: str,
+                                          liked_cards: Optional[List[str]] = None,
+                                          disliked_cards: Optional[List[str]] = None,
+                                          allowed_factions: Optional[List[str]] = None,
+                                          use_market: bool = False,
+                                          required_cards: Optional[List[str]] = None,
+                                          forbidden_cards: Optional[List[str]] = None,
+                                          max_results: int = 80,
+                                          exclude_dominated: bool = False,
+                                          query_vector: Optional[np.ndarray] = None) -> List[ScoredCard]:
+        """
+        Refina uma busca com "mais como estas, menos como aquelas" (Rocchio)
+        
+        O vetor da estratégia anda em direção às cartas curtidas e se afasta das
+        descartadas usando os vetores guardados no índice; nada é re-codificado,
+        então cada rodada de refinamento custa só a busca vetorial.
+        
+        Args:
+            strategy: Estratégia da busca original
+            liked_cards: IDs (ou nomes) de cartas curtidas
+            disliked_cards: IDs (ou nomes) de cartas descartadas; saem do resultado
+            allowed_factions, use_market, required_cards, forbidden_cards,
+            max_results, exclude_dominated: Mesmos filtros de search_cards_for_strategy
+            query_vector: Vetor da estratégia (padrão strategy_vector, do cache de queries)
+            
+        Returns:
+            ScoredCards (source='feedback') com score = cosseno com a query refinada
+        """
+        liked = self._feedback_cards(liked_cards)
+        disliked = self._feedback_cards(disliked_cards)
+        
+        if query_vector is None:
+            query_vector = self.strategy_vector(strategy, allowed_factions)
+        
+        embeddings = self.chromadb_manager.get_card_embeddings(
+            [card_id(card) for card in liked + disliked]
+        )
+        
+        def stacked(cards: List[Card]) -> Optional[np.ndarray]:
+            vectors = [embeddings[card_id(card)] for card in cards if card_id(card) in embeddings]
+            return np.vstack(vectors) if vectors else None
+        
+        refined = rocchio_update(query_vector, stacked(liked), stacked(disliked))
+        
+        # Descartadas saem pelo nome exato (proibidas casam por trecho do nome)
+        candidates = self._retrieve_candidates(
+            [strategy],
+            query_vectors=refined[np.newaxis, :],
+            allowed_factions=allowed_factions,
+            use_market=use_market,
+            required_cards=required_cards,
+            forbidden_cards=forbidden_cards,
+            max_results=max_results,
+            exclude_dominated=exclude_dominated,
+            search_mode='feedback',
+            excluded_names={card.name for card in disliked}
+        )
+        
+        scored_cards, found_names, card_embeddings = candidates[0]
+        return self._finalize_results(
+            scored_cards,
+            found_names,
+            card_embeddings,
+            allowed_factions=allowed_factions,
+            use_market=use_market,
+            required_cards=required_cards,
+            max_results=max_results
+        )
+    
+    def _feedback_cards(self, cards: Optional[List[str]]) -> List[Card]:
+        """Cartas do catálogo para IDs ou nomes (desconhecidos são ignorados)"""
+        found = [self._cards_cache.get(key) for key in cards or []]
+        return [card for card in found if card is not None]
+    
+    def complete_deck(self,
+                      deck_cards: List[str],
+                      allowed_factions: Optional[List[str]] = None,
+                      use_market: bool = False,
+                      forbidden_cards: Optional[List[str]] = None,
+                      max_results: int = 30) -> List[ScoredCard]:
+        """
+        Sugere cartas que combinam com as já escolhidas (ex.: obrigatórias)
+        
+        Usa o grafo de sinergia pré-calculado: sem LLM e sem nova busca vetorial.
+        
+        Args:
+            deck_cards: Nomes das cartas já no deck
+            allowed_factions: Facções permitidas (None = todas)
+            use_market: Se cartas de mercado podem ser sugeridas
+            forbidden_cards: Cartas que não podem ser sugeridas
+            max_results: Número máximo de sugestões
+            
+        Returns:
+            ScoredCards (source='synergy') por afinidade decrescente
+        """
+        graph = self.chromadb_manager.get_synergy_graph()
+        candidates = graph.complete(
+            deck_cards,
+            n_results=max_results,
+            where=build_where_clause(allowed_factions, include_market=use_market),
+            exclude_names=forbidden_cards
+        )
+        
+        suggestions = []
+        for candidate in candidates:
+            card = self._result_card(candidate)
+            if card:
+                suggestions.append(ScoredCard(card, candidate['score'], 'synergy'))
+        return suggestions
+    
+    def _query_shape(self, allowed_factions: Optional[List[str]], use_market: bool,
+                     forbidden_cards: Optional[List[str]], exclude_dominated: bool,
+                     search_mode: Optional[str]) -> Tuple:
+        """Formato da query para a estatística de over-fetch"""
+        return (
+            search_mode or self.search_mode,
+            len(allowed_factions or []),
+            use_market,
+            bool(forbidden_cards),
+            exclude_dominated
         )
+    
+    def _retrieve_candidates(self,
+                             queries: List[str],
+                             allowed_factions: Optional[List[str]],
+                             use_market: bool,
+                             required_cards: Optional[List[str]],
+                             forbidden_cards: Optional[List[str]],
+                             max_results: int,
+                             exclude_dominated: bool,
+                             search_mode: Optional[str],
+                             query_vectors: Optional[np.ndarray] = None,
+                             excluded_names: Optional[set] = None) -> List[Tuple[List[ScoredCard], set, Dict]]:
+        """
+        Busca adaptativa: página inicial dimensionada pela razão de over-fetch
+        aprendida; páginas maiores são pedidas só para as queries que ainda não
+        têm max_results cartas aproveitadas e cujo índice não se esgotou
         
-        # 3. Converter resultados em objetos Card
-        found_cards = []
-        found_names = set()
+        Com query_vectors (uma linha por query) o lado vetorial não codifica texto.
+        Cartas com nome em excluded_names (nome exato) são puladas como duplicatas.
         
-        for result in search_results:
-            # Tentar encontrar no cache
-            card = None
+        Returns:
+            Por query: (ScoredCards aproveitados em ordem de relevância,
+                        nomes de todas as cartas encontradas,
+                        embeddings por nome de carta)
+        """
+        # 🚨 ÂNCORA: ADAPTIVE_PAGES - Páginas crescentes até completar o resultado
+        # Contexto: Dedup por nome, proibidas e dominadas descartam candidatos
+        # Cuidado: Índice não tem offset - cada página repete a busca com n maior
+        #          (embedding vem do cache) e pula IDs já considerados
+        # Dependências: rag/overfetch.py
+        
+        shape = self._query_shape(allowed_factions, use_market, forbidden_cards,
+                                  exclude_dominated, search_mode)
+        source = search_mode or self.search_mode
+        report = get_dominance_report(self._all_cards) if exclude_dominated else None
+        
+        states = [self._new_page_state() for _ in queries]
+        for state in states:
+            state['names'].update(excluded_names or ())
+        
+        n_results = self._overfetch.page_size(shape, max_results)
+        pending = list(range(len(queries)))
+        
+        while pending:
+            batch_results = self._search_batch(
+                [queries[i] for i in pending],
+                query_vectors[pending] if query_vectors is not None else None,
+                n_results=n_results,
+                allowed_factions=allowed_factions,
+                use_market=use_market,
+                search_mode=search_mode
+            )
             
-            # Primeiro tentar pela ID completa
-            if result['id'] in self._cards_cache:
-                card = self._cards_cache[result['id']]
-            # Depois tentar pelo nome
-            elif result['name'] in self._cards_cache:
-                card = self._cards_cache[result['name']]
+            still_pending = []
             
-            if card and card.name not in found_names:
-                # Adicionar score de relevância
-                card.semantic_score = result['similarity_score']
-                found_cards.append(card)
-                found_names.add(card.name)
+            for i, search_results in zip(pending, batch_results):
+                state = states[i]
+                self._accept_page(state, search_results, source, required_cards, forbidden_cards,
+                                  report, allowed_factions)
+                
+                exhausted = len(search_results) < n_results
+                if len(state['cards']) < max_results and not exhausted:
+                    still_pending.append(i)
+            
+            if not still_pending:
+                break
+            
+            kept = min(len(states[i]['cards']) for i in still_pending)
+            n_results = self._next_page_size(n_results, kept, max_results)
+            pending = still_pending
+        
+        for state in states:
+            self._record_overfetch(shape, state, max_results)
+        
+        return [(state['cards'], state['names'], state['embeddings']) for state in states]
+    
+    @staticmethod
+    def _new_page_state() -> Dict:
+        """Estado da busca paginada de uma query"""
+        return {'cards': [], 'names': set(), 'considered': set(), 'positions': {},
+                'embeddings': {}, 'fetched': 0}
+    
+    def _accept_page(self, state: Dict, search_results: List[Dict], source: str,
+                     required_cards: Optional[List[str]], forbidden_cards: Optional[List[str]],
+                     report, allowed_factions: Optional[List[str]] = None) -> None:
+        """Aproveita os resultados ainda não considerados de uma página"""
+        state['fetched'] = len(search_results)
+        
+        new_cards = []
+        for position, result in enumerate(search_results, start=1):
+            if result['id'] in state['considered']:
+                continue
+            state['considered'].add(result['id'])
+            
+            # 3. Converter resultado em Card (dedup por nome)
+            card = self._result_card(result)
+            if card and card.name not in state['names']:
+                new_cards.append(ScoredCard(card, result['similarity_score'], source))
+                state['names'].add(card.name)
+                state['positions'][card.name] = position
+                if result.get('embedding') is not None:
+                    state['embeddings'][card.name] = result['embedding']
         
         # 4. Aplicar filtros de cartas obrigatórias/proibidas
-        filtered_cards = self._apply_card_filters(
-            found_cards, 
-            required_cards, 
-            forbidden_cards
-        )
+        new_cards = self._apply_card_filters(new_cards, required_cards, forbidden_cards)
+        
+        # 4b. Remover cartas dominadas por outra ainda disponível (obrigatórias são preservadas)
+        if report is not None:
+            kept_names = {
+                card.name
+                for card in report.filter_cards([s.card for s in new_cards], keep=required_cards,
+                                                allowed_factions=allowed_factions,
+                                                forbidden=forbidden_cards)
+            }
+            new_cards = [s for s in new_cards if s.card.name in kept_names]
         
+        state['cards'].extend(new_cards)
+    
+    def _next_page_size(self, n_results: int, kept: int, wanted: int) -> int:
+        """Próxima página: o que falta, escalado pela taxa de perda observada"""
+        observed_ratio = n_results / kept if kept else 4.0
+        missing = wanted - kept
+        return min(
+            n_results * 4,
+            n_results + max(missing, math.ceil(missing * observed_ratio * self._overfetch.margin))
+        )
+    
+    def _record_overfetch(self, shape: Tuple, state: Dict, wanted: int):
+        """Posição do wanted-ésimo aproveitado = candidatos realmente necessários"""
+        kept = min(len(state['cards']), wanted)
+        if kept:
+            needed = state['positions'][state['cards'][kept - 1].card.name]
+            self._overfetch.record(shape, needed, kept)
+    
+    def _result_card(self, result: Dict) -> Optional[Card]:
+        """Carta do catálogo correspondente a um resultado do índice"""
+        # Primeiro tentar pela ID completa, depois pelo nome
+        if result['id'] in self._cards_cache:
+            return self._cards_cache[result['id']]
+        return self._cards_cache.get(result['name'])
+    
+    def _finalize_results(self,
+                          filtered_cards: List[ScoredCard],
+                          found_names: set,
+                          embeddings: Dict[str, np.ndarray],
+                          allowed_factions: Optional[List[str]],
+                          use_market: bool,
+                          required_cards: Optional[List[str]],
+                          max_results: int) -> List[ScoredCard]:
+        """Etapas finais comuns das buscas individual e em lote"""
         # 5. Adicionar cartas obrigatórias se não encontradas
         if required_cards:
             filtered_cards = self._ensure_required_cards(
@@ -120,14 +679,17 @@ class SemanticCardSearch:
         # 7. Limitar ao número solicitado
         final_cards = filtered_cards[:max_results]
         
-        # 8. Ordenar por relevância mantendo diversidade
-        final_cards = self._sort_by_relevance_and_diversity(final_cards)
+        # 8. Ordenar por relevância mantendo diversidade (MMR)
+        final_cards = self._rerank_by_diversity(final_cards, embeddings)
         
         return final_cards
     
     def _enrich_strategy_query(self, strategy: str, factions: Optional[List[str]]) -> str:
         """
-        Enriquece a query de estratégia com contexto adicional
+        Enriquece a query de estratégia com contexto adicional (RAG_QUERY_PRIORS='text')
+        
+        Com priors vetoriais o mesmo contexto entra como centróides somados ao
+        vetor da estratégia (rag/query_priors.py) e esta query não é usada.
         
         Args:
             strategy: Estratégia original
@@ -163,48 +725,35 @@ class SemanticCardSearch:
                     enriched_parts.append(faction_traits[faction])
         
         # Detectar e enriquecer arquétipos
-        strategy_lower = strategy.lower()
-        
-        if any(word in strategy_lower for word in ['aggro', 'aggressive', 'fast', 'burn']):
-            enriched_parts.append('charge overwhelm warcry low-cost efficient')
-        
-        elif any(word in strategy_lower for word in ['control', 'removal', 'slow']):
-            enriched_parts.append('removal sweepers card-draw late-game answers')
-        
-        elif any(word in strategy_lower for word in ['midrange', 'value', 'balanced']):
-            enriched_parts.append('efficient-units good-stats value-trades')
-        
-        elif any(word in strategy_lower for word in ['combo', 'synergy', 'engine']):
-            enriched_parts.append('synergistic combo-pieces enablers payoffs')
+        archetype = detect_archetype(strategy)
+        if archetype:
+            enriched_parts.append(STRATEGY_ARCHETYPES[archetype]['keywords'])
         
         return ' '.join(enriched_parts)
     
     def _apply_card_filters(self, 
-                          cards: List[Card], 
+                          cards: List[ScoredCard], 
                           required: Optional[List[str]], 
-                          forbidden: Optional[List[str]]) -> List[Card]:
+                          forbidden: Optional[List[str]]) -> List[ScoredCard]:
         """Aplica filtros de cartas obrigatórias e proibidas"""
         if not required and not forbidden:
             return cards
         
         filtered = []
         
-        for card in cards:
+        for scored in cards:
             # Verificar proibidas
-            if forbidden and any(
-                forbidden_name.lower() in card.name.lower() 
-                for forbidden_name in forbidden
-            ):
+            if is_forbidden_name(scored.card.name, forbidden):
                 continue
             
-            filtered.append(card)
+            filtered.append(scored)
         
         return filtered
     
     def _ensure_required_cards(self, 
-                             cards: List[Card], 
+                             cards: List[ScoredCard], 
                              required: List[str],
-                             found_names: set) -> List[Card]:
+                             found_names: set) -> List[ScoredCard]:
         """Garante que cartas obrigatórias estejam incluídas"""
         result = cards.copy()
         
@@ -213,136 +762,108 @@ class SemanticCardSearch:
             if any(required_name.lower() in name.lower() for name in found_names):
                 continue
             
-            # Buscar carta obrigatória
+            # Buscar carta obrigatória no catálogo em memória
             search_results = self.sheets_client.search_cards(
-                name=required_name,
-                limit=1
+                self._all_cards,
+                name_query=required_name
             )
             
             if search_results:
-                card = search_results[0]
-                card.semantic_score = 1.0  # Alta prioridade por ser obrigatória
-                result.insert(0, card)  # Adicionar no início
+                # Alta prioridade por ser obrigatória
+                result.insert(0, ScoredCard(search_results[0], 1.0, 'required'))  # Adicionar no início
         
         return result
     
-    def _ensure_market_cards(self, cards: List[Card], factions: Optional[List[str]]) -> List[Card]:
+    def _ensure_market_cards(self, cards: List[ScoredCard],
+                             factions: Optional[List[str]]) -> List[ScoredCard]:
         """Garante que haja opções de acesso ao mercado"""
         # 🚨 ÂNCORA: MARKET_DETECTION - Detecção de cartas de mercado
-        # Contexto: Merchants e smugglers dão acesso ao mercado
-        # Cuidado: Diferentes tipos têm restrições de facção
-        # Dependências: Card text deve conter palavras-chave corretas
+        # Contexto: Merchants, smugglers e bargain dão acesso ao mercado
+        # Cuidado: Regra única em core/market_access.py (também usada no is_market do índice)
+        # Dependências: self.market_index (recalculado só quando o catálogo muda)
         
         # Verificar se já tem merchant/smuggler
-        has_market_access = any(
-            card.card_text and any(
-                term in card.card_text.lower() 
-                for term in ['market', 'merchant', 'smuggler', 'etchings']
-            )
-            for card in cards
-        )
-        
-        if has_market_access:
+        if any(self.market_index.is_access(scored.card) for scored in cards):
             return cards
         
-        # Buscar merchants/smugglers apropriados
-        market_cards = []
-        
-        # Termos de busca por tipo
-        market_search_terms = [
-            'merchant',
-            'smuggler',
-            'etchings',
-            'marketeer'
-        ]
-        
-        for term in market_search_terms:
-            results = self.sheets_client.search_cards(
-                card_text=term,
-                factions=factions,
-                limit=10
-            )
-            market_cards.extend(results)
-        
-        # Adicionar os mais relevantes
-        if market_cards:
-            # Ordenar por custo (merchants mais baratos primeiro)
-            market_cards.sort(key=lambda x: x.cost)
-            
-            # Adicionar 2-3 opções
-            for i, card in enumerate(market_cards[:3]):
-                if card not in cards:
-                    card.semantic_score = 0.8  # Boa prioridade
-                    cards.insert(i * 5, card)  # Distribuir na lista
+        # Adicionar 2-3 opções mais baratas (boa prioridade), distribuídas na lista
+        # Só construíveis: o builder monta o deck a partir das cartas jogáveis
+        cards = list(cards)
+        present = {scored.card.name for scored in cards}
+        access = [card for card in self.market_index.access_cards(factions, exclude=present)
+                  if card.deck_buildable]
+        for i, card in enumerate(access[:3]):
+            cards.insert(i * 5, ScoredCard(card, 0.8, 'market'))
         
         return cards
     
-    def _sort_by_relevance_and_diversity(self, cards: List[Card]) -> List[Card]:
+    @staticmethod
+    def _diversity_category(card: Card) -> str:
+        """Categoria de tipo usada nas cotas do re-ranking"""
+        if card.is_unit:
+            return 'units'
+        if card.is_power:
+            return 'powers'
+        if 'Spell' in card.card_type:
+            return 'spells'
+        if 'Weapon' in card.card_type:
+            return 'weapons'
+        if 'Relic' in card.card_type:
+            return 'relics'
+        return 'others'
+    
+    def _rerank_by_diversity(self, cards: List[ScoredCard],
+                             embeddings: Dict[str, np.ndarray]) -> List[ScoredCard]:
         """
         Ordena cartas balanceando relevância e diversidade
         
         Args:
-            cards: Lista de cartas com semantic_score
+            cards: Cartas com score de relevância
+            embeddings: Vetores já recuperados, por nome de carta
             
         Returns:
             Lista ordenada para máxima utilidade
         """
         # 🚨 ÂNCORA: DIVERSITY_SORT - Balanceia relevância com variedade
-        # Contexto: Evita muitas cartas similares no topo
-        # Cuidado: Não perder cartas muito relevantes
-        # Dependências: semantic_score deve estar presente
-        
-        # Separar por categorias
-        categories = {
-            'units': [],
-            'spells': [],
-            'powers': [],
-            'weapons': [],
-            'relics': [],
-            'others': []
+        # Contexto: MMR evita cartas semanticamente redundantes no topo;
+        #           cotas por tipo evitam um único tipo dominando o início
+        # Cuidado: Cartas além das cotas não são perdidas (vão para o fim)
+        # Dependências: rag/diversity.py, MMR_LAMBDA/MMR_TYPE_SHARES
+        
+        if len(cards) < 2:
+            return cards
+        
+        # Cartas adicionadas depois da busca (obrigatórias, mercado) não têm vetor
+        missing = {
+            card_id(scored.card): scored.card.name
+            for scored in cards
+            if scored.card.name not in embeddings
+        }
+        if missing:
+            fetched = self.chromadb_manager.get_card_embeddings(list(missing))
+            embeddings = dict(embeddings)
+            embeddings.update({missing[cid]: vector for cid, vector in fetched.items()})
+        
+        # Carta sem vetor conta como não redundante (vetor nulo)
+        dimension = next((len(vector) for vector in embeddings.values()), 1)
+        zero = np.zeros(dimension, dtype=np.float32)
+        matrix = np.vstack([embeddings.get(scored.card.name, zero) for scored in cards])
+        
+        categories = [self._diversity_category(scored.card) for scored in cards]
+        quotas = {
+            category: max(1, math.ceil(share * len(cards)))
+            for category, share in MMR_TYPE_SHARES.items()
         }
         
-        for card in cards:
-            score = getattr(card, 'semantic_score', 0.5)
-            
-            if card.is_unit:
-                categories['units'].append((card, score))
-            elif card.is_power:
-                categories['powers'].append((card, score))
-            elif 'Spell' in card.type:
-                categories['spells'].append((card, score))
-            elif 'Weapon' in card.type:
-                categories['weapons'].append((card, score))
-            elif 'Relic' in card.type:
-                categories['relics'].append((card, score))
-            else:
-                categories['others'].append((card, score))
-        
-        # Ordenar cada categoria por score
-        for category in categories.values():
-            category.sort(key=lambda x: x[1], reverse=True)
-        
-        # Intercalar categorias para diversidade
-        result = []
-        
-        # Primeiro, adicionar top cards de cada categoria
-        for category in ['units', 'spells', 'powers', 'weapons', 'relics']:
-            if categories[category]:
-                card, score = categories[category].pop(0)
-                result.append(card)
-        
-        # Depois, adicionar restante por relevância global
-        remaining = []
-        for category in categories.values():
-            remaining.extend(category)
-        
-        remaining.sort(key=lambda x: x[1], reverse=True)
-        
-        for card, score in remaining:
-            if card not in result:
-                result.append(card)
+        order = mmr_rerank(
+            matrix,
+            [scored.score for scored in cards],
+            lambda_=MMR_LAMBDA,
+            categories=categories,
+            quotas=quotas
+        )
         
-        return result
+        return [cards[i] for i in order]
     
     def get_search_statistics(self) -> Dict:
         """Retorna estatísticas sobre o sistema de busca"""
@@ -352,14 +873,55 @@ class SemanticCardSearch:
             'chromadb_status': 'ready' if info['exists'] else 'not_initialized',
             'total_embeddings': info['count'],
             'cache_size': len(self._cards_cache),
+            'search_mode': self.search_mode,
+            'query_priors': self.query_priors,
+            'overfetch_ratios': self._overfetch.snapshot(),
+            'last_search_timings': self.last_search_timings,
+            'query_cache': get_query_cache().stats(),
             'metadata': info['metadata']
         }
 
 
+# 🚨 ÂNCORA: SHARED_SEARCHER - Instância única por processo
+# Contexto: Criar SemanticCardSearch carrega modelo, ChromaDB e o catálogo inteiro
+# Cuidado: Inicialização protegida por lock (sessões Streamlit rodam em threads);
+#          o catálogo é recarregado quando a versão ativa do índice muda
+# Dependências: create_semantic_search, deck_builder_ai_v4.py
+_shared_searcher: Optional[SemanticCardSearch] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_semantic_search() -> SemanticCardSearch:
+    """Retorna o SemanticCardSearch compartilhado, criando-o na primeira chamada"""
+    global _shared_searcher
+    
+    if _shared_searcher is None:
+        with _shared_lock:
+            if _shared_searcher is None:
+                _shared_searcher = SemanticCardSearch()
+    
+    # Índice reconstruído/trocado desde a carga: catálogo acompanha a nova versão
+    _shared_searcher.refresh_catalog_if_index_changed()
+    return _shared_searcher
+
+
+def is_shared_semantic_search_loaded() -> bool:
+    """Indica se o searcher compartilhado já foi inicializado (sem inicializar)"""
+    return _shared_searcher is not None
+
+
+def reset_shared_semantic_search():
+    """Descarta o searcher compartilhado (ex: após recriar o índice)"""
+    global _shared_searcher
+    
+    with _shared_lock:
+        _shared_searcher = None
+
+
 # Função auxiliar para integração rápida
 def create_semantic_search() -> SemanticCardSearch:
-    """Cria e retorna uma instância configurada do SemanticCardSearch"""
-    return SemanticCardSearch()
+    """Retorna a instância compartilhada do SemanticCardSearch"""
+    return get_shared_semantic_search()
 
 
 # Script de teste se executado diretamente
@@ -374,6 +936,7 @@ if __name__ == "__main__":
     print(f"   ChromaDB: {stats['chromadb_status']}")
     print(f"   Total embeddings: {stats['total_embeddings']}")
     print(f"   Cache size: {stats['cache_size']}")
+    print(f"   Query cache: {stats['query_cache']['size']}/{stats['query_cache']['max_size']}")
     
     if stats['chromadb_status'] != 'ready':
         print("\n❌ ChromaDB não está inicializado! Execute chromadb_setup.py primeiro.")
@@ -404,7 +967,7 @@ if __name__ == "__main__":
         print(f"Facções: {test.get('factions', 'Todas')}")
         print(f"Mercado: {'Sim' if test.get('use_market') else 'Não'}")
         
-        results = searcher.search_cards_for_strategy(
+        results = searcher.search_scored_cards_for_strategy(
             strategy=test['strategy'],
             allowed_factions=test.get('factions'),
             use_market=test.get('use_market', False),
@@ -413,6 +976,11 @@ if __name__ == "__main__":
         )
         
         print(f"\nTop 10 resultados:")
-        for j, card in enumerate(results[:10]):
-            score = getattr(card, 'semantic_score', 0)
-            print(f"{j+1:2d}. {card.name:30s} | {card.cost}{card.influence_string or ''} | Score: {score:.3f}")
\ No newline at end of file
+        for j, (card, score, source) in enumerate(results[:10]):
+            print(f"{j+1:2d}. {card.name:30s} | {card.cost}{card.influence_string or ''} | "
+                  f"Score: {score:.3f} ({source})")
+    
+    # Estatísticas do cache de queries após os testes
+    query_stats = searcher.get_search_statistics()['query_cache']
+    print(f"\n📊 Query cache: hit rate {query_stats['hit_rate']:.0%}, "
+          f"{query_stats['saved_encode_seconds']*1000:.0f}ms de encode economizados")
\ No newline at end of file
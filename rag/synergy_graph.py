@@ -0,0 +1,238 @@
+# rag/synergy_graph.py
+"""
+🚨 ÂNCORA: SYNERGY_GRAPH - Grafo kNN de sinergia entre cartas (CSR)
+Contexto: Pré-calculado no build do índice; completar um deck parcial soma os
+          pesos dos vizinhos das cartas escolhidas (sem LLM e sem nova busca vetorial)
+Cuidado: Peso da aresta = cosseno + bônus por mecânica compartilhada; só arestas
+         com peso positivo são guardadas. Reimpressões aparecem uma vez (por nome)
+Dependências: numpy >= 2 (np.bitwise_count), rag/metadata_filter.py
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import sys
+sys.path.append('..')
+
+from config.constants import CARD_MECHANICS, SYNERGY_MECHANIC_WEIGHT, SYNERGY_NEIGHBORS
+from rag.metadata_filter import MetadataFilter, is_forbidden_name
+
+BUILD_BLOCK_SIZE = 512
+
+
+def mechanic_bits(documents: Sequence[str]) -> np.ndarray:
+    """Bitmask (uint32) das mecânicas de CARD_MECHANICS presentes em cada texto"""
+    bits = np.zeros(len(documents), dtype=np.uint32)
+    for position, mechanic in enumerate(CARD_MECHANICS):
+        flag = np.uint32(1 << position)
+        for row, document in enumerate(documents):
+            if mechanic in document.lower():
+                bits[row] |= flag
+    return bits
+
+
+class SynergyGraph:
+    """Vizinhos de cada carta em CSR: indptr (n+1), indices e weights (arestas)"""
+
+    def __init__(self,
+                 ids: List[str],
+                 indptr: np.ndarray,
+                 indices: np.ndarray,
+                 weights: np.ndarray,
+                 bits: np.ndarray,
+                 metadatas: List[Dict[str, Any]]):
+        self.ids = list(ids)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bits = np.asarray(bits, dtype=np.uint32)
+        self.metadatas = list(metadatas)
+
+        self.names = np.array([m.get('name', '') for m in self.metadatas], dtype=object)
+        self._rows_by_name: Dict[str, List[int]] = {}
+        for row, name in enumerate(self.names):
+            self._rows_by_name.setdefault(name.lower(), []).append(row)
+        self._filter = MetadataFilter(self.metadatas)
+
+    # ------------------------------------------------------------------
+    # Construção / persistência
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls,
+              ids: List[str],
+              embeddings: np.ndarray,
+              documents: List[str],
+              metadatas: List[Dict[str, Any]],
+              k: int = SYNERGY_NEIGHBORS,
+              mechanic_weight: float = SYNERGY_MECHANIC_WEIGHT) -> 'SynergyGraph':
+        """
+        kNN exato por blocos de linhas (memória ~ BUILD_BLOCK_SIZE x n)
+
+        Args:
+            ids, embeddings, documents, metadatas: Dados alinhados do índice
+            k: Vizinhos por carta
+            mechanic_weight: Bônus por mecânica compartilhada
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+
+        n = len(ids)
+        k = min(k, max(n - 1, 0))
+        bits = mechanic_bits(documents)
+
+        row_indices: List[np.ndarray] = []
+        row_weights: List[np.ndarray] = []
+
+        for start in range(0, n, BUILD_BLOCK_SIZE):
+            end = min(start + BUILD_BLOCK_SIZE, n)
+            scores = matrix[start:end] @ matrix.T
+            if mechanic_weight:
+                shared = np.bitwise_count(bits[start:end, np.newaxis] & bits[np.newaxis, :])
+                scores += mechanic_weight * shared
+            scores[np.arange(end - start), np.arange(start, end)] = -np.inf  # sem laço
+
+            if k == 0:
+                row_indices.extend(np.empty(0, dtype=np.int32) for _ in range(end - start))
+                row_weights.extend(np.empty(0, dtype=np.float32) for _ in range(end - start))
+                continue
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for neighbours, weights in zip(top, top_scores):
+                positive = weights > 0
+                row_indices.append(neighbours[positive].astype(np.int32))
+                row_weights.append(weights[positive].astype(np.float32))
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(row) for row in row_indices])
+
+        return cls(
+            ids=ids,
+            indptr=indptr,
+            indices=np.concatenate(row_indices) if row_indices else np.empty(0, dtype=np.int32),
+            weights=np.concatenate(row_weights) if row_weights else np.empty(0, dtype=np.float32),
+            bits=bits,
+            metadatas=metadatas
+        )
+
+    @classmethod
+    def from_numpy_index(cls, index, **kwargs) -> 'SynergyGraph':
+        return cls.build(index.ids, index.dequantized(), index.documents, index.metadatas, **kwargs)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=np.array(self.ids, dtype=str),
+            indptr=self.indptr,
+            indices=self.indices,
+            weights=self.weights,
+            bits=self.bits,
+            metadatas=np.array(json.dumps(self.metadatas))
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SynergyGraph':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                ids=data['ids'].tolist(),
+                indptr=data['indptr'],
+                indices=data['indices'],
+                weights=data['weights'],
+                bits=data['bits'],
+                metadatas=json.loads(str(data['metadatas']))
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes dos arrays CSR + bitmasks"""
+        return int(self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes + self.bits.nbytes)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def rows_for_names(self, names: Sequence[str]) -> np.ndarray:
+        """Linhas das cartas com esses nomes (todas as reimpressões)"""
+        rows = [row for name in names for row in self._rows_by_name.get(name.lower(), [])]
+        return np.array(sorted(set(rows)), dtype=np.int64)
+
+    def neighbors(self, name: str, limit: int = 10) -> List[Dict]:
+        """Vizinhos mais fortes de uma carta"""
+        return self.complete([name], n_results=limit)
+
+    def complete(self,
+                 deck_names: Sequence[str],
+                 n_results: int = 30,
+                 where: Optional[Dict] = None,
+                 exclude_names: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Candidatas para completar um deck parcial
+
+        score(c) = Σ_{s no deck} peso(s → c) / |cartas do deck encontradas|
+
+        Args:
+            deck_names: Cartas já escolhidas (nomes)
+            n_results: Quantidade de candidatas
+            where: Filtro de metadata (mesmo formato do ChromaDB)
+            exclude_names: Cartas que não podem ser sugeridas (nome parcial, como nas buscas)
+
+        Returns:
+            Lista de {'id', 'name', 'score', 'metadata'} por score decrescente
+        """
+        seeds = self.rows_for_names(deck_names)
+        if len(seeds) == 0 or n_results <= 0:
+            return []
+
+        # Soma esparsa das linhas CSR das sementes
+        starts, ends = self.indptr[seeds], self.indptr[seeds + 1]
+        edge_positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        scores = np.bincount(
+            self.indices[edge_positions],
+            weights=self.weights[edge_positions],
+            minlength=len(self.ids)
+        )
+        found_names = {name.lower() for name in self.names[seeds]}
+        scores /= len(found_names)
+
+        blocked = self.rows_for_names(list(found_names))
+        scores[blocked] = 0.0
+        if where:
+            scores[~self._filter.mask(where)] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        results = []
+        seen = set()
+        for row in candidates:
+            name = self.names[row]
+            if name in seen:
+                continue
+            seen.add(name)
+            if is_forbidden_name(name, exclude_names):
+                continue
+            results.append({
+                'id': self.ids[row],
+                'name': name,
+                'score': float(scores[row]),
+                'metadata': self.metadatas[row]
+            })
+            if len(results) == n_results:
+                break
+
+        return results
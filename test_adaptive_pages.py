@@ -0,0 +1,82 @@
+"""Teste da busca paginada adaptativa (over-fetch aprendido) da busca semântica"""
+import numpy as np
+
+from core.market_access import get_market_index
+from data.models import Card
+from rag.overfetch import OverfetchTracker
+from rag.semantic_search import SemanticCardSearch
+
+class RankedManager:
+    """
+    Manager falso com ranking fixo: cada carta aparece duas vezes (reimpressões
+    com IDs diferentes), então o dedup por nome descarta metade dos candidatos
+    """
+    def __init__(self, n_cards):
+        vectors = np.random.default_rng(5).normal(size=(n_cards, 8)).astype(np.float32)
+        self.results = [
+            {'id': f"r{i}", 'name': f"Card {i // 2}", 'similarity_score': 1 - i / (2 * n_cards),
+             'embedding': vectors[i // 2]}
+            for i in range(2 * n_cards)
+        ]
+        self.page_sizes = []
+
+    def search_similar_cards_batch(self, queries, n_results, **kwargs):
+        self.page_sizes.append(n_results)
+        return [[dict(result) for result in self.results[:n_results]] for _ in queries]
+
+def make_searcher(n_cards):
+    searcher = object.__new__(SemanticCardSearch)
+    searcher.search_mode = 'vector'
+    searcher.query_priors = 'text'
+    searcher.chromadb_manager = RankedManager(n_cards)
+    searcher._overfetch = OverfetchTracker()
+    searcher._all_cards = [Card(name=f"Card {i}", card_type="Unit") for i in range(n_cards)]
+    searcher._cards_cache = {card.name: card for card in searcher._all_cards}
+    searcher.market_index = get_market_index(searcher._all_cards)
+    return searcher
+
+def retrieve(searcher, max_results, forbidden_cards=None):
+    return searcher._retrieve_candidates(
+        ["aggro"], allowed_factions=None, use_market=False, required_cards=None,
+        forbidden_cards=forbidden_cards, max_results=max_results,
+        exclude_dominated=False, search_mode=None
+    )[0][0]
+
+def test_adaptive_pages():
+    print("🧪 Testando páginas adaptativas da busca...\n")
+
+    searcher = make_searcher(500)
+    manager = searcher.chromadb_manager
+    cards = searcher.search_scored_cards_for_strategy("aggro", forbidden_cards=["Card 1"], max_results=40)
+    names = [scored.card.name for scored in cards]
+    assert len(cards) == 40 and len(set(names)) == 40
+    assert not any(name.startswith("Card 1") for name in names)  # "Card 1", "Card 10"... proibidas
+    assert manager.page_sizes[0] == 44 and len(manager.page_sizes) > 1
+    assert manager.page_sizes == sorted(manager.page_sizes)
+    print(f"  ✅ Exatamente 40 cartas após dedup/proibidas (páginas {manager.page_sizes})")
+
+    # Posição da 40ª carta aproveitada = candidatos realmente necessários
+    accepted = retrieve(make_searcher(500), 40, forbidden_cards=["Card 1"])
+    needed = int(accepted[39].card.name.split()[1]) * 2 + 1
+    expected_ratio = needed / 40
+    shape = searcher._query_shape(None, False, ["Card 1"], False, None)
+    for _ in range(15):
+        manager.page_sizes.clear()
+        assert len(retrieve(searcher, 40, forbidden_cards=["Card 1"])) >= 40
+    assert abs(searcher._overfetch.ratio(shape) - expected_ratio) < 0.01
+    assert manager.page_sizes == [searcher._overfetch.page_size(shape, 40)]
+    assert searcher._overfetch.ratio(searcher._query_shape(None, False, None, False, None)) == 1.0
+    print(f"  ✅ Razão aprendida converge para {expected_ratio:.2f} e a 1ª página basta")
+
+    searcher = make_searcher(30)  # 60 resultados, 30 cartas distintas
+    manager = searcher.chromadb_manager
+    cards = searcher.search_scored_cards_for_strategy("aggro", max_results=40)
+    assert len(cards) == 30
+    assert len(manager.page_sizes) == 2 and manager.page_sizes[-1] > 60  # 2ª página veio incompleta
+    print(f"  ✅ Índice esgotado: {len(cards)} cartas, paginação para ({manager.page_sizes})")
+
+    print("\n✅ Páginas adaptativas OK!")
+    return True
+
+if __name__ == "__main__":
+    test_adaptive_pages()
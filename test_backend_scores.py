@@ -0,0 +1,58 @@
+"""Teste de consistência do similarity_score entre os backends ChromaDB e NumPy"""
+import tempfile
+
+import numpy as np
+
+from rag.chromadb_setup import ChromaDBManager, cosine_distances
+from rag.numpy_index import NumpyVectorIndex
+
+def _scores(manager, results):
+    return {result['id']: result['similarity_score'] for result in manager._format_results(results)}
+
+def test_backend_scores():
+    print("🧪 Testando similarity_score entre backends...\n")
+
+    rng = np.random.default_rng(7)
+    embeddings = rng.normal(size=(40, 16)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)  # Como o all-MiniLM-L6-v2
+    ids = [f"card_{i}" for i in range(40)]
+    metadatas = [{'name': f"Card {i}", 'cost': i % 7, 'factions': 'FIRE'} for i in range(40)]
+    documents = [f"Card: Card {i}" for i in range(40)]
+    query = (embeddings[3] + rng.normal(scale=0.3, size=16)).astype(np.float32)[None, :]
+    query /= np.linalg.norm(query)
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ChromaDBManager(persist_directory=directory, backend='chroma')
+        version, collection = manager._create_version_collection()
+        collection.add(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
+        manager._activate_collection_version(
+            manager._version_entry(version, collection.name, {'total_cards': len(ids)})
+        )
+        assert collection.metadata["hnsw:space"] == "cosine"
+
+        chroma_scores = _scores(manager, manager._query_index(query, n_results=10))
+        numpy_scores = _scores(manager, NumpyVectorIndex.from_collection(collection).query(query, n_results=10))
+        expected = embeddings @ query[0]
+
+        assert list(chroma_scores) == list(numpy_scores)
+        for card_id, score in chroma_scores.items():
+            assert abs(score - numpy_scores[card_id]) < 1e-4
+            assert abs(score - expected[ids.index(card_id)]) < 1e-4
+        print(f"  ✅ Mesmo score (cosseno) nos dois backends: top {list(chroma_scores)[0]} "
+              f"= {chroma_scores[list(chroma_scores)[0]]:.3f}")
+
+        # Versões criadas antes do espaço de cosseno (L2 padrão do ChromaDB)
+        legacy = manager.chroma_client.create_collection(name="eternal_cards_legacy")
+        legacy.add(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
+        legacy_results = legacy.query(query_embeddings=query.tolist(), n_results=10,
+                                      include=["documents", "metadatas", "distances"])
+        legacy_scores = _scores(manager, cosine_distances(legacy_results, legacy.metadata))
+        for card_id, score in legacy_scores.items():
+            assert abs(score - numpy_scores[card_id]) < 1e-4
+        print("  ✅ Coleção L2 antiga convertida para o mesmo score")
+
+    print("\n✅ Scores consistentes entre backends!")
+    return True
+
+if __name__ == "__main__":
+    test_backend_scores()
@@ -0,0 +1,121 @@
+"""Teste da busca em lote: N estratégias numa chamada = N chamadas individuais"""
+import tempfile
+import zlib
+
+import numpy as np
+
+from core.market_access import get_market_index
+from data.google_sheets_client import GoogleSheetsClient
+from data.models import Card
+from rag.chromadb_setup import ChromaDBManager
+from rag.metadata_filter import faction_flags
+from rag.numpy_index import NumpyVectorIndex
+from rag.overfetch import OverfetchTracker
+from rag.query_priors import QueryPriors
+from rag.semantic_search import SemanticCardSearch
+
+FACTIONS = ['FIRE', 'TIME', 'JUSTICE', 'PRIMAL', 'SHADOW']
+TYPES = ['Unit', 'Unit', 'Unit', 'Spell', 'Spell', 'Relic', 'Weapon', 'Power']
+WORDS = ['aggro', 'warcry', 'flying', 'control', 'removal', 'ramp', 'lifesteal', 'spells']
+
+class CatalogSheets(GoogleSheetsClient):
+    """Planilha em memória (sem conexão com o Google Sheets)"""
+    def __init__(self, cards):
+        self.cards = cards
+
+    def get_all_cards(self, *args, **kwargs):
+        return self.cards
+
+class HashEncoder:
+    """Encoder determinístico: mesmo texto, mesmo vetor"""
+    model_name = 'hash-encoder'
+
+    def encode(self, texts, **kwargs):
+        return np.vstack([
+            np.random.default_rng(zlib.crc32(text.encode())).normal(size=32) for text in texts
+        ]).astype(np.float32)
+
+def make_searcher(directory, n_cards=400):
+    """SemanticCardSearch sobre um ChromaDBManager com backend NumPy em memória"""
+    rng = np.random.default_rng(3)
+    cards = [
+        Card(name=f"Card {i}", cost=i % 8, card_type=TYPES[i % len(TYPES)],
+             factions=[FACTIONS[i % 5]], influence={FACTIONS[i % 5]: 1},
+             text=f"{WORDS[i % len(WORDS)]} {WORDS[(i * 3) % len(WORDS)]}",
+             set_number="1", eternal_id=str(i))
+        for i in range(n_cards)
+    ]
+    market_index = get_market_index(cards)
+    ids = [f"{c.set_number}_{c.eternal_id}_{c.name.replace(' ', '_')}" for c in cards]
+    metadatas = [
+        {'name': c.name, 'cost': c.cost, 'type': c.card_type, 'factions': ','.join(c.factions),
+         **faction_flags(c.factions), 'is_unit': c.is_unit, 'is_spell': 'Spell' in c.card_type,
+         'is_power': c.is_power, 'is_relic': 'Relic' in c.card_type,
+         'is_weapon': 'Weapon' in c.card_type, 'is_market': market_index.is_access(c)}
+        for c in cards
+    ]
+    documents = [f"Card: {c.name} | Type: {c.card_type} | Text: {c.text}" for c in cards]
+    embeddings = rng.normal(size=(n_cards, 32)).astype(np.float32)
+
+    manager = ChromaDBManager(persist_directory=directory, backend='numpy')
+    manager._numpy_index = NumpyVectorIndex(ids, embeddings, metadatas, documents)
+    manager._query_priors = QueryPriors.build(embeddings, documents, metadatas)
+    manager._query_encoder = HashEncoder()
+    manager._loaded_collection = manager.collection_name
+    manager._schema_checked = True
+
+    searcher = object.__new__(SemanticCardSearch)
+    searcher.search_mode = 'vector'
+    searcher.query_priors = 'text'
+    searcher.chromadb_manager = manager
+    searcher._overfetch = OverfetchTracker()
+    searcher.sheets_client = CatalogSheets(cards)
+    searcher._cards_cache = {}
+    searcher._all_cards = []
+    searcher._load_cards_cache()
+    return searcher
+
+def _names(results):
+    return [(scored.card.name, round(scored.score, 5), scored.source) for scored in results]
+
+def test_batch_search():
+    print("🧪 Testando busca em lote vs chamadas individuais...\n")
+
+    strategies = ["Aggro warcry units", "Control with removal", "Ramp into flying", "Lifesteal spells"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        searcher = make_searcher(directory)
+        manager = searcher.chromadb_manager
+
+        batch = manager.search_similar_cards_batch(strategies, n_results=25, filter_factions=['FIRE', 'TIME'])
+        for strategy, results in zip(strategies, batch):
+            single = manager.search_similar_cards(strategy, n_results=25, filter_factions=['FIRE', 'TIME'])
+            assert [(r['id'], round(r['similarity_score'], 5)) for r in results] == \
+                   [(r['id'], round(r['similarity_score'], 5)) for r in single]
+        print(f"  ✅ search_similar_cards_batch = {len(strategies)} x search_similar_cards")
+
+        for priors in ('text', 'vector'):
+            for mode in ('vector', 'hybrid'):
+                searcher.query_priors = priors
+                filters = dict(allowed_factions=['FIRE', 'SHADOW'], forbidden_cards=['Card 10'],
+                               max_results=30, search_mode=mode)
+                # Razão de over-fetch zerada a cada chamada: o tamanho da página muda
+                # o pool da fusão híbrida, então as duas formas partem da mesma página
+                searcher._overfetch = OverfetchTracker()
+                batch = searcher.search_scored_cards_for_strategies(strategies, **filters)
+                assert len(batch) == len(strategies)
+                for strategy, results in zip(strategies, batch):
+                    searcher._overfetch = OverfetchTracker()
+                    single = searcher.search_scored_cards_for_strategy(strategy, **filters)
+                    assert _names(results) == _names(single)
+                    assert len(results) == 30
+                searcher._overfetch = OverfetchTracker()
+                assert searcher.search_cards_for_strategies(strategies, **filters)[1] == \
+                       [scored.card for scored in batch[1]]
+                print(f"  ✅ priors '{priors}', modo '{mode}': lote igual às chamadas individuais")
+
+    print("\n✅ Busca em lote OK!")
+    return True
+
+if __name__ == "__main__":
+    test_batch_search()
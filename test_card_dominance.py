@@ -0,0 +1,84 @@
+"""Teste do detector de cartas dominadas"""
+from data import card_catalog
+from data.models import Card
+from core.card_dominance import compute_dominance, get_dominance_report
+
+def test_card_dominance():
+    print("🧪 Testando detector de cartas dominadas...\n")
+
+    def unit(name, cost, attack, health, influence, text=""):
+        return Card(
+            name=name,
+            cost=cost,
+            influence=influence,
+            card_type="Unit",
+            factions=list(influence.keys()),
+            attack=attack,
+            health=health,
+            text=text
+        )
+
+    cards = [
+        unit("Oni Ronin", 1, 2, 1, {"FIRE": 1}, "Warcry"),
+        unit("Ronin Fraco", 1, 1, 1, {"FIRE": 1}, "Warcry"),        # Stats piores
+        unit("Ronin Caro", 1, 2, 1, {"FIRE": 2}, "Warcry"),         # Mais influência
+        unit("Ronin Sem Warcry", 1, 1, 1, {"FIRE": 1}),             # Keywords diferentes
+        unit("Ronin Com Efeito", 1, 1, 1, {"FIRE": 1}, "Warcry. Summon: Draw a card."),
+        unit("Trade-off", 1, 3, 0, {"FIRE": 1}, "Warcry"),          # Não comparável
+    ]
+
+    dominated = compute_dominance(cards)
+
+    for name, dominators in dominated.items():
+        print(f"  ❌ {name} é dominada por {', '.join(dominators)}")
+
+    assert dominated["Ronin Fraco"] == ["Oni Ronin"]
+    assert dominated["Ronin Caro"] == ["Oni Ronin"]
+    assert "Oni Ronin" not in dominated
+    assert "Ronin Sem Warcry" not in dominated
+    assert "Ronin Com Efeito" not in dominated
+    assert "Trade-off" not in dominated
+
+    # Cache por versão do catálogo: a versão é calculada uma vez por catálogo
+    calls = []
+    original = card_catalog.catalog_version
+    card_catalog.catalog_version = lambda c: calls.append(1) or original(c)
+    try:
+        report = get_dominance_report(cards)
+        computed = len(calls)
+        assert get_dominance_report(cards) is report
+        assert len(calls) == computed
+        subset = cards[:3]
+        other = get_dominance_report(subset)
+        assert get_dominance_report(cards) is report  # Um relatório por catálogo
+        assert get_dominance_report(subset) is other
+        assert len(calls) == computed + 1
+    finally:
+        card_catalog.catalog_version = original
+    print("  ✅ Chamada repetida reusa versão e relatório do catálogo")
+
+    # Cartas obrigatórias nunca são removidas
+    kept = report.filter_cards(cards, keep=["Ronin Fraco"])
+    kept_names = [c.name for c in kept]
+    assert "Ronin Fraco" in kept_names
+    assert "Ronin Caro" not in kept_names
+
+    # Dominada só sai se quem a domina ainda pode entrar no deck
+    kept = report.filter_cards(cards, forbidden=["Oni Ronin"])
+    assert "Ronin Fraco" in [c.name for c in kept]
+    kept = report.filter_cards(cards, allowed_factions=["FIRE"])
+    assert "Ronin Fraco" not in [c.name for c in kept]
+    assert not report.dominated_names(allowed_factions=["SHADOW"])  # Dominante fora das facções
+
+    alt = unit("Oni Ronin", 1, 2, 1, {"FIRE": 1}, "Warcry")
+    alt.deck_buildable = False
+    catalog = [alt] + cards[1:]
+    assert not get_dominance_report(catalog).dominated_names()
+    print("  ✅ Dominantes proibidas ou não construíveis não removem a carta")
+
+    print("\n✅ Teste de dominância concluído com sucesso!")
+
+    return True
+
+if __name__ == "__main__":
+    test_card_dominance()
@@ -0,0 +1,72 @@
+"""Teste do cache de linhas de contexto por carta"""
+from data.models import Card
+from utils import card_line_cache
+from utils.card_line_cache import CardLineCache
+
+def test_card_line_cache():
+    print("🧪 Testando cache de linhas de contexto...\n")
+
+    oni = Card(
+        name="Oni Ronin",
+        cost=1,
+        influence={"FIRE": 1},
+        influence_string="{F}",
+        card_type="Unit",
+        factions=["FIRE"],
+        attack=2,
+        health=1,
+        text="Warcry",
+        rarity="Common"
+    )
+    titan = Card(
+        name="Sandstorm Titan",
+        cost=4,
+        influence={"TIME": 2},
+        card_type="Unit",
+        factions=["TIME"],
+        attack=5,
+        health=6,
+        rarity="Legendary"
+    )
+
+    cache = CardLineCache()
+    assert cache.sync([oni, titan]) == 2
+
+    assert cache.line(oni, 'compact') == "• Oni Ronin | 1{F} | 2/1 | Common"
+    assert cache.line(oni, 'full') == "• Oni Ronin | 1{F} | 2/1 | Common | Warcry"
+    assert cache.line(oni, 'agent') == "Oni Ronin - 1 custo - 2/1 Unit - FIRE - Warcry..."
+    assert cache.cost_string(titan) == "4{T}{T}"
+
+    for line in cache.lines([oni, titan], 'full'):
+        print(f"  {line}")
+
+    # Consultas de cartas sincronizadas não recalculam id nem fingerprint
+    calls = []
+    original = card_line_cache.card_fingerprint
+    card_line_cache.card_fingerprint = lambda c: calls.append(1) or original(c)
+    try:
+        cache.lines([oni, titan] * 10, 'compact')
+        assert not calls
+    finally:
+        card_line_cache.card_fingerprint = original
+    print("  ✅ Consultas leem o dict sem recalcular fingerprints")
+
+    # Sync sem mudanças não renderiza nada
+    assert cache.sync([oni, titan]) == 0
+
+    # Alteração em uma carta invalida apenas ela
+    buffed = oni.copy(update={'attack': 3})
+    assert cache.sync([buffed, titan]) == 1
+    assert cache.line(buffed, 'compact') == "• Oni Ronin | 1{F} | 3/1 | Common"
+
+    # Carta editada ainda não sincronizada não usa a linha antiga
+    nerfed = buffed.copy(update={'cost': 2, 'text': "Warcry. Quickdraw"})
+    assert cache.line(nerfed, 'full') == "• Oni Ronin | 2{F} | 3/1 | Common | Warcry. Quickdraw"
+    assert cache.line(buffed, 'compact') == "• Oni Ronin | 1{F} | 3/1 | Common"
+
+    print("\n✅ Teste do cache de linhas concluído com sucesso!")
+
+    return True
+
+if __name__ == "__main__":
+    test_card_line_cache()
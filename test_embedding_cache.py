@@ -0,0 +1,61 @@
+"""Teste do cache persistente de embeddings por texto de carta"""
+import os
+import tempfile
+
+import numpy as np
+
+from rag.embedding_cache import EmbeddingCache
+
+def _vectors(texts):
+    return np.array([[len(text), sum(map(ord, text)) % 101, 1.0] for text in texts], dtype=np.float32)
+
+def test_embedding_cache():
+    print("🧪 Testando cache de embeddings...\n")
+
+    texts = ["Card: Torch | Text: Deal 1 damage", "Card: Sediment | Text: Power", "Card: Permafrost"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(directory, "sentence-transformers/model-a")
+        found, missing = cache.lookup(texts)
+        assert found == [None, None, None] and missing == [0, 1, 2]
+        assert (cache.hits, cache.misses) == (0, 3)
+
+        cache.store(texts[:2], _vectors(texts[:2]))
+        found, missing = cache.lookup(texts)
+        assert missing == [2]
+        assert np.allclose(found[0], _vectors(texts[:1])[0]) and found[2] is None
+        assert (cache.hits, cache.misses) == (2, 4)
+        print("  ✅ Hit/miss por texto")
+
+        other = EmbeddingCache(directory, "sentence-transformers/model-b")
+        other.store(texts[:1], _vectors(["outro modelo"]))
+        assert other.key(texts[0]) != cache.key(texts[0])
+        assert np.allclose(cache.lookup(texts[:1])[0][0], _vectors(texts[:1])[0])
+        _, missing = other.lookup(texts[1:2])
+        assert missing == [0]
+        print("  ✅ Modelos diferentes não compartilham vetores")
+
+        cache.store(texts[2:], _vectors(texts[2:]))
+        cache.save(keep_texts=texts[1:])
+        other.save()
+        assert len(cache) == 2
+        model_dir = os.path.join(directory, "sentence-transformers_model-a")
+        assert os.path.exists(os.path.join(model_dir, "keys.json"))
+        assert os.path.exists(os.path.join(model_dir, "vectors.npy"))
+        print("  ✅ save(keep_texts) descarta textos que saíram do catálogo")
+
+        reloaded = EmbeddingCache(directory, "sentence-transformers/model-a")
+        assert len(reloaded) == 2
+        found, missing = reloaded.lookup(texts)
+        assert missing == [0]
+        assert np.allclose(np.vstack(found[1:]), _vectors(texts[1:]))
+
+        reloaded_other = EmbeddingCache(directory, "sentence-transformers/model-b")
+        assert np.allclose(reloaded_other.lookup(texts[:1])[0][0], _vectors(["outro modelo"])[0])
+        print("  ✅ Vetores recarregados de keys.json/vectors.npy")
+
+    print("\n✅ Cache de embeddings OK!")
+    return True
+
+if __name__ == "__main__":
+    test_embedding_cache()
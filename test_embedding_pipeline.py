@@ -0,0 +1,82 @@
+"""Teste do pipeline de embeddings (encode em lotes + inserção sobreposta)"""
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from rag.embedding_cache import EmbeddingCache
+from rag.embedding_pipeline import EmbeddingPipeline
+
+class CountingEncoder:
+    """Vetor determinístico por texto; conta os textos codificados"""
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32):
+        self.encoded.extend(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+class FakeCollection:
+    """Registra as inserções; inserção lenta para sobrepor com o próximo encode"""
+    def __init__(self):
+        self.batches = []
+        self.threads = set()
+
+    def add(self, ids, embeddings, documents, metadatas):
+        time.sleep(0.01)
+        self.threads.add(threading.current_thread().name)
+        self.batches.append((list(ids), embeddings, list(documents), list(metadatas)))
+
+def test_embedding_pipeline():
+    print("🧪 Testando pipeline de embeddings...\n")
+
+    documents = [f"Card: Card {i} | Text: {'warcry ' * (i % 3)}" for i in range(23)]
+    ids = [f"1_{i}_Card_{i}" for i in range(23)]
+    metadatas = [{'name': f"Card {i}"} for i in range(23)]
+    expected = CountingEncoder().encode(documents)
+
+    encoder = CountingEncoder()
+    collection = FakeCollection()
+    progress = []
+    stats = EmbeddingPipeline(chunk_size=5, encoder=encoder).run(
+        collection, ids, documents, metadatas,
+        progress_callback=lambda done, total: progress.append((done, total))
+    )
+
+    assert [batch[0] for batch in collection.batches] == [ids[i:i + 5] for i in range(0, 23, 5)]
+    inserted_ids = [card_id for batch in collection.batches for card_id in batch[0]]
+    assert inserted_ids == ids  # Cada lote uma única vez, na ordem
+    assert [doc for batch in collection.batches for doc in batch[2]] == documents
+    assert [m for batch in collection.batches for m in batch[3]] == metadatas
+    assert np.allclose(np.vstack([batch[1] for batch in collection.batches]), expected)
+    assert all(name.startswith("chroma-insert") for name in collection.threads)
+    assert encoder.encoded == documents
+    assert progress[-1] == (23, 23) and [done for done, _ in progress] == sorted(done for done, _ in progress)
+    assert stats['embedded_cards'] == 23 and stats['encoded_cards'] == 23
+    print(f"  ✅ {len(collection.batches)} lotes inseridos uma vez, em ordem, em thread separada")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(directory, "pipeline-test-model")
+        EmbeddingPipeline(chunk_size=5, encoder=CountingEncoder()).run(
+            FakeCollection(), ids, documents, metadatas, cache=cache
+        )
+
+        encoder = CountingEncoder()
+        collection = FakeCollection()
+        changed = documents[:7] + ["Card: Card 7 | Text: buffed"] + documents[8:]
+        stats = EmbeddingPipeline(chunk_size=5, encoder=encoder).run(
+            collection, ids, changed, metadatas, cache=EmbeddingCache(directory, "pipeline-test-model")
+        )
+        assert encoder.encoded == ["Card: Card 7 | Text: buffed"]
+        assert stats['cache_hits'] == 22 and stats['encoded_cards'] == 1
+        assert [card_id for batch in collection.batches for card_id in batch[0]] == ids
+        assert np.allclose(np.vstack([batch[1] for batch in collection.batches]),
+                           CountingEncoder().encode(changed))
+    print("  ✅ Com cache só o texto alterado é codificado")
+
+    print("\n✅ Pipeline de embeddings OK!")
+    return True
+
+if __name__ == "__main__":
+    test_embedding_pipeline()
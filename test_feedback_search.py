@@ -0,0 +1,114 @@
+"""Teste da busca refinada por feedback (curtidas/descartadas) no SemanticCardSearch"""
+import numpy as np
+
+from data.card_catalog import card_id
+from data.google_sheets_client import GoogleSheetsClient
+from data.models import Card
+from rag.chromadb_setup import ChromaDBManager
+from rag.metadata_filter import build_where_clause, faction_flags
+from rag.numpy_index import NumpyVectorIndex
+from rag.overfetch import OverfetchTracker
+from rag.semantic_search import SemanticCardSearch
+
+class CatalogSheets(GoogleSheetsClient):
+    """Planilha em memória (sem conexão com o Google Sheets)"""
+    def __init__(self, cards):
+        self.cards = cards
+
+    def get_all_cards(self, *args, **kwargs):
+        return self.cards
+
+class NumpyManager:
+    """Stub do ChromaDBManager com backend NumPy: só o que o feedback usa"""
+    collection_name = 'eternal_cards_v1'
+
+    def __init__(self, index):
+        self.index = index
+        self.encoded = []
+
+    def encode_queries(self, texts):
+        self.encoded.extend(texts)
+        raise AssertionError("feedback não deve re-codificar texto")
+
+    def get_card_embeddings(self, card_ids):
+        known = [card for card in card_ids if card in self.index]
+        return dict(zip(known, self.index.get_embeddings(known)))
+
+    def search_by_embeddings_batch(self, query_embeddings, n_results=60, filter_factions=None,
+                                   include_market=False, cost_range=None, include_embeddings=False):
+        include = ['documents', 'metadatas', 'distances'] + (['embeddings'] if include_embeddings else [])
+        results = self.index.query(
+            query_embeddings, n_results=n_results, include=include,
+            where=build_where_clause(filter_factions, include_market=include_market, cost_range=cost_range)
+        )
+        return [ChromaDBManager._format_results(results, row) for row in range(len(results['ids']))]
+
+def make_searcher():
+    """Dois grupos de cartas (pares e ímpares) + uma relíquia longe de tudo"""
+    rng = np.random.default_rng(11)
+    centers = rng.normal(size=(2, 24))
+    cards = [Card(name=f"Card {i}", cost=i % 6, card_type="Unit", factions=['FIRE'],
+                  set_number="1", eternal_id=str(i)) for i in range(60)]
+    cards.append(Card(name="Required Relic", cost=3, card_type="Relic", factions=['FIRE'],
+                      set_number="1", eternal_id="60"))
+    embeddings = np.vstack(
+        [centers[i % 2] + rng.normal(scale=0.4, size=24) for i in range(60)] + [-centers.sum(axis=0)]
+    ).astype(np.float32)
+    metadatas = [{'name': c.name, 'cost': c.cost, 'is_market': False, **faction_flags(c.factions)}
+                 for c in cards]
+
+    searcher = object.__new__(SemanticCardSearch)
+    searcher.search_mode = 'vector'
+    searcher.query_priors = 'text'
+    searcher.chromadb_manager = NumpyManager(NumpyVectorIndex([card_id(c) for c in cards], embeddings, metadatas))
+    searcher._overfetch = OverfetchTracker()
+    searcher.sheets_client = CatalogSheets(cards)
+    searcher._load_cards_cache()
+    return searcher, cards, centers.sum(axis=0).astype(np.float32)
+
+def _odd_share(results):
+    numbers = [int(scored.card.name.split()[1]) for scored in results if scored.card.name.startswith("Card ")]
+    return sum(number % 2 for number in numbers) / len(numbers)
+
+def test_feedback_search():
+    print("🧪 Testando busca com feedback de cartas...\n")
+
+    searcher, cards, query = make_searcher()
+    options = dict(allowed_factions=['FIRE'], max_results=20, query_vector=query)
+
+    baseline = searcher.search_scored_cards_with_feedback("midrange", **options)
+    assert len(baseline) == 20 and {scored.source for scored in baseline} == {'feedback'}
+
+    liked_ids = [card_id(cards[i]) for i in (3, 5, 7)] + ["1_999_Unknown"]
+    refined = searcher.search_scored_cards_with_feedback("midrange", liked_cards=liked_ids, **options)
+    by_name = searcher.search_scored_cards_with_feedback(
+        "midrange", liked_cards=["Card 3", "Card 5", "Card 7"], **options
+    )
+    assert [s.card.name for s in refined] == [s.card.name for s in by_name]
+    assert _odd_share(refined) > _odd_share(baseline) and len(refined) == 20
+    print(f"  ✅ Curtidas por ID ou nome (desconhecidas ignoradas): ímpares "
+          f"{_odd_share(baseline):.0%} → {_odd_share(refined):.0%}")
+
+    disliked = searcher.search_scored_cards_with_feedback(
+        "midrange", liked_cards=liked_ids, disliked_cards=["Card 1", card_id(cards[9])], **options
+    )
+    names = [scored.card.name for scored in disliked]
+    assert "Card 1" not in names and "Card 9" not in names and len(disliked) == 20
+    assert any(name.startswith("Card 1") for name in names)  # Card 11, 13... não são descartadas
+    print("  ✅ Descartadas saem do resultado (só o nome exato)")
+
+    required = searcher.search_scored_cards_with_feedback(
+        "midrange", liked_cards=liked_ids, disliked_cards=["Card 1"],
+        required_cards=["Required Relic"], forbidden_cards=["Card 3"], **options
+    )
+    sources = {scored.card.name: scored.source for scored in required}
+    assert sources.get("Required Relic") == 'required' and "Card 3" not in sources
+    assert len(required) == 20 and "Card 1" not in sources
+    assert searcher.chromadb_manager.encoded == []
+    print("  ✅ Obrigatórias preservadas e proibidas respeitadas, sem re-codificar texto")
+
+    print("\n✅ Busca com feedback OK!")
+    return True
+
+if __name__ == "__main__":
+    test_feedback_search()
@@ -0,0 +1,51 @@
+"""Teste do índice BM25 e da fusão de rankings (busca híbrida)"""
+from rag.bm25_index import BM25Index, tokenize
+from rag.fusion import reciprocal_rank_fusion, weighted_score_fusion
+
+def test_hybrid_retrieval():
+    print("🧪 Testando BM25 + fusão de rankings...\n")
+
+    ids = ["oni", "titan", "torch", "vara"]
+    documents = [
+        "Card: Oni Ronin | Type: Unit | Cost: 1 | Text: Warcry | Keywords: warcry",
+        "Card: Sandstorm Titan | Type: Unit | Cost: 4 | Text: Endurance",
+        "Card: Torch | Type: Spell | Cost: 1 | Text: Deal 2 damage to a unit | Keywords: removal",
+        "Card: Vara, Fate-Touched | Type: Unit | Cost: 4 | Text: Killer. Deadly | Keywords: killer, deadly"
+    ]
+    metadatas = [
+        {'name': "Oni Ronin", 'cost': 1, 'is_market': False},
+        {'name': "Sandstorm Titan", 'cost': 4, 'is_market': False},
+        {'name': "Torch", 'cost': 1, 'is_market': False},
+        {'name': "Vara, Fate-Touched", 'cost': 4, 'is_market': True}
+    ]
+
+    assert tokenize("Card-draw, Fate-Touched!") == ["card-draw", "fate-touched"]
+
+    index = BM25Index(ids, documents, metadatas)
+
+    # Palavras exatas de mecânica e nome de carta
+    assert index.query(["warcry units"], n_results=2)['ids'][0][0] == "oni"
+    assert index.query(["Sandstorm Titan"], n_results=1)['ids'][0] == ["titan"]
+    print("  ✅ BM25 encontra mecânicas e nomes exatos")
+
+    # Filtros where e documentos sem termos da query não retornam
+    assert index.query(["killer"], n_results=5, where={"is_market": False})['ids'][0] == []
+    assert index.query(["killer"], n_results=5)['ids'][0] == ["vara"]
+    print("  ✅ Filtros de metadata aplicados")
+
+    # RRF: item bem colocado nas duas listas vence
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])
+    ranking = sorted(fused, key=fused.get, reverse=True)
+    assert ranking[:2] == ["b", "a"]
+    assert fused["b"] == 1 / 62 + 1 / 61
+
+    weighted = weighted_score_fusion([{"a": 0.9, "b": 0.5}, {"b": 12.0, "c": 2.0}], [1.0, 0.5])
+    assert max(weighted, key=weighted.get) == "a"
+    assert weighted["b"] == 0.5
+    print("  ✅ Fusão RRF e ponderada")
+
+    print("\n✅ Busca híbrida OK!")
+    return True
+
+if __name__ == "__main__":
+    test_hybrid_retrieval()
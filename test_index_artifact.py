@@ -0,0 +1,56 @@
+"""Teste do artefato de índice pré-construído (.npz)"""
+import os
+import tempfile
+
+import numpy as np
+
+from rag.index_artifact import IndexArtifact, read_artifact_manifest
+
+def test_index_artifact():
+    print("🧪 Testando artefato de índice...\n")
+
+    rng = np.random.default_rng(0)
+    ids = [f"1_{i}_Card_{i}" for i in range(50)]
+    artifact = IndexArtifact(
+        ids=ids,
+        embeddings=rng.normal(size=(50, 16)).astype(np.float32),
+        metadatas=[{'name': f"Card {i}", 'cost': i % 7, 'faction_fire': i % 2 == 0} for i in range(50)],
+        documents=[f"Card: Card {i} | Text: Ação {i}" for i in range(50)],
+        manifest={'embedding_model': 'all-MiniLM-L6-v2', 'embedding_format': 'abc123', 'catalog_version': 'v1'}
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.npz')
+        artifact.save(path)
+
+        manifest = read_artifact_manifest(path)
+        assert manifest['count'] == 50 and manifest['dimension'] == 16
+        assert manifest['catalog_version'] == 'v1'
+
+        loaded = IndexArtifact.load(path)
+        assert loaded.ids == ids
+        assert loaded.documents[3] == "Card: Card 3 | Text: Ação 3"
+        assert loaded.metadatas[4] == {'name': "Card 4", 'cost': 4, 'faction_fire': True}
+        assert np.array_equal(loaded.embeddings, artifact.embeddings)
+        assert os.listdir(directory) == ['index.npz']
+        print("  ✅ Ida e volta sem perdas (sem pickle)")
+
+    loaded.check_compatible('all-MiniLM-L6-v2', 'abc123')
+    for model, embedding_format in [('outro-modelo', 'abc123'), ('all-MiniLM-L6-v2', 'def456')]:
+        try:
+            loaded.check_compatible(model, embedding_format)
+            assert False, "Artefato incompatível aceito"
+        except ValueError:
+            pass
+    print("  ✅ Modelo e formato de texto conferidos")
+
+    index = loaded.to_numpy_index()
+    results = index.query(loaded.embeddings[7:8], n_results=1, where={'faction_fire': False})
+    assert results['ids'][0] == [ids[7]]
+    print("  ✅ Índice em memória direto do artefato")
+
+    print("\n✅ Artefato de índice OK!")
+    return True
+
+if __name__ == "__main__":
+    test_index_artifact()
@@ -0,0 +1,76 @@
+"""Teste do estado persistido do build do índice em segundo plano"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from rag.index_build_job import (
+    JOB_FILENAME, STALE_AFTER_SECONDS, BuildProgress, read_build_job, start_build_job
+)
+from rag.index_status import build_file_lock
+
+HOLD_LOCK = """
+import sys, time
+from rag.index_status import build_file_lock
+with build_file_lock(sys.argv[1]):
+    print('locked', flush=True)
+    time.sleep(30)
+"""
+
+def test_index_build_job():
+    print("🧪 Testando estado do build em segundo plano...\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert read_build_job(directory) == {}
+
+        progress = BuildProgress(directory)
+        progress('loading_cards', 0, 0)
+        assert read_build_job(directory)['phase'] == 'loading_cards'
+
+        progress('encoding', 0, 1000)
+        time.sleep(0.05)
+        progress('encoding', 250, 1000)
+        state = read_build_job(directory)
+        assert state['status'] == 'running' and state['done'] == 250
+        assert state['cards_per_second'] > 0 and state['eta_seconds'] > 0
+        print(f"  ✅ Fase, progresso e ETA gravados ({state['cards_per_second']:.0f} cartas/s)")
+
+        progress.finish({'embedded_cards': 1000})
+        state = read_build_job(directory)
+        assert state['status'] == 'succeeded' and state['result']['embedded_cards'] == 1000
+        print("  ✅ Build concluído com resultado")
+
+        # Processo morto: heartbeat para de ser renovado
+        path = os.path.join(directory, JOB_FILENAME)
+        with open(path) as f:
+            state = json.load(f)
+        state.update(status='running', heartbeat=time.time() - STALE_AFTER_SECONDS - 1)
+        with open(path, 'w') as f:
+            json.dump(state, f)
+        assert read_build_job(directory)['status'] == 'failed'
+        print("  ✅ Build interrompido detectado pelo heartbeat")
+
+        # Outro processo no meio de um build/troca de versão
+        holder = subprocess.Popen([sys.executable, '-c', HOLD_LOCK, directory],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            assert holder.stdout.readline().strip() == 'locked'
+            with build_file_lock(directory, blocking=False) as acquired:
+                assert not acquired
+            state = start_build_job(directory)
+            assert state['status'] == 'failed' and 'pid' in state  # Só devolve o estado; nada é iniciado
+            assert read_build_job(directory)['status'] == 'failed'
+        finally:
+            holder.kill()
+            holder.wait()
+        with build_file_lock(directory, blocking=False) as acquired:
+            assert acquired
+        print("  ✅ .build.lock entre processos: start_build_job não dispara build concorrente")
+
+    print("\n✅ Build em segundo plano OK!")
+    return True
+
+if __name__ == "__main__":
+    test_index_build_job()
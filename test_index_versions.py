@@ -0,0 +1,55 @@
+"""Teste do versionamento do índice RAG (ponteiro e rollback)"""
+import os
+import tempfile
+
+from rag.index_status import (
+    activate_version, active_collection_name, collection_versions,
+    read_collection_metadata, versioned_collection_name, write_collection_metadata
+)
+
+def entry(version):
+    return {
+        'version': version,
+        'collection_name': versioned_collection_name(version),
+        'created_at': f"2026-01-0{version}",
+        'stats': {'embedded_cards': 100 + version},
+        'embedding_model': 'all-MiniLM-L6-v2',
+        'metadata_schema': 2
+    }
+
+def test_index_versions():
+    print("🧪 Testando versões do índice RAG...\n")
+
+    # Coleção anterior ao versionamento vira a versão 0
+    legacy = {'collection_name': 'eternal_cards', 'stats': {'embedded_cards': 50}}
+    assert [v['version'] for v in collection_versions(legacy)] == [0]
+    assert active_collection_name({}) == 'eternal_cards'
+    print("  ✅ Coleção antiga reconhecida como v0")
+
+    metadata, dropped = activate_version(legacy, entry(1), keep_versions=1)
+    metadata, dropped = activate_version(metadata, entry(2), keep_versions=1)
+    assert active_collection_name(metadata) == 'eternal_cards_v2'
+    assert metadata['stats']['embedded_cards'] == 102
+    assert [v['version'] for v in metadata['versions']] == [1, 2]
+    assert [v['collection_name'] for v in dropped] == ['eternal_cards']
+    print("  ✅ Nova versão ativa, excedentes descartadas")
+
+    # Rollback mantém a versão mais nova para voltar depois
+    metadata, dropped = activate_version(metadata, entry(1), keep_versions=1)
+    assert metadata['active_version'] == 1 and not dropped
+    assert [v['version'] for v in metadata['versions']] == [1, 2]
+    print("  ✅ Rollback sem perder a versão mais nova")
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_collection_metadata(metadata, directory)
+        assert read_collection_metadata(directory)['collection_name'] == 'eternal_cards_v1'
+        write_collection_metadata(activate_version(metadata, entry(2), 1)[0], directory)
+        assert read_collection_metadata(directory)['collection_name'] == 'eternal_cards_v2'
+        assert os.listdir(directory) == ['collection_metadata.json']
+    print("  ✅ Ponteiro gravado atomicamente (sem temporários)")
+
+    print("\n✅ Versionamento do índice OK!")
+    return True
+
+if __name__ == "__main__":
+    test_index_versions()
@@ -0,0 +1,56 @@
+"""Teste do modelo de embeddings carregado sob demanda e liberado por inatividade"""
+import time
+
+import numpy as np
+
+from rag.embeddings import LazySentenceTransformerEmbedding, get_embedding_function
+
+class FakeModel:
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+class StubEmbedding(LazySentenceTransformerEmbedding):
+    """Carrega um modelo falso em vez do sentence-transformers"""
+    def _load_model(self):
+        return FakeModel()
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+def test_lazy_embeddings():
+    print("🧪 Testando carregamento preguiçoso do modelo de embeddings...\n")
+
+    embedding = StubEmbedding("stub-model", idle_timeout=0.2)
+    assert not embedding.is_loaded and embedding.load_count == 0
+
+    vectors = embedding.encode(["aggro", "control"])
+    assert vectors.shape == (2, 4)
+    assert embedding.is_loaded and embedding.load_count == 1
+    assert embedding(["midrange"]) == [[1.0, 1.0, 1.0, 1.0]]
+    assert embedding.load_count == 1
+    print("  ✅ Modelo carregado só no primeiro encode")
+
+    assert wait_until(lambda: not embedding.is_loaded)
+    assert embedding.eviction_count == 1
+    print("  ✅ Modelo liberado após idle_timeout sem uso")
+
+    embedding.encode(["combo"])
+    assert embedding.is_loaded and embedding.load_count == 2
+    assert wait_until(lambda: not embedding.is_loaded)  # Nova thread de liberação
+    print("  ✅ Recarregado sob demanda depois de liberado")
+
+    shared = get_embedding_function("test-shared-model")
+    assert get_embedding_function("test-shared-model") is shared
+    assert get_embedding_function("test-other-model") is not shared
+    assert not shared.is_loaded  # Obter a função não carrega o modelo
+    assert get_embedding_function("test-shared-model", idle_timeout=60).idle_timeout == 60
+    print("  ✅ Uma instância compartilhada por modelo")
+
+    print("\n✅ Embeddings sob demanda OK!")
+    return True
+
+if __name__ == "__main__":
+    test_lazy_embeddings()
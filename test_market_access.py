@@ -0,0 +1,83 @@
+"""Teste do índice de acesso ao mercado"""
+from data import card_catalog
+from data.models import Card
+from core.market_access import get_market_index, is_market_access_card
+from rag.metadata_filter import upgrade_metadata
+from rag.semantic_search import ScoredCard, SemanticCardSearch
+
+def test_market_access():
+    print("🧪 Testando índice de acesso ao mercado...\n")
+
+    def card(name, cost, factions, text="", card_type="Unit"):
+        return Card(name=name, cost=cost, card_type=card_type, factions=factions, text=text)
+
+    cards = [
+        card("Fire Merchant", 3, ["FIRE"], "Summon: You may swap a card in your hand with a card in your market."),
+        card("Shadow Smuggler", 2, ["SHADOW"], "Summon: Pay 1 to draw a card from your market."),
+        card("Haggle", 1, ["TIME"], "Bargain. Draw a card.", card_type="Spell"),
+        card("Crownwatch Etchings", 0, [], "Play a power from your market.", card_type="Power"),
+        card("Rival's Snoop", 2, ["SHADOW"], "Look at the enemy's hand and their market."),
+        card("Torch", 1, ["FIRE"], "Deal 2 damage to a unit.", card_type="Spell"),
+        card("Sand Warrior", 2, ["TIME"], ""),
+        card("Fire Merchant", 3, ["FIRE"], "Summon: You may swap a card in your hand with a card in your market."),
+    ]
+
+    assert is_market_access_card(cards[0]) and is_market_access_card(cards[2])
+    assert not is_market_access_card(cards[4])  # Só o mercado do oponente
+    print("  ✅ Regra única: nome (merchant/smuggler/etchings) ou texto (your market/bargain)")
+
+    index = get_market_index(cards)
+    assert len(index) == 4
+    assert index.kind(cards[0]) == 'merchant' and index.kind(cards[1]) == 'smuggler'
+    assert index.kind(cards[2]) == 'bargain' and index.kind(cards[3]) == 'access'
+    assert [c.name for c in index.access_cards()] == [
+        "Crownwatch Etchings", "Haggle", "Shadow Smuggler", "Fire Merchant"
+    ]
+    assert [c.name for c in index.access_cards(['FIRE'])] == ["Crownwatch Etchings", "Fire Merchant"]
+    assert [c.name for c in index.access_cards(['FIRE'], exclude=["Crownwatch Etchings"], limit=1)] == ["Fire Merchant"]
+    print("  ✅ Cartas de acesso por facção, mais baratas primeiro")
+
+    assert set(index.market_eligible(['FIRE'])) == {"Torch"}
+    assert set(index.market_eligible()) == {"Torch", "Sand Warrior", "Rival's Snoop"}
+    assert get_market_index(list(cards)) is index
+    print("  ✅ Elegíveis para o mercado e cache por versão do catálogo")
+
+    # Catálogo completo e lista jogável ficam ambos em cache, sem re-hash
+    calls = []
+    original = card_catalog.catalog_version
+    card_catalog.catalog_version = lambda c: calls.append(1) or original(c)
+    try:
+        playable = cards[:6]
+        playable_index = get_market_index(playable)
+        computed = len(calls)
+        assert get_market_index(cards) is index
+        assert get_market_index(playable) is playable_index
+        assert len(calls) == computed
+    finally:
+        card_catalog.catalog_version = original
+    print("  ✅ Uma versão por catálogo, sem recalcular a cada chamada")
+
+    # Busca só injeta cartas de acesso construíveis
+    etchings = card("Crownwatch Etchings", 0, [], "Play a power from your market.", card_type="Power")
+    etchings.deck_buildable = False
+    searcher = object.__new__(SemanticCardSearch)
+    searcher.market_index = get_market_index([etchings] + cards[1:7])
+    injected = searcher._ensure_market_cards([ScoredCard(cards[5], 0.9, 'semantic')], None)
+    names = [scored.card.name for scored in injected]
+    assert "Crownwatch Etchings" not in names
+    assert "Haggle" in names and "Shadow Smuggler" in names
+    print("  ✅ Cartas de acesso não construíveis não são injetadas")
+
+    upgraded = upgrade_metadata(
+        {'name': "Shadow Smuggler", 'factions': "SHADOW", 'is_market': False},
+        "Card: Shadow Smuggler | Text: Summon: Pay 1 to draw a card from your market."
+    )
+    assert upgraded['is_market'] and upgraded['faction_shadow']
+    assert upgrade_metadata({'name': "Torch", 'factions': "FIRE", 'is_market': True})['is_market']
+    print("  ✅ is_market do índice recalculado com a mesma regra")
+
+    print("\n✅ Índice de mercado OK!")
+    return True
+
+if __name__ == "__main__":
+    test_market_access()
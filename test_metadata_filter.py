@@ -0,0 +1,74 @@
+"""Teste dos filtros where com booleanos por facção"""
+import numpy as np
+
+from rag.metadata_filter import (
+    TYPE_FILTERS, MetadataFilter, build_where_clause, combine_where, faction_flags, upgrade_metadata
+)
+from rag.numpy_index import NumpyVectorIndex
+
+def test_metadata_filter():
+    print("🧪 Testando filtros de metadata por facção...\n")
+
+    flags = faction_flags(["FIRE", "TIME"])
+    assert flags['faction_fire'] and flags['faction_time'] and not flags['faction_shadow']
+    assert not flags['is_neutral']
+    assert faction_flags([])['is_neutral']
+    assert upgrade_metadata({'name': "Torch", 'factions': "FIRE"})['faction_fire']
+    print("  ✅ Booleanos por facção")
+
+    where = build_where_clause(["FIRE", "JUSTICE"], include_market=False, cost_range=(1, 3))
+    assert where == {'$and': [
+        {'$or': [{'faction_fire': True}, {'faction_justice': True}, {'is_neutral': True}]},
+        {'is_market': False},
+        {'cost': {'$gte': 1}},
+        {'cost': {'$lte': 3}}
+    ]}
+    assert build_where_clause(include_market=True) is None
+    assert build_where_clause(["FIRE"], include_neutral=False, include_market=True) == {'faction_fire': True}
+    print("  ✅ Cláusulas $and/$or com um operador cada")
+
+    metadatas = [
+        dict(name="Torch", cost=1, is_market=False, **faction_flags(["FIRE"])),
+        dict(name="Trail Stories", cost=2, is_market=False, **faction_flags([])),
+        dict(name="Vara", cost=4, is_market=False, **faction_flags(["TIME", "SHADOW"])),
+        dict(name="Merchant", cost=2, is_market=True, **faction_flags(["FIRE"])),
+    ]
+    mask = MetadataFilter(metadatas).mask(build_where_clause(["FIRE"], cost_range=(0, 3)))
+    assert [m['name'] for m, keep in zip(metadatas, mask) if keep] == ["Torch", "Trail Stories"]
+    print("  ✅ Neutras incluídas, mercado e custo filtrados")
+
+    # Cotas por tipo: uma query filtrada por categoria, sem sobreposição
+    types = ["Unit", "Fast Spell", "Weapon", "Relic", "Relic Weapon", "Power", "Unit"]
+    type_metadatas = [
+        dict(name=f"Card {i}", is_market=False, is_unit=t == "Unit", is_spell='Spell' in t,
+             is_weapon='Weapon' in t, is_relic='Relic' in t, is_power=t == "Power",
+             **faction_flags(["FIRE"] if i % 2 else []))
+        for i, t in enumerate(types)
+    ]
+    base = build_where_clause(["FIRE"])
+    assert combine_where(base, TYPE_FILTERS['relics']) == {'$and': [
+        {'$or': [{'faction_fire': True}, {'is_neutral': True}]},
+        {'is_market': False},
+        {'is_relic': True},
+        {'is_weapon': False}
+    ]}
+    assert combine_where(None, TYPE_FILTERS['units']) == {'is_unit': True}
+
+    rng = np.random.default_rng(0)
+    index = NumpyVectorIndex([f"id{i}" for i in range(len(types))],
+                             rng.normal(size=(len(types), 8)).astype(np.float32),
+                             type_metadatas, [""] * len(types))
+    query = rng.normal(size=(1, 8)).astype(np.float32)
+    per_type = {
+        category: index.query(query, n_results=10, where=combine_where(base, where))['ids'][0]
+        for category, where in TYPE_FILTERS.items()
+    }
+    assert sorted(sum(per_type.values(), [])) == sorted(index.query(query, n_results=10, where=base)['ids'][0])
+    assert "id4" in per_type['weapons'] and "id4" not in per_type['relics']
+    print("  ✅ Filtros por tipo: partição sem sobreposição (relic weapon = weapon)")
+
+    print("\n✅ Filtros de metadata OK!")
+    return True
+
+if __name__ == "__main__":
+    test_metadata_filter()
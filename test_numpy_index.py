@@ -0,0 +1,81 @@
+"""Teste do índice vetorial NumPy (busca exata com filtros)"""
+import tempfile
+
+import numpy as np
+
+from rag.numpy_index import NumpyVectorIndex
+
+def test_numpy_index():
+    print("🧪 Testando índice vetorial NumPy...\n")
+
+    rng = np.random.default_rng(42)
+    embeddings = rng.normal(size=(200, 16)).astype(np.float32)
+    ids = [f"card_{i}" for i in range(200)]
+    metadatas = [
+        {'name': f"Card {i}", 'cost': i % 8, 'factions': 'FIRE' if i % 2 else 'TIME', 'is_market': i % 10 == 0}
+        for i in range(200)
+    ]
+
+    index = NumpyVectorIndex(ids, embeddings, metadatas)
+    query = embeddings[7] + rng.normal(scale=0.01, size=16)
+
+    # Sem filtro: a própria carta é o vizinho mais próximo
+    results = index.query(query, n_results=5)
+    assert results['ids'][0][0] == "card_7"
+    assert results['distances'][0] == sorted(results['distances'][0])
+
+    # Top-k idêntico à ordenação completa
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+    assert index.query(query, n_results=10)['ids'][0] == [ids[i] for i in expected]
+    print("  ✅ Top-k exato")
+
+    # Filtros estilo ChromaDB
+    where = {"$and": [{"is_market": False}, {"cost": {"$gte": 2, "$lte": 4}},
+                      {"$or": [{"factions": {"$contains": "FIRE"}}]}]}
+    filtered = index.query(query, n_results=50, where=where)
+    for metadata in filtered['metadatas'][0]:
+        assert not metadata['is_market'] and 2 <= metadata['cost'] <= 4 and metadata['factions'] == 'FIRE'
+    assert "card_7" not in filtered['ids'][0]
+    print(f"  ✅ Filtro retornou {len(filtered['ids'][0])} cartas")
+
+    # Persistência com memory-map e float16
+    with tempfile.TemporaryDirectory() as directory:
+        NumpyVectorIndex(ids, embeddings, metadatas, dtype='float16').save(directory)
+        loaded = NumpyVectorIndex.load(directory, mmap=True)
+        assert isinstance(loaded.embeddings, np.memmap)
+        assert loaded.embeddings.dtype == np.float16
+        assert loaded.query(query, n_results=1)['ids'][0] == ["card_7"]
+    print("  ✅ Save/load (float16, mmap)")
+
+    # float16 (pontuado em float32) devolve os mesmos resultados do float32
+    half = index.astype('float16')
+    queries = np.stack([query, embeddings[3], rng.normal(size=16)])
+    for where_filter in (None, where):
+        full_results = index.query(queries, n_results=10, where=where_filter)
+        half_results = half.query(queries, n_results=10, where=where_filter)
+        assert half_results['ids'] == full_results['ids']
+        assert np.allclose(half_results['distances'], full_results['distances'], atol=1e-3)
+    assert half._scores(queries.astype(np.float32)).dtype == np.float32
+    print("  ✅ float16 igual ao float32 (com e sem filtro)")
+
+    # Quantização int8 por vetor: ~4x menor e mesmo vizinho mais próximo
+    quantized = index.astype('int8')
+    assert quantized.embeddings.dtype == np.int8
+    assert quantized.nbytes < index.nbytes / 3
+    assert np.abs(quantized.dequantized() - normalized).max() < 0.02
+    for scoring in ('dequantize', 'int8'):
+        assert index.astype('int8', int8_scoring=scoring).query(query, n_results=1)['ids'][0] == ["card_7"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        quantized.save(directory)
+        loaded = NumpyVectorIndex.load(directory)
+        assert loaded.dtype == 'int8'
+        assert loaded.query(query, n_results=5)['ids'] == quantized.query(query, n_results=5)['ids']
+    print("  ✅ Armazenamento int8")
+
+    print("\n✅ Índice NumPy OK!")
+    return True
+
+if __name__ == "__main__":
+    test_numpy_index()
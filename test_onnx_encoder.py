@@ -0,0 +1,109 @@
+"""Teste do encoder ONNX (pooling, tolerância, encode com sessão falsa e fallback)"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from rag.onnx_encoder import (
+    ONNX_MIN_COSINE, OnnxQueryEncoder, cosine_agreement, get_query_encoder, mean_pool, query_encoder_key
+)
+from rag.query_cache import QueryEmbeddingCache
+
+DIMENSION = 384
+
+def token_vectors(ids: np.ndarray) -> np.ndarray:
+    """Vetor determinístico por token (o mesmo na sessão falsa e na referência)"""
+    vectors = [np.random.default_rng(int(token)).normal(size=DIMENSION) for token in ids.ravel()]
+    return np.array(vectors, dtype=np.float32).reshape(ids.shape + (DIMENSION,))
+
+class FakeTokenizer:
+    """Tokenizer falso: um id por palavra, padding com 0 até a maior do lote"""
+    def encode_batch(self, texts):
+        tokens = [[sum(map(ord, word)) for word in text.split()] for text in texts]
+        width = max(len(ids) for ids in tokens)
+        return [
+            SimpleNamespace(ids=ids + [0] * (width - len(ids)),
+                            attention_mask=[1] * len(ids) + [0] * (width - len(ids)),
+                            type_ids=[0] * width)
+            for ids in tokens
+        ]
+
+class FakeSession:
+    """Sessão ONNX falsa: last_hidden_state a partir dos input_ids"""
+    def __init__(self):
+        self.batches = []
+
+    def run(self, output_names, feed):
+        self.batches.append(len(feed['input_ids']))
+        return [token_vectors(feed['input_ids'])]
+
+class FakeEmbeddingFunction:
+    """Encoder de referência (sentence-transformers): média dos tokens, normalizada"""
+    model_name = 'modelo-sem-export-onnx'
+
+    def encode(self, texts):
+        rows = []
+        for text in texts:
+            ids = np.array([[sum(map(ord, word)) for word in text.split()]])
+            rows.append(mean_pool(token_vectors(ids), np.ones_like(ids))[0])
+        return np.array(rows, dtype=np.float32)
+
+def test_onnx_encoder():
+    print("🧪 Testando encoder ONNX...\n")
+
+    # Padding não entra na média
+    hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    assert np.allclose(mean_pool(hidden, mask, normalize=False), [[2.0, 0.0]])
+    assert np.allclose(mean_pool(hidden, mask), [[1.0, 0.0]])
+    print("  ✅ Mean pooling com máscara + normalização")
+
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(8, 384)).astype(np.float32)
+    close = reference + rng.normal(scale=0.01, size=reference.shape).astype(np.float32)
+    assert cosine_agreement(reference, close)['min_cosine'] >= ONNX_MIN_COSINE
+    assert cosine_agreement(reference, rng.normal(size=(8, 384)))['min_cosine'] < ONNX_MIN_COSINE
+    print("  ✅ Checagem de tolerância por cosseno")
+
+    # encode com sessão e tokenizer falsos: lotes, padding e normalização
+    encoder = OnnxQueryEncoder('modelo-sem-export-onnx')
+    session = FakeSession()
+    encoder._session, encoder._tokenizer = session, FakeTokenizer()
+    encoder._input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+    encoder._config = {'normalize': True, 'dimension': DIMENSION}
+    texts = ["aggro fire", "control deck with removal", "ramp", "flying units with aegis", "void"]
+    reference = FakeEmbeddingFunction().encode(texts)
+    encoded = encoder.encode(texts, batch_size=2)
+    assert session.batches == [2, 2, 1]
+    assert encoded.shape == reference.shape and encoded.dtype == np.float32
+    assert np.allclose(np.linalg.norm(encoded, axis=1), 1.0, atol=1e-5)
+    assert cosine_agreement(reference, encoded)['min_cosine'] >= ONNX_MIN_COSINE
+    assert encoder.encode([]).shape == (0, DIMENSION)
+    print("  ✅ encode: mesma forma da referência, vetores normalizados")
+
+    # Sem export ONNX para o modelo (ou sem onnxruntime): continua no sentence-transformers
+    fallback = FakeEmbeddingFunction()
+    assert get_query_encoder(fallback, 'sentence-transformers') is fallback
+    assert get_query_encoder(fallback, 'onnx') is fallback
+    try:
+        get_query_encoder(fallback, 'tensorrt')
+        assert False, "Backend inválido aceito"
+    except ValueError:
+        pass
+    print("  ✅ Seleção do backend e fallback")
+
+    # Cache de queries separado por encoder: trocar backend/variante não serve vetores antigos
+    keys = {query_encoder_key(fallback), query_encoder_key(encoder),
+            query_encoder_key(OnnxQueryEncoder('modelo-sem-export-onnx', quantized=True))}
+    assert len(keys) == 3
+    cache = QueryEmbeddingCache()
+    cache.get("aggro fire", fallback.encode, query_encoder_key(fallback))
+    onnx_vector = cache.get("aggro fire", lambda batch: -fallback.encode(batch), query_encoder_key(encoder))
+    assert np.allclose(onnx_vector, -reference[0])
+    assert cache.stats()['misses'] == 2
+    print("  ✅ Chave do cache de queries inclui o encoder")
+
+    print("\n✅ Encoder ONNX OK!")
+    return True
+
+if __name__ == "__main__":
+    test_onnx_encoder()
@@ -0,0 +1,58 @@
+"""Teste do cache LRU de embeddings de queries"""
+import numpy as np
+
+from rag.query_cache import QueryEmbeddingCache, normalize_query
+
+class CountingEncoder:
+    """Encoder falso que registra cada lote recebido"""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), sum(map(ord, text)) % 89] for text in texts], dtype=np.float32)
+
+def test_query_cache():
+    print("🧪 Testando cache de queries...\n")
+
+    assert normalize_query("  Aggro   FIRE\tunits\n") == "aggro fire units"
+    encoder = CountingEncoder()
+    cache = QueryEmbeddingCache(max_size=2)
+
+    first = cache.get("Aggro FIRE units", encoder)
+    again = cache.get("  aggro   fire UNITS ", encoder)
+    assert len(encoder.calls) == 1 and np.array_equal(first, again)
+    assert encoder.calls[0] == ["aggro fire units"]
+    print("  ✅ Maiúsculas e espaços normalizados na chave")
+
+    cache.get("control", encoder)
+    cache.get("aggro fire units", encoder)  # Vira a mais recente
+    cache.get("ramp", encoder)              # Expulsa "control"
+    assert cache.stats()['size'] == 2
+    calls = len(encoder.calls)
+    cache.get("aggro fire units", encoder)
+    assert len(encoder.calls) == calls
+    cache.get("control", encoder)
+    assert encoder.calls[-1] == ["control"]
+    print("  ✅ LRU expulsa a menos usada ao passar de max_size")
+
+    encoder = CountingEncoder()
+    cache = QueryEmbeddingCache(max_size=10)
+    cache.get_many(["a", "b"], encoder)
+    matrix = cache.get_many(["B", "c", "a", "c", "d"], encoder)
+    assert encoder.calls == [["a", "b"], ["c", "d"]]
+    assert matrix.shape == (5, 2)
+    assert np.array_equal(matrix, encoder(["b", "c", "a", "c", "d"]))
+    print("  ✅ get_many codifica só as ausentes (sem repetir duplicadas) e mantém a ordem")
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (3, 4)
+    assert abs(stats['hit_rate'] - 3 / 7) < 1e-9
+    assert QueryEmbeddingCache().stats()['hit_rate'] == 0.0
+    print(f"  ✅ stats(): hit rate {stats['hit_rate']:.0%}")
+
+    print("\n✅ Cache de queries OK!")
+    return True
+
+if __name__ == "__main__":
+    test_query_cache()
@@ -0,0 +1,76 @@
+"""Teste dos priors vetoriais da query (centróides de facção e arquétipo)"""
+import os
+import tempfile
+
+import numpy as np
+
+from rag.metadata_filter import faction_flags
+from rag.numpy_index import NumpyVectorIndex
+from rag.query_priors import QueryPriors, detect_archetype
+
+def test_query_priors():
+    print("🧪 Testando priors vetoriais da query...\n")
+
+    assert detect_archetype("Deck agressivo com dano direto") == 'aggro'
+    assert detect_archetype("Controle com muita remoção") == 'control'
+    assert detect_archetype("Combo com sinergias de void") == 'combo'
+    assert detect_archetype("Ramp para criaturas grandes") is None
+    assert detect_archetype("Deck lento de controle") == 'control'
+    assert detect_archetype("Fast aggressive deck") == 'aggro'
+    assert detect_archetype("Motor de sinergia com void") == 'combo'
+    assert detect_archetype("Unidades equilibradas com bom valor") == 'midrange'
+    print("  ✅ Arquétipo detectado em inglês e português")
+
+    # Gatilhos casam palavras inteiras, não trechos de outras palavras
+    assert detect_archetype("Silent assassins with stealth and infiltrate") != 'control'
+    assert detect_archetype("Deck de unidades com talento para voar") != 'control'
+    assert detect_archetype("Tempo deck with excellent units") != 'control'
+    assert detect_archetype("Shadow deck with fast spells") is None
+    assert detect_archetype("Fast spell tricks in Primal") is None
+    assert detect_archetype("Promotor de unidades voadoras") is None
+    assert detect_archetype("Unidades que valorizam o ataque") is None
+    print("  ✅ Sem falso positivo (silent, talento, excellent, fast spells, promotor, valorizam)")
+
+    rng = np.random.default_rng(3)
+    shared = rng.normal(size=32) * 3  # Direção comum a todas as cartas (anisotropia)
+    fire, shadow = rng.normal(size=(2, 32))
+    factions = [['FIRE'] if i % 2 else ['SHADOW'] for i in range(120)]
+    embeddings = np.vstack([
+        shared + (fire if f == ['FIRE'] else shadow) + rng.normal(scale=0.5, size=32)
+        for f in factions
+    ]).astype(np.float32)
+    documents = [f"Card: Card {i} | Text: {'Charge. Warcry' if i % 3 == 0 else 'Draw a card'}" for i in range(120)]
+    metadatas = [dict(name=f"Card {i}", **faction_flags(f)) for i, f in enumerate(factions)]
+
+    priors = QueryPriors.build(embeddings, documents, metadatas)
+    assert set(priors.factions) == {'FIRE', 'SHADOW'} and set(priors.archetypes) == {'aggro'}
+    assert priors.counts['faction:FIRE'] == 60 and priors.counts['archetype:aggro'] == 40
+    assert float(priors.factions['FIRE'] @ priors.factions['SHADOW']) < 0
+    print("  ✅ Centróides centralizados (facções vazias ficam de fora)")
+
+    index = NumpyVectorIndex([f"card_{i}" for i in range(120)], embeddings, metadatas, documents)
+    query = shared + rng.normal(size=32)
+
+    def fire_share(vector):
+        top = index.query(vector, n_results=20)['metadatas'][0]
+        return sum(m['faction_fire'] for m in top) / len(top)
+
+    with_prior = priors.apply(query, "aggro", ['FIRE'], faction_weight=0.5)
+    assert np.isclose(np.linalg.norm(with_prior), 1.0)
+    assert fire_share(with_prior) > fire_share(query)
+    assert np.allclose(priors.apply(query, "ramp"), query / np.linalg.norm(query), atol=1e-6)
+    print("  ✅ Soma ponderada puxa a busca para a facção escolhida")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "priors.npz")
+        priors.save(path)
+        loaded = QueryPriors.load(path)
+    assert np.allclose(loaded.apply(query, "aggro", ['FIRE']), priors.apply(query, "aggro", ['FIRE']))
+    assert loaded.counts == priors.counts
+    print("  ✅ Salvar/carregar preserva os centróides")
+
+    print("\n✅ Priors da query OK!")
+    return True
+
+if __name__ == "__main__":
+    test_query_priors()
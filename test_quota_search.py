@@ -0,0 +1,73 @@
+"""Teste da busca com cotas por tipo (obrigatórias e mercado não tiram recuperadas)"""
+import numpy as np
+
+from core.market_access import get_market_index
+from data.models import Card
+from rag.overfetch import OverfetchTracker
+from rag.semantic_search import SemanticCardSearch
+
+class TypedManager:
+    """Manager falso: ranking fixo por categoria, como as queries filtradas por tipo"""
+    def __init__(self, cards_by_type):
+        vectors = np.random.default_rng(3).normal(size=(100, 8)).astype(np.float32)
+        self.results = {
+            category: [
+                {'id': f"{category}_{i}", 'name': card.name, 'similarity_score': 1 - i / 100,
+                 'embedding': vectors[i]}
+                for i, card in enumerate(cards)
+            ]
+            for category, cards in cards_by_type.items()
+        }
+
+    def search_similar_cards_by_type(self, strategy_text, n_results_by_type, **kwargs):
+        return {
+            category: [dict(result) for result in self.results[category][:n_results]]
+            for category, n_results in n_results_by_type.items()
+        }
+
+class CatalogClient:
+    """Cliente falso: busca por nome no catálogo em memória"""
+    def search_cards(self, cards, name_query=None):
+        return [card for card in cards if name_query.lower() in card.name.lower()]
+
+def test_quota_search():
+    print("🧪 Testando busca com cotas por tipo...\n")
+
+    units = [Card(name=f"Unit {i}", card_type="Unit", factions=["FIRE"]) for i in range(10)]
+    powers = [Card(name=f"Sigil {i}", card_type="Power", factions=["FIRE"]) for i in range(10)]
+    merchant = Card(name="Fire Merchant", card_type="Unit", factions=["FIRE"],
+                    text="Summon: You may swap a card in your hand with a card in your market.")
+    required = Card(name="Seat of Glory", card_type="Power", factions=["FIRE"])
+
+    searcher = object.__new__(SemanticCardSearch)
+    searcher.search_mode = 'vector'
+    searcher.query_priors = 'text'
+    searcher.chromadb_manager = TypedManager({'units': units, 'powers': powers})
+    searcher.sheets_client = CatalogClient()
+    searcher._overfetch = OverfetchTracker()
+    searcher._all_cards = units + powers + [merchant, required]
+    searcher._cards_cache = {card.name: card for card in searcher._all_cards}
+    searcher.market_index = get_market_index(searcher._all_cards)
+
+    quotas = {'units': 5, 'powers': 3}
+    by_type = searcher.search_scored_cards_by_type(
+        "aggro", use_market=True, required_cards=["Seat of Glory"], quotas=quotas
+    )
+    unit_names = [scored.card.name for scored in by_type['units']]
+    power_names = [scored.card.name for scored in by_type['powers']]
+
+    assert "Fire Merchant" in unit_names and "Seat of Glory" in power_names
+    assert [name for name in unit_names if name != "Fire Merchant"] == [f"Unit {i}" for i in range(5)]
+    assert [name for name in power_names if name != "Seat of Glory"] == [f"Sigil {i}" for i in range(3)]
+    assert len(unit_names) == quotas['units'] + 1 and len(power_names) == quotas['powers'] + 1
+    print(f"  ✅ Cota cheia de recuperadas + injetadas: {unit_names}, {power_names}")
+
+    plain = searcher.search_scored_cards_by_type("aggro", quotas=quotas)
+    assert [len(plain[category]) for category in quotas] == [5, 3]
+    print("  ✅ Sem injeções, exatamente a cota de cada tipo")
+
+    print("\n✅ Busca com cotas OK!")
+    return True
+
+if __name__ == "__main__":
+    test_quota_search()
@@ -1,6 +1,7 @@
 # test_rag_comparison.py
 """
 Script de teste para comparar busca tradicional vs RAG
+(versão headless com recall/nDCG e percentis: python -m rag.benchmark_retrieval)
 """
 
 import streamlit as st
@@ -12,35 +13,22 @@ import pandas as pd
 from data.google_sheets_client import GoogleSheetsClient
 from rag.semantic_search import create_semantic_search
 from rag.chromadb_setup import ChromaDBManager
+from rag.benchmark_retrieval import keyword_search
 
 
 def test_traditional_search(strategy: str, factions: List[str], limit: int = 50) -> Dict:
     """Testa busca tradicional por keywords"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     client = GoogleSheetsClient()
     
     # Extrair keywords da estratégia
     keywords = strategy.lower().split()
     
-    # Buscar por keywords
-    results = []
-    for keyword in keywords[:5]:  # Limitar keywords
-        cards = client.search_cards(
-            card_text=keyword,
-            factions=factions,
-            limit=20
-        )
-        results.extend(cards)
-    
-    # Remover duplicatas
-    unique_cards = {}
-    for card in results:
-        unique_cards[card.name] = card
+    # Buscar por keywords no catálogo em memória
+    final_results = keyword_search(client, client.get_all_cards(), strategy, factions, limit=limit)
     
-    final_results = list(unique_cards.values())[:limit]
-    
-    end_time = time.time()
+    end_time = time.perf_counter()
     
     return {
         'method': 'Traditional Keyword Search',
@@ -53,7 +41,7 @@ def test_traditional_search(strategy: str, factions: List[str], limit: int = 50)
 
 def test_rag_search(strategy: str, factions: List[str], limit: int = 50) -> Dict:
     """Testa busca com RAG"""
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         searcher = create_semantic_search()
@@ -70,17 +58,18 @@ def test_rag_search(strategy: str, factions: List[str], limit: int = 50) -> Dict
             }
         
         # Buscar semanticamente
-        results = searcher.search_cards_for_strategy(
-            strategy=strategy,
+        results = searcher.search_scored_cards_for_strategy(
+            strategy,
             allowed_factions=factions,
             max_results=limit
         )
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         return {
             'method': 'RAG Semantic Search',
-            'cards': results,
+            'cards': [scored.card for scored in results],
+            'scores': [scored.score for scored in results],
             'count': len(results),
             'time': end_time - start_time,
             'details': f"Embeddings searched: {stats['total_embeddings']}"
@@ -135,11 +124,16 @@ def main():
             else:
                 st.warning("⚠️ ChromaDB não inicializado")
                 
-                if st.button("🚀 Inicializar ChromaDB"):
-                    with st.spinner("Criando embeddings..."):
-                        stats = manager.setup_card_embeddings()
-                        st.success(f"✅ {stats['embedded_cards']} cartas indexadas!")
-                        st.experimental_rerun()
+                from rag.index_build_job import format_build_job, read_build_job, start_build_job
+                
+                build_job = read_build_job()
+                if build_job.get('status') == 'running':
+                    st.info(f"⏳ {format_build_job(build_job)}")
+                    if st.button("🔄 Atualizar status"):
+                        st.rerun()
+                elif st.button("🚀 Inicializar ChromaDB"):
+                    start_build_job(force_recreate=True)
+                    st.rerun()
         except:
             st.error("❌ Erro ao verificar ChromaDB")
     
@@ -252,9 +246,8 @@ def main():
             else:
                 st.caption(rag_results.get('details', ''))
                 
-                for i, card in enumerate(rag_results['cards'][:20]):
+                for i, (card, score) in enumerate(zip(rag_results['cards'][:20], rag_results['scores'])):
                     influence = card.influence_string or ""
-                    score = getattr(card, 'semantic_score', 0)
                     
                     if card.is_unit:
                         st.write(f"{i+1}. **{card.name}** - {card.cost}{influence} - {card.attack}/{card.health} (Score: {score:.2f})")
@@ -290,7 +283,7 @@ def main():
                 st.markdown("#### 🆕 Cartas únicas encontradas pelo RAG:")
                 rag_unique = [c for c in rag_results['cards'] if c.name in only_rag][:5]
                 for card in rag_unique:
-                    st.write(f"- **{card.name}**: {card.card_text[:100]}...")
+                    st.write(f"- **{card.name}**: {card.text[:100]}...")
 
 
 if __name__ == "__main__":
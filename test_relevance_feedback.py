@@ -0,0 +1,54 @@
+"""Teste do refinamento Rocchio da query no espaço vetorial"""
+import time
+
+import numpy as np
+
+from rag.numpy_index import NumpyVectorIndex
+from rag.relevance_feedback import rocchio_update
+
+def test_relevance_feedback():
+    print("🧪 Testando relevance feedback (Rocchio)...\n")
+
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(2, 32))
+    embeddings = np.vstack([
+        centers[i % 2] + rng.normal(scale=0.3, size=32) for i in range(100)
+    ]).astype(np.float32)
+    ids = [f"card_{i}" for i in range(100)]
+    metadatas = [{'name': f"Card {i}", 'cost': i % 8} for i in range(100)]
+    index = NumpyVectorIndex(ids, embeddings, metadatas)
+
+    query = (centers[0] + centers[1]).astype(np.float32)
+    refined = rocchio_update(query)
+    assert np.isclose(np.linalg.norm(refined), 1.0)
+    assert np.allclose(refined, query / np.linalg.norm(query), atol=1e-6)
+    print("  ✅ Sem feedback a query só é normalizada")
+
+    liked = index.get_embeddings(["card_1", "card_3"])
+    disliked = index.get_embeddings(["card_0"])
+    refined = rocchio_update(query, liked, disliked)
+
+    def odd_share(vector):
+        top = index.query(vector, n_results=20)['ids'][0]
+        return sum(int(card.split('_')[1]) % 2 for card in top) / len(top)
+
+    assert odd_share(refined) > odd_share(query)
+    assert odd_share(refined) == 1.0
+    print("  ✅ Query anda na direção das curtidas e se afasta das descartadas")
+
+    stronger = rocchio_update(query, liked, disliked, beta=2.0)
+    center = centers[1] / np.linalg.norm(centers[1])
+    assert float(stronger @ center) > float(refined @ center)
+    print("  ✅ Pesos alpha/beta/gamma controlam o deslocamento")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        index.query(rocchio_update(query, liked, disliked), n_results=20, where={'cost': {'$lte': 4}})
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+    print(f"  ⏱️ Re-busca sem re-codificar texto: {elapsed_ms:.2f}ms por rodada")
+
+    print("\n✅ Relevance feedback OK!")
+    return True
+
+if __name__ == "__main__":
+    test_relevance_feedback()
@@ -0,0 +1,57 @@
+"""Teste das métricas e da medição do benchmark headless de busca"""
+from types import SimpleNamespace
+
+from rag.benchmark_retrieval import (
+    benchmark_mode, compare_reports, mode_overlap, ndcg_at_k, recall_at_k
+)
+
+def test_retrieval_benchmark():
+    print("🧪 Testando benchmark de busca...\n")
+
+    relevant = ["Torch", "Oni Ronin"]
+    assert recall_at_k(["torch", "Sand Warrior", "Oni Ronin"], relevant, k=3) == 1.0
+    assert recall_at_k(["torch", "Sand Warrior", "Oni Ronin"], relevant, k=2) == 0.5
+    assert ndcg_at_k(["Torch", "Oni Ronin", "Sand Warrior"], relevant, k=3) == 1.0
+    assert 0 < ndcg_at_k(["Sand Warrior", "Torch", "Oni Ronin"], relevant, k=3) < 1.0
+    assert recall_at_k(["Torch"], [], k=5) == 0.0
+    print("  ✅ recall@k e nDCG@k (sem caixa, relevância binária)")
+
+    strategies = [
+        {'id': 'aggro', 'strategy': "aggro", 'factions': ['FIRE']},
+        {'id': 'control', 'strategy': "control", 'factions': ['SHADOW']},
+    ]
+    catalog = {
+        'aggro': ["Torch", "Oni Ronin", "Sand Warrior"],
+        'control': ["Annihilate", "Vara's Favor"],
+    }
+    calls = []
+
+    def search(item):
+        calls.append(item['id'])
+        return [SimpleNamespace(name=name) for name in catalog[item['id']]]
+
+    row = benchmark_mode(search, strategies, {'aggro': relevant}, k=2, repeats=3)
+    assert len(calls) == 2 + 3 * 2 + 2  # fria, quente, memória
+    assert row['results']['aggro'] == catalog['aggro']
+    assert row['warm']['p50_ms'] <= row['warm']['p99_ms']
+    assert row['quality']['labelled_strategies'] == 1 and row['quality']['recall@2'] == 1.0
+    assert row['peak_alloc_mb'] >= 0
+    print("  ✅ Latência fria/quente, memória e qualidade por modo")
+
+    report = {'modes': {
+        'vector': row,
+        'traditional': {'results': {'aggro': ["Torch"], 'control': []}},
+    }}
+    overlap = mode_overlap(report, 'vector', k=2)
+    assert overlap['vector'] == 1.0 and overlap['traditional'] == 0.25
+
+    baseline = {'modes': {'vector': {**row, 'quality': {**row['quality'], 'recall@2': 0.5}}}}
+    deltas = compare_reports(baseline, {'modes': {'vector': row}})
+    assert deltas['vector']['recall@2'] == 0.5 and deltas['vector']['warm_p50_ms'] == 0.0
+    print("  ✅ Sobreposição entre modos e comparação entre execuções")
+
+    print("\n✅ Benchmark de busca OK!")
+    return True
+
+if __name__ == "__main__":
+    test_retrieval_benchmark()
@@ -0,0 +1,115 @@
+"""Teste do searcher compartilhado e do status barato do índice RAG"""
+import json
+import os
+import tempfile
+import threading
+
+from data.models import Card
+from rag.index_status import METADATA_FILENAME, get_rag_status, read_collection_metadata
+from rag import semantic_search
+
+class VersionedManager:
+    """Manager falso: só o ponteiro da versão ativa"""
+    def __init__(self):
+        self.collection_name = 'eternal_cards_v1'
+
+class CatalogSheets:
+    """Planilha falsa que devolve o catálogo atual (e conta as leituras)"""
+    def __init__(self, cards):
+        self.cards = cards
+        self.reads = 0
+
+    def get_all_cards(self):
+        self.reads += 1
+        return list(self.cards)
+
+def test_shared_search():
+    print("🧪 Testando searcher compartilhado e status do RAG...\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert get_rag_status(directory)['chromadb_status'] == 'not_initialized'
+
+        path = os.path.join(directory, METADATA_FILENAME)
+        with open(path, 'w') as f:
+            json.dump({'collection_name': 'eternal_cards_v1', 'stats': {'embedded_cards': 10}}, f)
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+        status = get_rag_status(directory)
+        assert status['chromadb_status'] == 'ready' and status['total_embeddings'] == 10
+        assert read_collection_metadata(directory) is status['metadata']  # Cache por mtime
+
+        with open(path, 'w') as f:
+            json.dump({'collection_name': 'eternal_cards_v2', 'stats': {'embedded_cards': 25}}, f)
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+        status = get_rag_status(directory)
+        assert status['total_embeddings'] == 25
+        assert status['metadata']['collection_name'] == 'eternal_cards_v2'
+    print("  ✅ Status lido do metadata e recarregado quando o arquivo muda")
+
+    created = []
+
+    class FakeSearch:
+        def __init__(self):
+            created.append(self)
+
+        def refresh_catalog_if_index_changed(self):
+            return False
+
+    original = semantic_search.SemanticCardSearch
+    semantic_search.SemanticCardSearch = FakeSearch
+    try:
+        semantic_search.reset_shared_semantic_search()
+        assert not semantic_search.is_shared_semantic_search_loaded()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(semantic_search.get_shared_semantic_search()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1 and all(result is created[0] for result in results)
+        assert semantic_search.create_semantic_search() is created[0]
+        assert semantic_search.is_shared_semantic_search_loaded()
+        print("  ✅ Uma única instância por processo (mesmo com threads concorrentes)")
+
+        semantic_search.reset_shared_semantic_search()
+        assert semantic_search.get_shared_semantic_search() is created[1]
+        print("  ✅ reset_shared_semantic_search() cria uma nova instância")
+    finally:
+        semantic_search.SemanticCardSearch = original
+        semantic_search.reset_shared_semantic_search()
+
+    # Build em outro processo/sessão: catálogo acompanha a nova versão do índice
+    old_card = Card(name="Old Card", card_type="Unit", set_number="1", eternal_id="1")
+    new_card = Card(name="New Card", card_type="Spell", set_number="2", eternal_id="7")
+    searcher = object.__new__(semantic_search.SemanticCardSearch)
+    searcher.chromadb_manager = VersionedManager()
+    searcher.sheets_client = CatalogSheets([old_card])
+    searcher._catalog_lock = threading.Lock()
+    searcher._load_cards_cache()
+    assert not searcher.refresh_catalog_if_index_changed() and searcher.sheets_client.reads == 1
+
+    searcher.sheets_client.cards.append(new_card)
+    searcher.chromadb_manager.collection_name = 'eternal_cards_v2'
+    assert searcher._result_card({'id': '2_7_New_Card', 'name': 'New Card'}) is None
+    assert searcher.refresh_catalog_if_index_changed()
+    assert searcher._result_card({'id': '2_7_New_Card', 'name': 'New Card'}) is new_card
+    assert len(searcher._all_cards) == 2 and searcher.sheets_client.reads == 2
+
+    searcher.sheets_client.cards = []  # Planilha indisponível: mantém o catálogo
+    searcher.chromadb_manager.collection_name = 'eternal_cards_v3'
+    assert not searcher.refresh_catalog_if_index_changed()
+    assert len(searcher._all_cards) == 2
+    assert not searcher.refresh_catalog_if_index_changed() and searcher.sheets_client.reads == 3
+    print("  ✅ Catálogo recarregado quando a versão ativa do índice muda")
+
+    print("\n✅ Searcher compartilhado OK!")
+    return True
+
+if __name__ == "__main__":
+    test_shared_search()
@@ -0,0 +1,77 @@
+"""Teste do grafo de sinergia (kNN em CSR) e da API de completar deck"""
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from rag.synergy_graph import SynergyGraph, mechanic_bits
+
+def test_synergy_graph():
+    print("🧪 Testando grafo de sinergia...\n")
+
+    bits = mechanic_bits(["Flying. Warcry", "Charge", "no keywords"])
+    assert bits[0] and bits[1] and not bits[2]
+    assert np.bitwise_count(bits[0]) == 2
+    print("  ✅ Bits de mecânicas")
+
+    # Dois grupos: cartas de voo (0-3) e de sacrifício (4-7); 8 é reimpressão de 1
+    rng = np.random.default_rng(0)
+    flying, sacrifice = rng.normal(size=16), rng.normal(size=16)
+    embeddings = np.vstack(
+        [flying + rng.normal(scale=0.1, size=16) for _ in range(4)] +
+        [sacrifice + rng.normal(scale=0.1, size=16) for _ in range(4)] +
+        [flying]
+    )
+    names = ["Sky A", "Sky B", "Sky C", "Sky D", "Void A", "Void B", "Void C", "Void D", "Sky B"]
+    documents = [f"Card: {name} | Text: {'Flying' if name.startswith('Sky') else 'Entomb'}" for name in names]
+    metadatas = [{'name': name, 'faction_shadow': name.startswith('Void')} for name in names]
+    ids = [f"1_{i}_{name.replace(' ', '_')}" for i, name in enumerate(names)]
+
+    graph = SynergyGraph.build(ids, embeddings, documents, metadatas, k=3)
+    assert len(graph.indptr) == len(ids) + 1 and graph.indptr[-1] == len(graph.indices)
+    print(f"  ✅ CSR: {len(graph.indices)} arestas, {graph.nbytes} bytes")
+
+    suggestions = graph.complete(["Sky A", "Sky C"], n_results=3)
+    suggested = [s['name'] for s in suggestions]
+    assert "Sky B" in suggested and "Sky D" in suggested
+    assert not {"Sky A", "Sky C"} & set(suggested)
+    assert len(suggested) == len(set(suggested))
+    print(f"  ✅ Sugestões do mesmo grupo, sem repetir o deck: {suggested}")
+
+    shadow_only = graph.complete(["Sky A"], where={'faction_shadow': True}, n_results=5)
+    assert all(s['metadata']['faction_shadow'] for s in shadow_only)
+    assert "Sky B" not in [s['name'] for s in graph.complete(["Sky A"], exclude_names=["Sky B"])]
+    # Proibição por nome parcial, igual às buscas: "sky" bloqueia todas as Sky
+    partial = graph.complete(["Sky A", "Void A"], exclude_names=["sky"], n_results=8)
+    assert partial and not any(s['name'].startswith("Sky") for s in partial)
+    assert graph.complete(["Carta Inexistente"]) == []
+    print("  ✅ Filtro where, proibidas e cartas desconhecidas")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'graph.npz')
+        graph.save(path)
+        loaded = SynergyGraph.load(path)
+        assert loaded.complete(["Sky A", "Sky C"], n_results=3) == suggestions
+    print("  ✅ Salvo e recarregado")
+
+    # Catálogo do tamanho real: completar em milissegundos
+    n = 3000
+    big = SynergyGraph.build(
+        [f"id{i}" for i in range(n)],
+        rng.normal(size=(n, 384)).astype(np.float32),
+        ["Flying" if i % 3 else "Charge" for i in range(n)],
+        [{'name': f"Card {i}"} for i in range(n)]
+    )
+    deck = [f"Card {i}" for i in range(0, 300, 20)]
+    start = time.perf_counter()
+    results = big.complete(deck, n_results=30)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    assert len(results) == 30
+    print(f"  ✅ {n} cartas: completar deck de {len(deck)} em {elapsed_ms:.2f}ms")
+
+    print("\n✅ Grafo de sinergia OK!")
+    return True
+
+if __name__ == "__main__":
+    test_synergy_graph()
@@ -0,0 +1,154 @@
+"""Cache das linhas de contexto (prompt) pré-renderizadas por carta"""
+import threading
+from typing import Dict, List, Tuple
+from data.card_catalog import card_id, card_fingerprint
+from data.models import Card
+
+INFLUENCE_SYMBOLS = {'FIRE': 'F', 'TIME': 'T', 'JUSTICE': 'J', 'PRIMAL': 'P', 'SHADOW': 'S'}
+
+# Variantes de formatação disponíveis
+LINE_VARIANTS = ('compact', 'full', 'market', 'market_compact', 'agent')
+
+
+def format_cost_influence(card: Card) -> str:
+    """Formata custo + influência no estilo 3{F}{F}"""
+    # Usar influence_string da planilha se disponível
+    if card.influence_string:
+        return f"{card.cost}{card.influence_string}"
+
+    # Fallback: montar a partir do dicionário de influência
+    influence_str = str(card.cost)
+    for faction, symbol in INFLUENCE_SYMBOLS.items():
+        count = card.influence.get(faction, 0)
+        influence_str += ('{' + symbol + '}') * count
+
+    return influence_str
+
+
+def render_card_lines(card: Card) -> Dict[str, str]:
+    """
+    Renderiza todas as variantes de linha de uma carta
+
+    - compact: sem texto (contexto tradicional)
+    - full: com texto da carta (contexto RAG)
+    - market / market_compact: seção de acesso ao mercado
+    - agent: formato da ferramenta search_cards do agente
+    """
+    # 🚨 ÂNCORA: CARD_LINE_FORMAT - Formato das linhas enviadas ao LLM
+    # Contexto: Único lugar que define "• Nome | custo | stats | raridade"
+    # Cuidado: DeckValidator/DeckPostProcessor esperam este layout com pipes
+    # Dependências: format_cards_context_from_rag, format_traditional_context, agents/tools
+
+    cost = format_cost_influence(card)
+    text_suffix = f" | {card.text}" if card.text else ""
+
+    if card.is_unit:
+        compact = f"• {card.name} | {cost} | {card.attack}/{card.health} | {card.rarity}"
+        full = compact
+    elif card.is_power:
+        compact = f"• {card.name} | {cost}"
+        full = compact
+    elif 'Weapon' in card.card_type:
+        stats = f"+{card.attack}/+{card.health}" if card.attack else ""
+        compact = f"• {card.name} | {cost} | {card.rarity}"
+        full = f"• {card.name} | {cost} | {stats} | {card.rarity}"
+    else:
+        compact = f"• {card.name} | {cost} | {card.rarity}"
+        full = compact
+
+    # Formato da ferramenta do agente
+    agent = f"{card.name} - {card.cost} custo"
+    if card.is_unit:
+        agent += f" - {card.attack}/{card.health} Unit"
+    else:
+        agent += f" - {card.card_type}"
+    if card.factions:
+        agent += f" - {'/'.join(card.factions)}"
+    if card.text:
+        agent += f" - {card.text[:40]}..."
+
+    return {
+        'compact': compact,
+        'full': full + text_suffix,
+        'market': f"• {card.name} | {cost}{text_suffix}",
+        'market_compact': f"• {card.name} | {cost}",
+        'agent': agent,
+        'cost': cost,
+    }
+
+
+class CardLineCache:
+    """Linhas pré-renderizadas por carta, invalidadas individualmente no sync"""
+
+    def __init__(self):
+        # id da carta -> (fingerprint, linhas renderizadas)
+        self._entries: Dict[str, Tuple[Tuple, Dict[str, str]]] = {}
+        # id() do objeto Card sincronizado -> (carta, linhas): leitura sem hashing
+        self._by_object: Dict[int, Tuple[Card, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def sync(self, cards: List[Card]) -> int:
+        """
+        Sincroniza o cache com o catálogo carregado
+
+        Apenas cartas novas ou alteradas são renderizadas novamente. Os
+        fingerprints só são calculados aqui; as consultas leem por objeto.
+
+        Returns:
+            Número de cartas (re)renderizadas
+        """
+        rendered = 0
+        by_object: Dict[int, Tuple[Card, Dict[str, str]]] = {}
+
+        with self._lock:
+            for card in cards:
+                key = card_id(card)
+                fingerprint = card_fingerprint(card)
+                entry = self._entries.get(key)
+
+                if entry is None or entry[0] != fingerprint:
+                    entry = (fingerprint, render_card_lines(card))
+                    self._entries[key] = entry
+                    rendered += 1
+
+                by_object[id(card)] = (card, entry[1])
+
+            self._by_object = by_object
+
+        return rendered
+
+    def _lines_for(self, card: Card) -> Dict[str, str]:
+        entry = self._by_object.get(id(card))
+        if entry is not None and entry[0] is card:
+            return entry[1]
+
+        # Carta fora do catálogo sincronizado (ou cópia editada): renderizar
+        # sob demanda e guardar até o próximo sync
+        lines = render_card_lines(card)
+        with self._lock:
+            self._by_object[id(card)] = (card, lines)
+        return lines
+
+    def line(self, card: Card, variant: str = 'full') -> str:
+        """Linha pré-renderizada de uma carta na variante pedida"""
+        return self._lines_for(card)[variant]
+
+    def lines(self, cards: List[Card], variant: str = 'full') -> List[str]:
+        """Linhas pré-renderizadas de várias cartas"""
+        return [self._lines_for(card)[variant] for card in cards]
+
+    def cost_string(self, card: Card) -> str:
+        """Custo + influência pré-formatados (ex: 3{F}{F})"""
+        return self._lines_for(card)['cost']
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Cache compartilhado pelo processo
+_shared_cache = CardLineCache()
+
+
+def get_card_line_cache() -> CardLineCache:
+    """Retorna o cache de linhas compartilhado"""
+    return _shared_cache